@@ -1,14 +1,21 @@
 # src/dal/jira_connector.py
 import os
+import json
+import time
+import threading
 import urllib3
 
 # Suppress InsecureRequestWarning: Unverified HTTPS request is being made to host...
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 import logging
-from typing import List, Dict, Any, Optional, Union
+from typing import List, Dict, Any, Callable, Iterator, Optional, Union
 from jira import JIRA, Issue
 from jira.exceptions import JIRAError
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError as RequestsConnectionError, Timeout
 import ssl # For SSL context, though now primarily handled by JIRA lib's 'validate'
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -17,6 +24,95 @@ logger = logging.getLogger(__name__)
 if not logger.handlers:
     logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 
+# Epic Link field ID for this specific Jira instance
+EPIC_LINK_FIELD_ID = "customfield_10007"
+
+# Jira accepts at most 50 issues per bulk create request
+BULK_CREATE_CHUNK_SIZE = 50
+
+# Concurrent requests used for per-issue follow-up calls such as transitions
+MAX_PARALLEL_REQUESTS = 4
+
+# Pooled keep-alive connections per client; parallel requests beyond this wait for a free one
+CONNECTION_POOL_SIZE = MAX_PARALLEL_REQUESTS * 2
+
+# Seconds before a Jira request is abandoned (connect, read)
+REQUEST_TIMEOUT_SECONDS = (10, 120)
+
+# Issues per search request; Jira Server caps maxResults at 1000 by default, often lower
+SEARCH_PAGE_SIZE = 100
+
+# Standard fields returned with every feature issue
+STANDARD_FEATURE_FIELDS = ['summary', 'status', 'issuetype', 'reporter', 'assignee', 'created', 'updated', 'priority', 'project', 'resolution']
+
+# The field list rarely changes, so it is cached on disk between runs
+FIELDS_CACHE_PATH = os.environ.get(
+    'JIRA_FIELDS_CACHE_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'jira_fields.json')
+)
+FIELDS_CACHE_TTL_SECONDS = int(os.environ.get('JIRA_FIELDS_CACHE_TTL_SECONDS', 24 * 60 * 60))
+
+# Schema types whose values are reported by their 'name' attribute
+NAMED_FIELD_TYPES = {'priority', 'status', 'project', 'resolution', 'issuetype'}
+
+
+def _generic_field_value(raw_value: Any) -> Any:
+    """Fallback extraction for fields without a type-specific rule."""
+    if isinstance(raw_value, list) and all(hasattr(item, 'name') for item in raw_value): # e.g., components, versions
+        return ', '.join(item.name for item in raw_value)
+    elif isinstance(raw_value, str) or isinstance(raw_value, (int, float, bool)):
+        return raw_value
+    else: # Fallback for complex types or unhandled types
+        return str(raw_value)
+
+
+def _compile_field_extractor(field_schema: Optional[Dict[str, Any]]) -> Callable[[Any], Any]:
+    """
+    Returns a function extracting a display value from a raw field value, chosen once from the field's schema.
+    """
+    schema = (field_schema or {}).get('schema') or {}
+    field_type = schema.get('type', 'unknown')
+    items = schema.get('items')
+
+    if field_type == 'user':
+        return lambda raw: raw.displayName if hasattr(raw, 'displayName') else _generic_field_value(raw)
+    if field_type == 'array' and items == 'string':
+        return lambda raw: ', '.join(raw) if isinstance(raw, list) else raw
+    if field_type == 'array' and items == 'option':
+        return lambda raw: (', '.join(item.value for item in raw if hasattr(item, 'value'))
+                            if isinstance(raw, list) else _generic_field_value(raw))
+    if field_type == 'option':
+        return lambda raw: raw.value if hasattr(raw, 'value') else _generic_field_value(raw)
+    if field_type in NAMED_FIELD_TYPES:
+        return lambda raw: raw.name if hasattr(raw, 'name') else _generic_field_value(raw)
+    return _generic_field_value
+
+
+def compile_field_extractors(fields_info: List[Dict[str, Any]]) -> Dict[str, Callable[[Any], Any]]:
+    """
+    Compiles Jira's field list into a dictionary of value extractors keyed by field ID.
+    """
+    return {field['id']: _compile_field_extractor(field) for field in fields_info if 'id' in field}
+
+
+class _PooledAdapter(HTTPAdapter):
+    """
+    HTTP adapter with a bounded keep-alive pool that reports auth and transport failures.
+    """
+    def __init__(self, on_failure: Callable[[], None], **kwargs):
+        self._on_failure = on_failure
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        try:
+            response = super().send(request, **kwargs)
+        except (RequestsConnectionError, Timeout):
+            self._on_failure()
+            raise
+        if response.status_code == 401:
+            self._on_failure()
+        return response
+
 
 class JiraConnector:
     def __init__(
@@ -29,6 +125,7 @@ class JiraConnector:
         API token is loaded from an environment variable. Server URL is hardcoded.
         """
         self.server = "https://athenajira.athenahealth.com/" # Hardcoded server URL
+        self.api_token_env_var = api_token_env_var
         self.api_token = os.environ.get(api_token_env_var) # Reads from 'Jira' by default
 
         # SSL verification is hardcoded to False for this specific Jira instance
@@ -55,12 +152,78 @@ class JiraConnector:
                 f"Ensure this/these are set."
             )
 
-    def connect(self) -> JIRA:
+        # Field list and compiled extractors, filled on first use
+        self._fields_info: Optional[List[Dict[str, Any]]] = None
+        self._extractors: Dict[str, Callable[[Any], Any]] = {}
+        self._extractors_source: Optional[List[Dict[str, Any]]] = None
+
+        # Client shared by all methods and threads; rebuilt after an auth or transport failure
+        self._client: Optional[JIRA] = None
+        self._client_lock = threading.Lock()
+
+    def connect(self, force_reconnect: bool = False) -> JIRA:
         """
-        Establishes and returns a connection to the Jira server using token authentication.
+        Returns the cached Jira client, establishing a connection with token authentication if needed.
+
+        The client keeps connections alive in a bounded pool and is safe to share across threads.
+        A 401 response or a transport error discards it, so the next call reconnects.
+
+        Args:
+            force_reconnect: Whether to discard the cached client and connect again.
+        """
+        client = self._client
+        if client is not None and not force_reconnect:
+            return client
+        with self._client_lock:
+            if self._client is not None and not force_reconnect:
+                return self._client
+            stale_client, self._client = self._client, self._create_client()
+            client = self._client
+        self._close_client(stale_client)
+        return client
+
+    def reset_connection(self) -> None:
+        """
+        Discards the cached Jira client; the next call to connect() creates a new one.
+        """
+        with self._client_lock:
+            stale_client, self._client = self._client, None
+        if stale_client is not None:
+            logger.info("Discarding cached Jira connection.")
+        self._close_client(stale_client)
+
+    def _discard_client(self, client_id: int) -> None:
+        """Drops the cached client if it is still the one that failed and closes its session."""
+        with self._client_lock:
+            if self._client is None or id(self._client) != client_id:
+                return
+            logger.warning("Jira request failed with an auth or transport error; reconnecting on next use.")
+            stale_client, self._client = self._client, None
+        self._close_client(stale_client)
+
+    @staticmethod
+    def _close_client(client: Optional[JIRA]) -> None:
+        """
+        Closes a dropped client's session so its pooled connections are released.
+
+        Idle connections close at once; connections held by in-flight requests close when
+        those requests release them.
+        """
+        if client is None:
+            return
+        try:
+            client.close()
+        except Exception as e:
+            logger.debug(f"Error closing discarded Jira session: {str(e)}")
+
+    def _create_client(self) -> JIRA:
+        """
+        Establishes a connection to the Jira server using token authentication.
         """
         try:
             logger.info(f"Connecting to Jira server at {self.server}...")
+            # Re-read the token so a rotated token is picked up on reconnect
+            self.api_token = os.environ.get(self.api_token_env_var) or self.api_token
             # Explicitly set verify in options as well, though validate parameter should handle it.
             options = {'server': self.server, 'verify': self.verify_ssl}
             
@@ -68,8 +231,18 @@ class JiraConnector:
             client = JIRA(
                 options=options,
                 token_auth=self.api_token,
-                validate=self.verify_ssl # Controls SSL certificate verification
+                validate=self.verify_ssl, # Controls SSL certificate verification
+                timeout=REQUEST_TIMEOUT_SECONDS
             )
+            client_id = id(client)
+            adapter = _PooledAdapter(
+                on_failure=lambda: self._discard_client(client_id),
+                pool_connections=1,
+                pool_maxsize=CONNECTION_POOL_SIZE,
+                pool_block=True
+            )
+            client._session.mount('https://', adapter)
+            client._session.mount('http://', adapter)
             logger.info("Successfully connected to Jira using token_auth.")
             return client
         except JIRAError as e:
@@ -79,23 +252,72 @@ class JiraConnector:
             logger.error(f"General error connecting to Jira: {str(e)}", exc_info=True)
             raise
 
-    def get_fields_info(self) -> List[Dict[str, Any]]:
+    def get_fields_info(self, use_cache: bool = True) -> List[Dict[str, Any]]:
         """
         Retrieves information about all available Jira fields.
 
+        The list is cached in memory and on disk (FIELDS_CACHE_PATH) for
+        FIELDS_CACHE_TTL_SECONDS, so it is not fetched on every run.
+
+        Args:
+            use_cache: Whether a cached field list may be returned.
+
         Returns:
             List[Dict[str, Any]]: A list of dictionaries, each describing a Jira field.
         """
+        if use_cache:
+            if self._fields_info:
+                return self._fields_info
+            cached = self._load_cached_fields()
+            if cached:
+                self._fields_info = cached
+                return cached
+
         client = None
         try:
             client = self.connect()
             fields = client.fields()
             logger.info(f"Retrieved information for {len(fields)} Jira fields.")
+            self._fields_info = fields
+            self._save_cached_fields(fields)
             return fields
         except Exception as e:
             logger.error(f"Error retrieving Jira fields information: {str(e)}", exc_info=True)
             return []
 
+    def _load_cached_fields(self) -> Optional[List[Dict[str, Any]]]:
+        """Returns the field list cached on disk if it is for this server and younger than the TTL."""
+        try:
+            with open(FIELDS_CACHE_PATH, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            if cached.get('server') != self.server or time.time() - cached.get('fetched_at', 0) > FIELDS_CACHE_TTL_SECONDS:
+                return None
+            logger.info(f"Using cached information for {len(cached['fields'])} Jira fields from {FIELDS_CACHE_PATH}.")
+            return cached['fields']
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable Jira fields cache {FIELDS_CACHE_PATH}: {e}")
+            return None
+
+    def _save_cached_fields(self, fields: List[Dict[str, Any]]) -> None:
+        """Writes the field list to the on-disk cache."""
+        try:
+            os.makedirs(os.path.dirname(FIELDS_CACHE_PATH), exist_ok=True)
+            tmp_path = f"{FIELDS_CACHE_PATH}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'server': self.server, 'fetched_at': time.time(), 'fields': fields}, f)
+            os.replace(tmp_path, FIELDS_CACHE_PATH)
+        except Exception as e:
+            logger.warning(f"Could not write Jira fields cache {FIELDS_CACHE_PATH}: {e}")
+
+    def _field_extractors(self, fields_info: List[Dict[str, Any]]) -> Dict[str, Callable[[Any], Any]]:
+        """Returns compiled extractors for a field list, compiling each distinct list only once."""
+        if self._extractors_source is not fields_info:
+            self._extractors = compile_field_extractors(fields_info)
+            self._extractors_source = fields_info
+        return self._extractors
+
     def _extract_field_value(self, issue: Issue, field_id: str, field_name: str, fields_info: List[Dict[str, Any]]) -> Any:
         """
         Extracts the value of a field from a Jira issue, handling different field types.
@@ -105,71 +327,100 @@ class JiraConnector:
             if raw_value is None:
                 return None
 
-            # Find field schema for type information
-            field_schema = next((f for f in fields_info if f['id'] == field_id), None)
-            field_type = field_schema['schema']['type'] if field_schema and 'schema' in field_schema and 'type' in field_schema['schema'] else 'unknown'
-            
-            # Based on observed types in your previous scripts and common Jira types:
-            if field_type == 'user' and hasattr(raw_value, 'displayName'):
-                return raw_value.displayName
-            elif field_type == 'array' and field_schema and field_schema['schema'].get('items') == 'string':
-                 return ', '.join(raw_value) if isinstance(raw_value, list) else raw_value
-            elif field_type == 'array' and field_schema and field_schema['schema'].get('items') == 'option' and isinstance(raw_value, list):
-                return ', '.join(item.value for item in raw_value if hasattr(item, 'value'))
-            elif field_type == 'option' and hasattr(raw_value, 'value'):
-                return raw_value.value
-            elif field_type == 'priority' and hasattr(raw_value, 'name'):
-                return raw_value.name
-            elif field_type == 'status' and hasattr(raw_value, 'name'):
-                return raw_value.name
-            elif field_type == 'project' and hasattr(raw_value, 'name'):
-                return raw_value.name
-            elif field_type == 'resolution' and hasattr(raw_value, 'name'):
-                return raw_value.name
-            elif field_type == 'issuetype' and hasattr(raw_value, 'name'):
-                return raw_value.name
-            elif isinstance(raw_value, list) and all(hasattr(item, 'name') for item in raw_value): # e.g., components, versions
-                return ', '.join(item.name for item in raw_value)
-            elif isinstance(raw_value, str) or isinstance(raw_value, (int, float, bool)):
-                return raw_value
-            else: # Fallback for complex types or unhandled types
-                return str(raw_value)
+            extractor = self._field_extractors(fields_info).get(field_id, _generic_field_value)
+            return extractor(raw_value)
 
         except Exception as e:
-            logger.warning(f"Could not extract value for field '{field_name}' (ID: {field_id}), type: {field_type}. Error: {e}", exc_info=False)
+            logger.warning(f"Could not extract value for field '{field_name}' (ID: {field_id}). Error: {e}", exc_info=False)
             return None
             
+    def iter_search_issues(
+        self,
+        jql: str,
+        fields: List[str],
+        max_results: Optional[int] = None,
+        page_size: int = SEARCH_PAGE_SIZE,
+        expand: Optional[str] = None,
+        max_workers: int = MAX_PARALLEL_REQUESTS
+    ) -> Iterator[Issue]:
+        """
+        Yields the issues matching a JQL query, paging through startAt windows.
+
+        The first page reports the total; the remaining pages are fetched
+        concurrently, at most max_workers at a time, and yielded in order. Only
+        the requested fields are transferred, and at most max_workers pages are
+        held in memory.
+
+        Args:
+            jql: The JQL query (end the ORDER BY with a unique field such as key, so pages don't overlap).
+            fields: Field IDs to return.
+            max_results: Optional cap on the number of issues (all matches when None).
+            page_size: Issues per request.
+            expand: Optional expand parameter; omitted by default.
+            max_workers: Maximum concurrent page requests.
+        """
+        client = self.connect()
+        field_list = ",".join(fields)
+
+        def fetch(start_at: int):
+            limit = page_size if max_results is None else min(page_size, max_results - start_at)
+            return client.search_issues(
+                jql, startAt=start_at, maxResults=limit, fields=field_list,
+                expand=expand, validate_query=False
+            )
+
+        first_page = fetch(0)
+        total = first_page.total if max_results is None else min(first_page.total, max_results)
+        yield from first_page
+        if len(first_page) >= total:
+            return
+
+        # Use the page size the server actually applied, which may be below what was asked for
+        step = len(first_page) or page_size
+        offsets = iter(range(step, total, step))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = deque(executor.submit(fetch, offset) for offset, _ in zip(offsets, range(max_workers)))
+            while pending:
+                page = pending.popleft().result()
+                next_offset = next(offsets, None)
+                if next_offset is not None:
+                    pending.append(executor.submit(fetch, next_offset))
+                yield from page
+
+    def _feature_fields(self, field_mapping: Dict[str, str]) -> List[str]:
+        """Returns the mapped field IDs plus the standard fields not already mapped by name."""
+        jira_fields_to_retrieve = list(field_mapping.values())
+        for sf in STANDARD_FEATURE_FIELDS:
+            if sf not in jira_fields_to_retrieve and sf not in field_mapping.keys(): # Avoid adding if already mapped by name
+                jira_fields_to_retrieve.append(sf)
+        return jira_fields_to_retrieve
+
+    def _feature_details(self, issue: Issue, field_mapping: Dict[str, str], fields_info: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Maps an issue's fields to a dictionary keyed by the human-readable field names."""
+        issue_details = {'key': issue.key}
+        for human_name, jira_id in field_mapping.items():
+            issue_details[human_name] = self._extract_field_value(issue, jira_id, human_name, fields_info)
+
+        # Add standard fields if not already mapped
+        for sf in STANDARD_FEATURE_FIELDS:
+            if sf not in issue_details: # If not mapped by custom name
+                issue_details[sf] = self._extract_field_value(issue, sf, sf, fields_info)
+        return issue_details
+
+    def iter_feature_issues(self, field_mapping: Dict[str, str], fields_info: List[Dict[str, Any]], jql: str, max_results: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Yields issues matching a JQL query with custom fields mapped, streaming page by page.
+        """
+        logger.info(f"Searching Jira with JQL: {jql}")
+        for issue in self.iter_search_issues(jql, self._feature_fields(field_mapping), max_results=max_results):
+            yield self._feature_details(issue, field_mapping, fields_info)
+
     def get_feature_issues(self, field_mapping: Dict[str, str], fields_info: List[Dict[str, Any]], jql: str, max_results: int = 50) -> List[Dict[str, Any]]:
         """
         Retrieves issues from Jira based on a JQL query and maps custom fields.
         """
-        client = None
         try:
-            client = self.connect()
-            issues_data = []
-            
-            # Construct the list of fields to retrieve, including standard fields
-            jira_fields_to_retrieve = list(field_mapping.values())
-            # Add standard fields that might not be in mapping but are usually needed
-            standard_fields = ['summary', 'status', 'issuetype', 'reporter', 'assignee', 'created', 'updated', 'priority', 'project', 'resolution']
-            for sf in standard_fields:
-                if sf not in jira_fields_to_retrieve and sf not in field_mapping.keys(): # Avoid adding if already mapped by name
-                    jira_fields_to_retrieve.append(sf)
-            
-            logger.info(f"Searching Jira with JQL: {jql}")
-            searched_issues = client.search_issues(jql, maxResults=max_results, fields=jira_fields_to_retrieve, expand='renderedFields')
-
-            for issue in searched_issues:
-                issue_details = {'key': issue.key}
-                for human_name, jira_id in field_mapping.items():
-                    issue_details[human_name] = self._extract_field_value(issue, jira_id, human_name, fields_info)
-                
-                # Add standard fields if not already mapped
-                for sf in standard_fields:
-                    if sf not in issue_details: # If not mapped by custom name
-                         issue_details[sf] = self._extract_field_value(issue, sf, sf, fields_info)
-                issues_data.append(issue_details)
-            
+            issues_data = list(self.iter_feature_issues(field_mapping, fields_info, jql, max_results))
             logger.info(f"Retrieved {len(issues_data)} issues from Jira.")
             return issues_data
         except Exception as e:
@@ -180,7 +431,7 @@ class JiraConnector:
         """
         Searches for 'Feature' type issues by summary text.
         """
-        jql = f'project = "PRODUCT" AND issuetype = "Feature" AND summary ~ "{summary_text}" ORDER BY created DESC'
+        jql = f'project = "PRODUCT" AND issuetype = "Feature" AND summary ~ "{summary_text}" ORDER BY created DESC, key DESC'
         return self.get_feature_issues(field_mapping, fields_info, jql, max_results)
 
     def get_feature_by_key(self, issue_key: str, field_mapping: Dict[str, str], fields_info: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
@@ -190,21 +441,9 @@ class JiraConnector:
         client = None
         try:
             client = self.connect()
-            jira_fields_to_retrieve = list(field_mapping.values())
-            standard_fields = ['summary', 'status', 'issuetype', 'reporter', 'assignee', 'created', 'updated', 'priority', 'project', 'resolution']
-            for sf in standard_fields:
-                if sf not in jira_fields_to_retrieve and sf not in field_mapping.keys():
-                    jira_fields_to_retrieve.append(sf)
-
-            issue = client.issue(issue_key, fields=jira_fields_to_retrieve, expand='renderedFields')
+            issue = client.issue(issue_key, fields=",".join(self._feature_fields(field_mapping)))
             if issue:
-                issue_details = {'key': issue.key}
-                for human_name, jira_id in field_mapping.items():
-                    issue_details[human_name] = self._extract_field_value(issue, jira_id, human_name, fields_info)
-                for sf in standard_fields:
-                    if sf not in issue_details:
-                         issue_details[sf] = self._extract_field_value(issue, sf, sf, fields_info)
-                return issue_details
+                return self._feature_details(issue, field_mapping, fields_info)
             return None
         except Exception as e:
             logger.error(f"Error retrieving Jira issue {issue_key}: {str(e)}", exc_info=True)
@@ -231,17 +470,14 @@ class JiraConnector:
         Retrieves all Epics for a given project.
         Returns a list of dictionaries with 'key' and 'summary' for each Epic.
         """
-        client = None
         epics_list = []
         try:
-            client = self.connect()
             # Standard JQL for Epics. Assumes 'Epic Name' is in summary or a standard field.
             # If 'Epic Name' is a specific custom field, that field needs to be used/queried.
-            jql = f'project = "{project_key}" AND issuetype = Epic AND component = "FeatureCentral" ORDER BY summary ASC'
+            jql = f'project = "{project_key}" AND issuetype = Epic AND component = "FeatureCentral" ORDER BY summary ASC, key ASC'
             logger.info(f"Fetching Epics with JQL: {jql}")
             
-            epics = client.search_issues(jql, fields="summary,key", maxResults=1000) # High maxResults for Epics
-            for epic in epics:
+            for epic in self.iter_search_issues(jql, ["summary"]):
                 epics_list.append({'key': epic.key, 'summary': epic.fields.summary})
             logger.info(f"Found {len(epics_list)} Epics in project '{project_key}'.")
         except Exception as e:
@@ -253,27 +489,75 @@ class JiraConnector:
         Retrieves all Stories linked to a specific Epic.
         Returns a list of dictionaries with 'key' and 'summary' for each Story.
         """
-        client = None
         stories_list = []
         try:
-            client = self.connect()
             # JQL to find stories linked to an Epic. Using the hardcoded Epic Link custom field ID.
             # JQL to find stories linked to an Epic using its display name.
             # Note: Field names with spaces need to be quoted in JQL, but "Epic Link" often works directly or might need to be 'Epic Link'.
             # If "Epic Link" causes issues, try f'project = "{project_key}" AND "Epic Link" = "{epic_key}" AND issuetype = Story ORDER BY summary ASC'
             # or even f'project = "{project_key}" AND "Epic Link" = {epic_key} AND issuetype = Story ORDER BY summary ASC' (if epic_key is numeric, though it's usually a string)
             # For string custom fields, equality with a string is standard.
-            jql = f'project = "{project_key}" AND "Epic Link" = "{epic_key}" AND issuetype = Story ORDER BY summary ASC'
+            jql = f'project = "{project_key}" AND "Epic Link" = "{epic_key}" AND issuetype = Story ORDER BY summary ASC, key ASC'
             logger.info(f"Fetching Stories with JQL: {jql}")
 
-            stories = client.search_issues(jql, fields="summary,key", maxResults=1000)
-            for story in stories:
+            for story in self.iter_search_issues(jql, ["summary"]):
                 stories_list.append({'key': story.key, 'summary': story.fields.summary})
             logger.info(f"Found {len(stories_list)} Stories in Epic '{epic_key}'.")
         except Exception as e:
             logger.error(f"Error fetching Stories for Epic {epic_key}: {str(e)}", exc_info=True)
         return stories_list
 
+    def build_issue_fields(
+        self,
+        project_key: str,
+        summary: str,
+        description_body: str,
+        reporter_username: str,
+        assignee_username: str,
+        epic_link_key: Optional[str] = None,
+        issue_type: str = "Story"
+    ) -> Dict[str, Any]:
+        """
+        Builds the fields dictionary for a new Jira issue, optionally linked to an Epic.
+        """
+        issue_dict = {
+            'project': {'key': project_key},
+            'summary': summary,
+            'description': description_body,
+            'issuetype': {'name': issue_type},
+            'reporter': {'name': reporter_username},
+            'assignee': {'name': assignee_username},
+        }
+        # Linking to an Epic. The field name for Epic Link can vary between Jira
+        # configurations; on this Jira Server instance it is a custom field.
+        if epic_link_key:
+            issue_dict[EPIC_LINK_FIELD_ID] = epic_link_key
+        return issue_dict
+
+    def get_stories_in_epics(self, project_key: str, epic_keys: List[str]) -> Dict[str, List[Dict[str, str]]]:
+        """
+        Retrieves the Stories and Bugs linked to several Epics with a single search.
+        Returns a dictionary mapping each Epic key to a list of {'key', 'summary'} dictionaries.
+        """
+        children: Dict[str, List[Dict[str, str]]] = {epic_key: [] for epic_key in epic_keys}
+        if not epic_keys:
+            return children
+        try:
+            epic_list = ", ".join(f'"{epic_key}"' for epic_key in epic_keys)
+            jql = f'project = "{project_key}" AND "Epic Link" in ({epic_list}) AND issuetype in (Story, Bug) ORDER BY key ASC'
+            logger.info(f"Fetching Epic children with JQL: {jql}")
+
+            found = 0
+            for issue in self.iter_search_issues(jql, ["summary", EPIC_LINK_FIELD_ID]):
+                found += 1
+                epic_key = getattr(issue.fields, EPIC_LINK_FIELD_ID, None)
+                if epic_key in children:
+                    children[epic_key].append({'key': issue.key, 'summary': issue.fields.summary})
+            logger.info(f"Found {found} issues under {len(epic_keys)} Epics.")
+        except Exception as e:
+            logger.error(f"Error fetching issues for Epics {epic_keys}: {str(e)}", exc_info=True)
+        return children
+
     def create_jira_issue(
         self,
         project_key: str,
@@ -291,29 +575,10 @@ class JiraConnector:
         client = None
         try:
             client = self.connect()
-            issue_dict = {
-                'project': {'key': project_key},
-                'summary': summary,
-                'description': description_body,
-                'issuetype': {'name': issue_type},
-                'reporter': {'name': reporter_username},
-                'assignee': {'name': assignee_username},
-            }
-            
-            # Linking to an Epic. The field name for Epic Link can vary.
-            # Common ones are 'parent' (for next-gen projects or some newer Jira Cloud)
-            # or a custom field like 'customfield_XXXXX' (often for Jira Server/Data Center).
-            # The 'jira-python' library often handles this if you provide the 'parent' field for Epics.
-            # If 'parent' doesn't work, you'd need to find the actual custom field ID for "Epic Link".
-            # For now, assuming 'parent' might work or a custom field ID for 'Epic Link' is needed.
-            # Let's try with a common custom field name pattern if 'parent' is not it.
-            # This part is highly dependent on Jira configuration.
-            if epic_link_key:
-                # Epic Link field ID is hardcoded to 'customfield_10007' for this specific Jira instance.
-                epic_link_field_id = "customfield_10007"
-                issue_dict[epic_link_field_id] = epic_link_key
-                logger.info(f"Setting Epic Link using hardcoded field ID: {epic_link_field_id}")
-
+            issue_dict = self.build_issue_fields(
+                project_key, summary, description_body, reporter_username,
+                assignee_username, epic_link_key, issue_type
+            )
 
             logger.info(f"Attempting to create Jira {issue_type_name} in project '{project_key}' with summary: '{summary}'")
             new_issue = client.create_issue(fields=issue_dict)
@@ -325,6 +590,59 @@ class JiraConnector:
             logger.error(f"Error creating Jira {issue_type_name}: {e.text if hasattr(e, 'text') else str(e)}", exc_info=True)
             return None
 
+    def create_jira_issues_bulk(self, issues_fields: List[Dict[str, Any]], chunk_size: int = BULK_CREATE_CHUNK_SIZE) -> List[Optional[str]]:
+        """
+        Creates many issues through Jira's bulk create endpoint (/rest/api/2/issue/bulk).
+
+        Args:
+            issues_fields: Fields dictionaries, e.g. from build_issue_fields().
+            chunk_size: Issues per request (Jira allows at most 50).
+
+        Returns:
+            The new issue key for each input, in order, or None where creation failed.
+        """
+        keys: List[Optional[str]] = [None] * len(issues_fields)
+        try:
+            client = self.connect()
+        except Exception as e:
+            logger.error(f"Error connecting to Jira for bulk issue creation: {str(e)}", exc_info=True)
+            return keys
+
+        url = client._get_url("issue/bulk")
+        for start in range(0, len(issues_fields), chunk_size):
+            chunk = issues_fields[start:start + chunk_size]
+            logger.info(f"Bulk creating issues {start + 1}-{start + len(chunk)} of {len(issues_fields)}...")
+            try:
+                response = client._session.post(url, data=json.dumps({"issueUpdates": [{"fields": f} for f in chunk]}))
+                result = response.json()
+            except JIRAError as e:
+                # Jira answers 400 if any issue in the chunk failed; the body still lists the created ones
+                try:
+                    result = e.response.json()
+                except Exception:
+                    logger.error(f"Bulk create request failed: {e.text if e.text else str(e)}", exc_info=True)
+                    continue
+            except Exception as e:
+                logger.error(f"Bulk create request failed: {str(e)}", exc_info=True)
+                continue
+
+            failed = set()
+            for error in result.get("errors", []):
+                failed.add(error.get("failedElementNumber"))
+                logger.error(
+                    f"Failed to create issue '{chunk[error.get('failedElementNumber', 0)].get('summary')}': "
+                    f"{error.get('elementErrors', {}).get('errors') or error.get('elementErrors')}"
+                )
+            # Created issues are listed in input order, skipping the failed elements
+            created = iter(result.get("issues", []))
+            for offset in range(len(chunk)):
+                if offset not in failed:
+                    issue = next(created, None)
+                    keys[start + offset] = issue["key"] if issue else None
+
+        logger.info(f"Bulk created {sum(1 for k in keys if k)} of {len(issues_fields)} issues.")
+        return keys
+
     def create_jira_epic(
         self,
         project_key: str,
@@ -449,4 +767,17 @@ class JiraConnector:
                 return False
         except Exception as e:
             logger.error(f"Error transitioning issue {issue_key}: {str(e)}", exc_info=True)
-            return False
\ No newline at end of file
+            return False
+
+    def transition_jira_issues(self, issue_keys: List[str], target_status_name: str, max_workers: int = MAX_PARALLEL_REQUESTS) -> Dict[str, bool]:
+        """
+        Transitions several Jira issues to a target status in parallel.
+
+        Returns:
+            A dictionary mapping each issue key to whether its transition succeeded.
+        """
+        if not issue_keys:
+            return {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(lambda key: self.transition_jira_issue(key, target_status_name), issue_keys)
+            return dict(zip(issue_keys, results))
@@ -96,6 +96,11 @@ def parse_pending_entry(entry_text: str) -> dict:
     if user_match:
         data['user'] = user_match.group(1).strip()
 
+    # Optional Epic (key or name), used by batch mode
+    epic_match = re.search(r"^(?:\*\*)?Epic:(?:\*\*)?\s*(.*)", entry_text, re.IGNORECASE | re.MULTILINE)
+    if epic_match and epic_match.group(1).strip():
+        data['epic'] = epic_match.group(1).strip()
+
     # Description and AC might be multi-line
     description_block_match = re.search(r"(?:\*\*)?Description:(?:\*\*)?(.*?)(?:\*\*)?Acceptance Criteria:(?:\*\*)?", entry_text, re.IGNORECASE | re.DOTALL)
     if description_block_match:
@@ -119,6 +124,33 @@ def parse_pending_entry(entry_text: str) -> dict:
 
     return data
 
+def format_committed_entry(epic_name: str, epic_key: str | None, issue_type: str, issue_key: str,
+                           summary: str, status: str, description: str, acceptance_criteria: str) -> str:
+    """
+    Formats a created issue as an entry for the committed changelog file.
+    """
+    return f"""## Epic: {epic_name} [{epic_key if epic_key else 'N/A'}]
+
+### {issue_type}: {issue_key} - {summary} (Status: {status})
+
+**Description:**
+{description}
+
+## Acceptance Criteria
+{acceptance_criteria}
+---
+"""
+
+def normalize_issue_type(issue_type: str | None, summary: str) -> str:
+    """
+    Returns 'Story' or 'Bug' for an entry's Type field, defaulting to 'Story'.
+    """
+    issue_type = (issue_type or 'Story').capitalize()
+    if issue_type not in ['Story', 'Bug']:
+        logger.warning(f"Unsupported issue type '{issue_type}' found for entry '{summary}'. Defaulting to 'Story'.")
+        issue_type = 'Story'
+    return issue_type
+
 def process_single_entry(entry_data: dict, jira_connector: JiraConnector, user_details: dict) -> tuple[bool, str | None]:
     """
     Interactively processes a single parsed entry.
@@ -139,10 +171,7 @@ def process_single_entry(entry_data: dict, jira_connector: JiraConnector, user_d
         return False, "skipped"
 
     # Determine issue type from entry data, default to 'Story'
-    issue_type = entry_data.get('type', 'Story').capitalize()
-    if issue_type not in ['Story', 'Bug']:
-        logger.warning(f"Unsupported issue type '{issue_type}' found for entry '{final_summary}'. Defaulting to 'Story'.")
-        issue_type = 'Story'
+    issue_type = normalize_issue_type(entry_data.get('type'), final_summary)
     
     logger.info(f"Displaying details for {issue_type}: '{final_summary}'")
     print(f"\n--- Review Parsed {issue_type} Details --- ")
@@ -343,19 +372,156 @@ def process_single_entry(entry_data: dict, jira_connector: JiraConnector, user_d
         logger.warning(f"Failed to automatically transition {issue_type} {new_issue_key} to '{target_final_status}'. It may need manual transition in Jira.")
 
     # Format the committed entry string for the changelog file
-    committed_entry_str = f"""## Epic: {selected_epic_name} [{selected_epic_key if selected_epic_key else 'N/A'}]
+    committed_entry_str = format_committed_entry(
+        selected_epic_name, selected_epic_key, issue_type, new_issue_key,
+        final_summary, current_story_status_for_changelog, final_description, final_ac_str
+    )
+    logger.info(f"Entry for '{final_summary}' processed successfully. Jira Issue Key: {new_issue_key}")
+    return True, committed_entry_str
 
-### {issue_type}: {new_issue_key} - {final_summary} (Status: {current_story_status_for_changelog})
 
-**Description:**
-{final_description}
+def process_entries_batch(entry_texts: list[str], jira_connector: JiraConnector, reporter_assignee: str,
+                          default_epic: str | None = None, create_missing_epics: bool = False,
+                          fix_versions: list[str] | None = None,
+                          allow_duplicates: bool = False) -> tuple[list[str | None], list[str]]:
+    """
+    Non-interactively processes all pending entries.
 
-## Acceptance Criteria
-{final_ac_str}
----
-"""
-    logger.info(f"Entry for '{final_summary}' processed successfully. Jira Issue Key: {new_issue_key}")
-    return True, committed_entry_str
+    Every entry is parsed up front, and the project's Epics, versions and the
+    children of the Epics in use are each loaded once. Issues are then created
+    through Jira's bulk create endpoint and transitioned to Done in parallel.
+
+    Returns (processed, committed): for each entry text, the text if its issue was
+    created or already exists (a skipped duplicate), or None if it stays pending;
+    and the committed changelog entries.
+    """
+    processed: list[str | None] = [None] * len(entry_texts)
+    committed: list[str] = []
+
+    parsed = []
+    for i, entry_text in enumerate(entry_texts):
+        entry_data = parse_pending_entry(entry_text)
+        if not entry_data:
+            logger.warning(f"Skipping entry due to parsing failure: \n{entry_text[:100]}...")
+            continue
+        parsed.append((i, entry_data))
+    if not parsed:
+        return processed, committed
+
+    # --- Resolve Epics against a single fetch ---
+    epics = jira_connector.get_project_epics(project_key=JIRA_PROJECT_KEY)
+    epics_by_key = {epic['key'].upper(): epic for epic in epics}
+    epics_by_name = {epic['summary'].strip().lower(): epic for epic in epics}
+
+    if create_missing_epics and fix_versions:
+        available_versions = {v['name'] for v in jira_connector.get_project_versions(JIRA_PROJECT_KEY)}
+        unknown_versions = [v for v in fix_versions if v not in available_versions]
+        if unknown_versions:
+            logger.warning(f"Ignoring Fix Version(s) not open in {JIRA_PROJECT_KEY}: {', '.join(unknown_versions)}")
+            fix_versions = [v for v in fix_versions if v in available_versions]
+
+    def resolve_epic(epic_ref: str | None) -> tuple[str | None, str]:
+        if not epic_ref:
+            return None, "N/A"
+        epic = epics_by_key.get(epic_ref.upper()) or epics_by_name.get(epic_ref.lower())
+        if epic:
+            return epic['key'], epic['summary']
+        if not create_missing_epics:
+            logger.warning(f"Epic '{epic_ref}' not found in {JIRA_PROJECT_KEY}. Entry will not be linked to an Epic.")
+            return None, "N/A"
+        created_epic_key = jira_connector.create_jira_epic(
+            project_key=JIRA_PROJECT_KEY,
+            epic_name=epic_ref,
+            reporter_username=reporter_assignee,
+            assignee_username=reporter_assignee,
+            fix_versions=fix_versions or None,
+            components=['FeatureCentral']
+        )
+        if not created_epic_key:
+            logger.error(f"Failed to create Epic '{epic_ref}'. Entry will not be linked to an Epic.")
+            return None, "N/A"
+        # Later entries naming the same Epic reuse it
+        epic = {'key': created_epic_key, 'summary': epic_ref}
+        epics_by_key[created_epic_key.upper()] = epic
+        epics_by_name[epic_ref.lower()] = epic
+        return created_epic_key, epic_ref
+
+    entries = []
+    for i, entry_data in parsed:
+        summary = entry_data['draft_summary']
+        epic_key, epic_name = resolve_epic(entry_data.get('epic') or default_epic)
+        entries.append({
+            'index': i,
+            'summary': summary,
+            'issue_type': normalize_issue_type(entry_data.get('type'), summary),
+            'description': entry_data.get('description', 'Description to be added.'),
+            'acceptance_criteria': entry_data.get('acceptance_criteria', '- Acceptance criteria to be added.'),
+            'epic_key': epic_key,
+            'epic_name': epic_name,
+        })
+
+    # --- Duplicate check against each Epic's children, fetched once ---
+    duplicates_in_batch = []
+    if not allow_duplicates:
+        epic_keys = sorted({e['epic_key'] for e in entries if e['epic_key']})
+        children = jira_connector.get_stories_in_epics(JIRA_PROJECT_KEY, epic_keys)
+        existing = {(epic_key, issue['summary'].lower()) for epic_key, issues in children.items() for issue in issues}
+        first_in_batch = {}
+        unique_entries = []
+        for entry in entries:
+            signature = (entry['epic_key'], entry['summary'].lower())
+            if entry['epic_key'] and signature in existing:
+                # Already in Jira: mark it processed so it leaves the pending file
+                logger.warning(f"Skipping '{entry['summary']}': an issue with this summary already exists under Epic {entry['epic_key']}.")
+                processed[entry['index']] = entry_texts[entry['index']]
+                continue
+            if entry['epic_key'] and signature in first_in_batch:
+                # Listed twice in this batch: settled once its first copy is created
+                logger.warning(f"Skipping '{entry['summary']}': listed more than once for Epic {entry['epic_key']}.")
+                duplicates_in_batch.append((entry, first_in_batch[signature]))
+                continue
+            first_in_batch[signature] = entry
+            unique_entries.append(entry)
+        entries = unique_entries
+
+    if not entries:
+        return processed, committed
+
+    # --- Bulk creation ---
+    issue_keys = jira_connector.create_jira_issues_bulk([
+        jira_connector.build_issue_fields(
+            project_key=JIRA_PROJECT_KEY,
+            summary=entry['summary'],
+            description_body=f"{entry['description']}\n\n## Acceptance Criteria\n{entry['acceptance_criteria']}",
+            reporter_username=reporter_assignee,
+            assignee_username=reporter_assignee,
+            epic_link_key=entry['epic_key'],
+            issue_type=entry['issue_type']
+        )
+        for entry in entries
+    ])
+
+    # --- Transition the new issues to 'Done' in parallel ---
+    target_final_status = "Done"
+    created = [(entry, key) for entry, key in zip(entries, issue_keys) if key]
+    transitioned = jira_connector.transition_jira_issues([key for _, key in created], target_final_status)
+
+    for entry, issue_key in created:
+        status = target_final_status if transitioned.get(issue_key) else "Open"
+        if status != target_final_status:
+            logger.warning(f"Failed to automatically transition {issue_key} to '{target_final_status}'. It may need manual transition in Jira.")
+        processed[entry['index']] = entry_texts[entry['index']]
+        committed.append(format_committed_entry(
+            entry['epic_name'], entry['epic_key'], entry['issue_type'], issue_key,
+            entry['summary'], status, entry['description'], entry['acceptance_criteria']
+        ))
+
+    for entry, original in duplicates_in_batch:
+        if processed[original['index']] is not None:
+            processed[entry['index']] = entry_texts[entry['index']]
+
+    logger.info(f"Batch mode created {len(created)} of {len(entry_texts)} pending entries.")
+    return processed, committed
 
 
 def main():
@@ -370,8 +536,17 @@ def main():
     # Make username argument optional (nargs='?'). If not provided, it will be None.
     parser.add_argument("username", nargs='?', default=None, help="Optional: The name of the user whose changelog is to be processed. If omitted, you will be prompted.", choices=user_choices)
     
+    parser.add_argument("--batch", action="store_true", help="Process all pending entries without prompts, creating issues in bulk.")
+    parser.add_argument("--reporter", default=None, help="Batch mode: Jira username for Reporter/Assignee (defaults to JIRA_USERNAME).")
+    parser.add_argument("--epic", default=None, help="Batch mode: Epic key or name for entries without an 'Epic:' line.")
+    parser.add_argument("--create-missing-epics", action="store_true", help="Batch mode: create Epics named by entries that do not exist yet.")
+    parser.add_argument("--fix-versions", default=None, help="Batch mode: comma-separated Fix Versions for newly created Epics.")
+    parser.add_argument("--allow-duplicates", action="store_true", help="Batch mode: create issues even if the Epic already has one with the same summary.")
+    
     args = parser.parse_args()
     selected_user_name = args.username
+    if args.batch and selected_user_name is None:
+        parser.error("username is required with --batch")
 
     if selected_user_name is None:
         # Username not provided via command line, so prompt interactively
@@ -504,36 +679,49 @@ def main():
     # For now, just get a common username for all entries for simplicity in this phase
     # In a real scenario, this might come from the entry or a global config
     default_username = os.environ.get('JIRA_USERNAME', 'default_user') # Fallback
-    user_details = {'username': input(f"Enter Jira username for Reporter/Assignee [{default_username}]: ").strip() or default_username}
+    if args.batch:
+        user_details = {'username': args.reporter or default_username}
+    else:
+        user_details = {'username': input(f"Enter Jira username for Reporter/Assignee [{default_username}]: ").strip() or default_username}
 
 
     processed_successfully_texts = [] # To store original text of successfully processed entries
     all_committed_entries_text = [] # To store the new formatted text for COMMITTED_FILE
 
-    for entry_text in pending_entry_texts:
-        if not entry_text.strip(): # Skip empty blocks if any
-            continue
-        logger.debug(f"Parsing entry: \n{entry_text}")
-        entry_data = parse_pending_entry(entry_text)
-
-        if not entry_data: # Skip if parsing failed
-            logger.warning(f"Skipping entry due to parsing failure: \n{entry_text[:100]}...")
-            processed_successfully_texts.append(None) # Keep placeholder to maintain list size if needed for rewrite logic
-            continue
-
-        success, result_data = process_single_entry(entry_data, jira_conn, user_details)
+    if args.batch:
+        fix_versions = [v.strip() for v in args.fix_versions.split(',') if v.strip()] if args.fix_versions else None
+        processed_successfully_texts, all_committed_entries_text = process_entries_batch(
+            pending_entry_texts, jira_conn, user_details['username'],
+            default_epic=args.epic,
+            create_missing_epics=args.create_missing_epics,
+            fix_versions=fix_versions,
+            allow_duplicates=args.allow_duplicates
+        )
+    else:
+        for entry_text in pending_entry_texts:
+            if not entry_text.strip(): # Skip empty blocks if any
+                continue
+            logger.debug(f"Parsing entry: \n{entry_text}")
+            entry_data = parse_pending_entry(entry_text)
+
+            if not entry_data: # Skip if parsing failed
+                logger.warning(f"Skipping entry due to parsing failure: \n{entry_text[:100]}...")
+                processed_successfully_texts.append(None) # Keep placeholder to maintain list size if needed for rewrite logic
+                continue
+
+            success, result_data = process_single_entry(entry_data, jira_conn, user_details)
         
-        if success:
-            processed_successfully_texts.append(entry_text) # Mark original for removal
-            if result_data and result_data != "skipped": # Ensure it's not a skip
-                 all_committed_entries_text.append(result_data)
-        elif result_data == "skipped":
-            logger.info(f"Entry for '{entry_data.get('draft_summary')}' was skipped by the user.")
-            # Skipped entries are treated as "not processed" for now, so they remain in pending.
-            processed_successfully_texts.append(None) 
-        else: # Failed
-            logger.warning(f"Failed to process entry for '{entry_data.get('draft_summary')}'. It will remain in pending.")
-            processed_successfully_texts.append(None)
+            if success:
+                processed_successfully_texts.append(entry_text) # Mark original for removal
+                if result_data and result_data != "skipped": # Ensure it's not a skip
+                     all_committed_entries_text.append(result_data)
+            elif result_data == "skipped":
+                logger.info(f"Entry for '{entry_data.get('draft_summary')}' was skipped by the user.")
+                # Skipped entries are treated as "not processed" for now, so they remain in pending.
+                processed_successfully_texts.append(None) 
+            else: # Failed
+                logger.warning(f"Failed to process entry for '{entry_data.get('draft_summary')}'. It will remain in pending.")
+                processed_successfully_texts.append(None)
 
 
     # Update COMMITTED_CHANGELOG_JIRA.md
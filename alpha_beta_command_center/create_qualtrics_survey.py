@@ -2,10 +2,18 @@
 import sys
 import os
 import json
+import csv
+import re
+import time
+import copy
+import sqlite3
+import threading
 import requests
 import snowflake.connector
 from datetime import datetime, timedelta # Ensure timedelta is imported if used (not currently, but good practice)
 import traceback # For detailed error logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 
 # --- Configuration --- # (Values from conversation - Ensure these are correct for your env)
 
@@ -38,9 +46,40 @@ SNOWFLAKE_USER_TABLE = f"{SNOWFLAKE_DATABASE_USERS}.{SNOWFLAKE_SCHEMA_USERS}.qua
 SNOWFLAKE_WAREHOUSE_USERS = SNOWFLAKE_WAREHOUSE_RESULTS # UPDATE IF NEEDED
 SNOWFLAKE_ROLE_USERS = SNOWFLAKE_ROLE_RESULTS # UPDATE IF NEEDED
 
+# Local cache of Qualtrics user IDs, refreshed from SNOWFLAKE_USER_TABLE when older than the TTL
+USER_ID_CACHE_PATH = os.environ.get(
+    "QUALTRICS_USER_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "qualtrics_user_ids.db")
+)
+USER_ID_CACHE_TTL_SECONDS = 24 * 60 * 60    # Full table refresh interval
+USER_ID_NEGATIVE_TTL_SECONDS = 60 * 60      # How long an unknown username is remembered
+
 # Qualtrics Base URL for EDITOR links
 QUALTRICS_EDITOR_BASE_URL = "https://athenahealthrc.co1.qualtrics.com" # UPDATE IF NEEDED
 
+# Batch mode: concurrent surveys and the Qualtrics API request rate shared by all of them
+BATCH_MAX_WORKERS = 4                 # UPDATE IF NEEDED
+QUALTRICS_MAX_REQUESTS_PER_SECOND = 5 # Stay well under the Qualtrics per-brand API limits
+
+# Template file, survey name suffix and Snowflake value for each survey type
+SURVEY_TYPES = {
+    "opt-in": ("opt_in_survey.qsf", "Opt_In", "Opt-In"),
+    "opt-out": ("opt_out_survey.qsf", "Opt_Out", "Opt-Out"),
+}
+
+# Columns a batch manifest row must provide (JSON objects or CSV header)
+MANIFEST_FIELDS = [
+    "survey_type", "feature_number", "alpha_beta", "client_facing_feature_name",
+    "requesting_username", "start_date", "end_date"
+]
+
+# Placeholders in the QSF templates, filled per survey
+QSF_PLACEHOLDERS = ("FEATURE_NUMBER", "ALPHA_BETA", "CLIENT_FACING_FEATURE_NAME")
+QSF_PLACEHOLDER_PATTERN = re.compile("(" + "|".join(QSF_PLACEHOLDERS) + ")")
+
+# Placeholder used when a client-facing feature name is blank
+MISSING_FEATURE_NAME_TEXT = "**PLEASE UPDATE WITH CLIENT FACING FEATURE NAME**"
+
 # --- Environment Variable Names (Script expects these to be set externally) ---
 ENV_QUALTRICS_TOKEN = "QUALTRICS_API_TOKEN"         # Service Account Token
 ENV_QUALTRICS_DC_ID = "QUALTRICS_DATACENTER_ID"     # Service Account Datacenter ID
@@ -52,6 +91,21 @@ def print_error(msg):
     """Prints an error message to stderr."""
     print(f"ERROR: {msg}", file=sys.stderr)
 
+class RateLimiter:
+    """Spaces out API calls made from several threads to at most `rate` per second."""
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self.next_slot = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            slot = max(self.next_slot, now)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
 def load_qsf(qsf_path: str) -> dict:
     """Loads QSF file content."""
     try:
@@ -67,81 +121,104 @@ def load_qsf(qsf_path: str) -> dict:
         print_error(f"Unexpected error loading template file {qsf_path}: {e}")
         return None
 
-def update_placeholders(qsf_dict: dict, feature_number: str, alpha_beta: str, client_facing_feature_name: str) -> dict:
-    """Replaces placeholders in the QSF dictionary (as a string)."""
-    if not qsf_dict:
-        return None
-    try:
-        qsf_str = json.dumps(qsf_dict)
-        # Perform replacements using case-sensitive matches from template
-        qsf_str = qsf_str.replace("FEATURE_NUMBER", feature_number)
-        qsf_str = qsf_str.replace("ALPHA_BETA", alpha_beta)
-        qsf_str = qsf_str.replace("CLIENT_FACING_FEATURE_NAME", client_facing_feature_name)
-        return json.loads(qsf_str)
-    except Exception as e:
-        print_error(f"Error updating placeholders in QSF data: {e}")
-        return None
+class CompiledQsf:
+    """
+    A parsed QSF template with the JSON paths of its placeholder strings and of the
+    Survey Options ('SO') payload, so each survey writes only those slots.
+    """
+    def __init__(self, qsf_dict: dict, placeholder_slots: list, survey_options_path: tuple):
+        self.qsf_dict = qsf_dict
+        # (path, pieces): pieces alternate literal text and placeholder names
+        self.placeholder_slots = placeholder_slots
+        self.survey_options_path = survey_options_path
+
+    def render(self, feature_number: str, alpha_beta: str, client_facing_feature_name: str,
+               start_date_str: str, end_date_str: str) -> dict:
+        """
+        Returns the QSF for one survey: placeholders filled, SurveyEntry dates set and
+        SurveyExpiration turned 'on' in Survey Options. Expects dates in 'YYYY-MM-DD' format.
+
+        Only the containers on the paths being written are copied; the rest of the
+        document is shared with the template, which is never modified.
+        """
+        values = {
+            "FEATURE_NUMBER": feature_number,
+            "ALPHA_BETA": alpha_beta,
+            "CLIENT_FACING_FEATURE_NAME": client_facing_feature_name,
+        }
+        qsf = dict(self.qsf_dict)
+        copies = {(): qsf}
+        for path, pieces in self.placeholder_slots:
+            # Odd positions hold placeholder names
+            text = "".join(values[piece] if i % 2 else piece for i, piece in enumerate(pieces))
+            _set_path(qsf, path, text, copies)
 
-def update_qsf_dates(qsf_dict: dict, start_date_str: str, end_date_str: str) -> dict:
+        # Format dates to 'YYYY-MM-DD HH:MM:SS' required by Qualtrics API/QSF format.
+        _set_path(qsf, ("SurveyEntry", "SurveyStartDate"), f"{start_date_str} 00:00:00", copies)
+        _set_path(qsf, ("SurveyEntry", "SurveyExpirationDate"), f"{end_date_str} 15:00:00", copies) # 3pm of the selected day
+        _set_path(qsf, self.survey_options_path + ("SurveyExpiration",), "on", copies)
+        return qsf
+
+
+def _set_path(qsf: dict, path: tuple, value, copies: dict):
+    """Sets the value at path, shallow-copying each container on the way the first time it is reached."""
+    node = qsf
+    for depth in range(1, len(path)):
+        prefix = path[:depth]
+        child = copies.get(prefix)
+        if child is None:
+            child = copy.copy(node[path[depth - 1]])
+            node[path[depth - 1]] = child
+            copies[prefix] = child
+        node = child
+    node[path[-1]] = value
+
+
+def compile_qsf(qsf_dict: dict) -> CompiledQsf:
     """
-    Updates SurveyStartDate, SurveyExpirationDate in SurveyEntry,
-    and sets SurveyExpiration to 'on' in Survey Options.
-    Expects date strings in 'YYYY-MM-DD' format.
+    Compiles a loaded QSF template, recording where placeholders and the Survey Options payload are.
+    Returns None if the template lacks 'SurveyEntry' or an 'SO' element with a Payload.
     """
     if not qsf_dict:
-        print_error("Cannot update dates: Invalid QSF data provided.")
         return None
-
-    try:
-        # Format dates to 'YYYY-MM-DD HH:MM:SS' required by Qualtrics API/QSF format.
-        # Using 00:00:00 for start and 23:59:59 for end to cover the full days selected.
-        start_datetime_str = f"{start_date_str} 00:00:00"
-        end_datetime_str = f"{end_date_str} 15:00:00" # 3pm of the selected day
-
-        # 1. Update SurveyEntry dates
-        if 'SurveyEntry' in qsf_dict and isinstance(qsf_dict['SurveyEntry'], dict):
-            qsf_dict['SurveyEntry']['SurveyStartDate'] = start_datetime_str
-            qsf_dict['SurveyEntry']['SurveyExpirationDate'] = end_datetime_str
-            print(f"INFO: Set QSF SurveyStartDate to {start_datetime_str}", file=sys.stderr)
-            print(f"INFO: Set QSF SurveyExpirationDate to {end_datetime_str}", file=sys.stderr)
-        else:
-            print_error("QSF structure error: 'SurveyEntry' dictionary not found.")
-            return None
-
-        # 2. Update Survey Options to enable expiration
-        so_element_updated = False
-        if 'SurveyElements' in qsf_dict and isinstance(qsf_dict['SurveyElements'], list):
-            for element in qsf_dict['SurveyElements']:
-                # Check element type and existence of Payload dictionary
-                if element.get('Element') == 'SO' and 'Payload' in element and isinstance(element['Payload'], dict):
-                    element['Payload']['SurveyExpiration'] = 'on'
-                    so_element_updated = True
-                    print("INFO: Set QSF Survey Options 'SurveyExpiration' to 'on'", file=sys.stderr)
-                    break # Assume only one SO element needs updating
-        else:
-             print_error("QSF structure error: 'SurveyElements' not found or is not a list.")
-             return None
-
-        if not so_element_updated:
-            print_error("QSF structure error: Survey Options ('SO' element with 'Payload') not found.")
-            # This is critical for dates to work, so consider it a failure.
-            return None
-
-        return qsf_dict
-
-    except KeyError as ke:
-        print_error(f"QSF structure error updating dates: Missing expected key {ke}")
+    if not isinstance(qsf_dict.get('SurveyEntry'), dict):
+        print_error("QSF structure error: 'SurveyEntry' dictionary not found.")
         return None
-    except Exception as e:
-        print_error(f"An unexpected error occurred while updating QSF dates: {e}")
-        print_error(traceback.format_exc(), file=sys.stderr)
+    if not isinstance(qsf_dict.get('SurveyElements'), list):
+        print_error("QSF structure error: 'SurveyElements' not found or is not a list.")
         return None
 
+    survey_options_path = None
+    for index, element in enumerate(qsf_dict['SurveyElements']):
+        if element.get('Element') == 'SO' and isinstance(element.get('Payload'), dict):
+            survey_options_path = ('SurveyElements', index, 'Payload')
+            break # Assume only one SO element needs updating
+    if survey_options_path is None:
+        # This is critical for dates to work, so consider it a failure.
+        print_error("QSF structure error: Survey Options ('SO' element with 'Payload') not found.")
+        return None
 
-def upload_survey(qsf_dict: dict, survey_name: str):
+    placeholder_slots = []
+    pending = [((), qsf_dict)]
+    while pending:
+        path, node = pending.pop()
+        items = node.items() if isinstance(node, dict) else enumerate(node)
+        for key, value in items:
+            if isinstance(value, str):
+                pieces = QSF_PLACEHOLDER_PATTERN.split(value)
+                if len(pieces) > 1:
+                    placeholder_slots.append((path + (key,), pieces))
+            elif isinstance(value, (dict, list)):
+                pending.append((path + (key,), value))
+    print(f"INFO: Compiled QSF template with {len(placeholder_slots)} placeholder slot(s).", file=sys.stderr)
+    return CompiledQsf(qsf_dict, placeholder_slots, survey_options_path)
+
+
+def upload_survey(qsf_dict: dict, survey_name: str, rate_limiter: RateLimiter = None):
     """
     Creates survey in Qualtrics using the service account's API token.
     Returns (survey_id, editor_url, live_url, datacenter_id) on success, else (None, None, None, None).
+    An optional rate_limiter throttles the API call when surveys are created concurrently.
     """
     api_token = os.environ.get(ENV_QUALTRICS_TOKEN)
     datacenter_id = os.environ.get(ENV_QUALTRICS_DC_ID)
@@ -170,6 +247,8 @@ def upload_survey(qsf_dict: dict, survey_name: str):
 
     print(f"INFO: Creating Qualtrics survey '{survey_name}' via API ({api_call_url})...", file=sys.stderr)
     try:
+        if rate_limiter:
+            rate_limiter.wait()
         resp = requests.post(api_call_url, headers=headers, files=files, timeout=60) # Increased timeout
         resp.raise_for_status() # Raise HTTPError for bad responses (4xx or 5xx)
 
@@ -194,17 +273,17 @@ def upload_survey(qsf_dict: dict, survey_name: str):
         try:
             # Attempt to get more detailed error from Qualtrics response
             err_content = http_err.response.json()
-            print_error(f"Qualtrics Response Content: {json.dumps(err_content)}", file=sys.stderr)
+            print_error(f"Qualtrics Response Content: {json.dumps(err_content)}")
         except Exception:
             # Fallback if response is not JSON
-            print_error(f"Qualtrics Non-JSON Response: {http_err.response.text[:500]}", file=sys.stderr) # Log first 500 chars
+            print_error(f"Qualtrics Non-JSON Response: {http_err.response.text[:500]}") # Log first 500 chars
         return None, None, None, None
     except requests.exceptions.RequestException as req_err:
         print_error(f"Qualtrics survey creation failed (Request Exception): {req_err}")
         return None, None, None, None
     except Exception as e:
         print_error(f"An unexpected error occurred during survey upload: {e}")
-        print_error(traceback.format_exc(), file=sys.stderr) # Log full traceback for unexpected errors
+        print_error(traceback.format_exc()) # Log full traceback for unexpected errors
         return None, None, None, None
 
 
@@ -241,52 +320,189 @@ def get_snowflake_connection(db, schema, warehouse, role):
         return None
 
 
-def get_qualtrics_user_id(username: str):
-    """Looks up Qualtrics User ID (UR_...) from Snowflake using case-insensitive match."""
-    user_qualtrics_id = None
+def query_qualtrics_user_ids(usernames: list = None) -> dict:
+    """
+    Looks up Qualtrics User IDs (UR_...) in Snowflake using case-insensitive match.
+    Returns a dict keyed by upper-cased username, for the given usernames or for every
+    user when usernames is None. Returns None if the lookup failed.
+    """
     conn = get_snowflake_connection(SNOWFLAKE_DATABASE_USERS, SNOWFLAKE_SCHEMA_USERS, SNOWFLAKE_WAREHOUSE_USERS, SNOWFLAKE_ROLE_USERS)
     if not conn:
-        print_error(f"Cannot lookup Qualtrics User ID for '{username}': Snowflake connection failed.")
+        print_error("Cannot lookup Qualtrics User IDs: Snowflake connection failed.")
         return None
 
     try:
-        print(f"INFO: Looking up Qualtrics ID for username: '{username}' in {SNOWFLAKE_USER_TABLE}", file=sys.stderr)
-
-        # Using UPPER for case-insensitive matching on USER_NAME column. Assumes ID column is stored correctly.
         # Column names "ID" and "USER_NAME" are quoted as they were likely created case-sensitively in Snowflake.
         # Ensure these exact column names exist in your table.
-        sql = f'SELECT "ID" FROM {SNOWFLAKE_USER_TABLE} WHERE UPPER("USER_NAME") = UPPER(%s) LIMIT 1'
-
+        sql = f'SELECT UPPER("USER_NAME"), "ID" FROM {SNOWFLAKE_USER_TABLE}'
+        params = []
+        if usernames is not None:
+            params = sorted({username.upper() for username in usernames})
+            sql += f' WHERE UPPER("USER_NAME") IN ({", ".join(["%s"] * len(params))})'
+        print(f"INFO: Looking up Qualtrics IDs for {len(params) if usernames is not None else 'all'} username(s) in {SNOWFLAKE_USER_TABLE}", file=sys.stderr)
+
+        user_ids = {}
         with conn.cursor() as cur:
-            cur.execute(sql, (username,))
-            result = cur.fetchone()
-
-            if result and result[0] and isinstance(result[0], str) and result[0].startswith("UR_"):
-                user_qualtrics_id = result[0]
-                print(f"INFO: Found Qualtrics User ID: {user_qualtrics_id}", file=sys.stderr)
-            elif result:
-                 # Found a row but the ID format is wrong
-                 print(f"WARN: Found a value for user '{username}' in {SNOWFLAKE_USER_TABLE}, but it doesn't look like a valid Qualtrics User ID (expected UR_...): '{result[0]}'", file=sys.stderr)
-            else:
-                # No row found
-                print(f"WARN: No Qualtrics User ID found for username: '{username}' in {SNOWFLAKE_USER_TABLE}", file=sys.stderr)
+            cur.execute(sql, params)
+            for user_name_upper, qualtrics_id in cur.fetchall():
+                if isinstance(qualtrics_id, str) and qualtrics_id.startswith("UR_"):
+                    user_ids.setdefault(user_name_upper, qualtrics_id)
+                elif usernames is not None:
+                    # Found a row but the ID format is wrong
+                    print(f"WARN: Found a value for user '{user_name_upper}' in {SNOWFLAKE_USER_TABLE}, but it doesn't look like a valid Qualtrics User ID (expected UR_...): '{qualtrics_id}'", file=sys.stderr)
+        return user_ids
 
     except snowflake.connector.Error as sf_err:
-        print_error(f"Snowflake Error during user lookup for '{username}': {sf_err}")
+        print_error(f"Snowflake Error during user lookup: {sf_err}")
     except Exception as e:
-        print_error(f"Unexpected error during Snowflake user lookup for '{username}': {e}")
+        print_error(f"Unexpected error during Snowflake user lookup: {e}")
     finally:
         if conn:
             conn.close()
-            # print(f"INFO: Closed Snowflake connection for user lookup.", file=sys.stderr) # Optional
+    return None
+
+
+class QualtricsUserIdCache:
+    """
+    SQLite cache of Qualtrics user IDs keyed by upper-cased username.
+    A NULL ID records a username that was looked up and not found.
+    """
+    def __init__(self, db_path: str = USER_ID_CACHE_PATH):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS qualtrics_user_ids (
+                    username TEXT PRIMARY KEY,
+                    qualtrics_id TEXT,
+                    fetched_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS cache_state (
+                    name TEXT PRIMARY KEY,
+                    value REAL NOT NULL
+                );
+            """)
+
+    @contextmanager
+    def _connect(self):
+        """Opens a connection, committing on success and always closing it."""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def is_stale(self) -> bool:
+        """Returns True if the full user list was never loaded or is older than USER_ID_CACHE_TTL_SECONDS."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM cache_state WHERE name = 'last_full_refresh'").fetchone()
+        return row is None or time.time() - row[0] > USER_ID_CACHE_TTL_SECONDS
+
+    def lookup(self, usernames: list, allow_expired: bool = False) -> dict:
+        """
+        Returns {username: qualtrics_id or None} for the usernames with a live cache entry.
+        Unknown-user entries expire after USER_ID_NEGATIVE_TTL_SECONDS, others after USER_ID_CACHE_TTL_SECONDS.
+        """
+        keys = sorted({username.upper() for username in usernames})
+        if not keys:
+            return {}
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT username, qualtrics_id, fetched_at FROM qualtrics_user_ids WHERE username IN ({', '.join('?' * len(keys))})",
+                keys
+            ).fetchall()
+        now = time.time()
+        entries = {}
+        for username, qualtrics_id, fetched_at in rows:
+            ttl = USER_ID_CACHE_TTL_SECONDS if qualtrics_id else USER_ID_NEGATIVE_TTL_SECONDS
+            if allow_expired or now - fetched_at <= ttl:
+                entries[username] = qualtrics_id
+        return {username: entries[username.upper()] for username in usernames if username.upper() in entries}
+
+    def store(self, entries: dict, full_refresh: bool = False):
+        """
+        Stores {username: qualtrics_id or None}. A full refresh replaces every known ID.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            if full_refresh:
+                conn.execute("DELETE FROM qualtrics_user_ids WHERE qualtrics_id IS NOT NULL")
+                conn.execute("INSERT OR REPLACE INTO cache_state (name, value) VALUES ('last_full_refresh', ?)", (now,))
+            conn.executemany(
+                "INSERT OR REPLACE INTO qualtrics_user_ids (username, qualtrics_id, fetched_at) VALUES (?, ?, ?)",
+                [(username.upper(), qualtrics_id, now) for username, qualtrics_id in entries.items()]
+            )
+
+
+def warm_qualtrics_user_cache(cache: QualtricsUserIdCache, force: bool = False) -> bool:
+    """
+    Reloads the whole qualtrics_user table into the cache with one SELECT if the cache is stale.
+    Returns True if the cache was refreshed by this call.
+    """
+    if not force and not cache.is_stale():
+        return False
+    user_ids = query_qualtrics_user_ids()
+    if user_ids is None:
+        print_error("Could not refresh the Qualtrics user ID cache; falling back to per-user lookups.")
+        return False
+    cache.store(user_ids, full_refresh=True)
+    print(f"INFO: Refreshed Qualtrics user ID cache with {len(user_ids)} users.", file=sys.stderr)
+    return True
 
-    return user_qualtrics_id
 
+def get_qualtrics_user_ids(usernames: list) -> dict:
+    """
+    Resolves Qualtrics User IDs (UR_...) for several usernames, from the local cache where possible.
 
-def share_survey_with_user(survey_id, user_id_to_share_with):
+    The cache is pre-warmed from the full qualtrics_user table when stale; usernames it does not
+    know are looked up in Snowflake with one query. Returns a dict keyed by the usernames as given;
+    users without a valid ID are left out.
+    """
+    if not usernames:
+        return {}
+    try:
+        cache = QualtricsUserIdCache()
+    except sqlite3.Error as cache_err:
+        print_error(f"Qualtrics user ID cache unavailable ({cache_err}); looking up users in Snowflake.")
+        found = query_qualtrics_user_ids(usernames) or {}
+        return {username: found[username.upper()] for username in usernames if username.upper() in found}
+
+    refreshed = warm_qualtrics_user_cache(cache)
+    resolved = cache.lookup(usernames)
+    misses = [username for username in usernames if username not in resolved]
+    if misses and refreshed:
+        # The table was just loaded in full, so these users do not exist
+        cache.store({username: None for username in misses})
+        resolved.update({username: None for username in misses})
+    elif misses:
+        found = query_qualtrics_user_ids(misses)
+        if found is None:
+            # Snowflake unavailable: an expired cache entry is better than none
+            resolved.update(cache.lookup(misses, allow_expired=True))
+        else:
+            entries = {username: found.get(username.upper()) for username in misses}
+            cache.store(entries)
+            resolved.update(entries)
+
+    for username in usernames:
+        if resolved.get(username):
+            print(f"INFO: Found Qualtrics User ID for '{username}': {resolved[username]}", file=sys.stderr)
+        else:
+            print(f"WARN: No Qualtrics User ID found for username: '{username}' in {SNOWFLAKE_USER_TABLE}", file=sys.stderr)
+    return {username: qualtrics_id for username, qualtrics_id in resolved.items() if qualtrics_id}
+
+
+def get_qualtrics_user_id(username: str):
+    """Looks up Qualtrics User ID (UR_...) for a username (case-insensitive), using the local cache."""
+    return get_qualtrics_user_ids([username]).get(username)
+
+
+def share_survey_with_user(survey_id, user_id_to_share_with, rate_limiter: RateLimiter = None):
     """
     Shares the survey with the specified User ID using the service token
     and the /permissions/collaborations endpoint. Grants broad edit/manage permissions.
+    An optional rate_limiter throttles the API call when surveys are shared concurrently.
     """
     api_token = os.environ.get(ENV_QUALTRICS_TOKEN)
     datacenter_id = os.environ.get(ENV_QUALTRICS_DC_ID) # Service account's DC
@@ -356,6 +572,8 @@ def share_survey_with_user(survey_id, user_id_to_share_with):
 
     try:
         # Use POST method for adding collaboration
+        if rate_limiter:
+            rate_limiter.wait()
         response = requests.post(share_url, headers=headers, json=payload, timeout=30)
         response.raise_for_status() # Will raise HTTPError on 4xx/5xx responses
 
@@ -385,6 +603,16 @@ def share_survey_with_user(survey_id, user_id_to_share_with):
 
 def write_to_snowflake(data_to_insert: dict):
     """Writes the survey creation record to the Snowflake RESULTS table."""
+    return write_records_to_snowflake([data_to_insert])
+
+
+def write_records_to_snowflake(records: list):
+    """
+    Writes survey creation records to the Snowflake RESULTS table in a single multi-row INSERT.
+    All records must have the same keys.
+    """
+    if not records:
+        return True
     success = False
     conn = get_snowflake_connection(SNOWFLAKE_DATABASE_RESULTS, SNOWFLAKE_SCHEMA_RESULTS, SNOWFLAKE_WAREHOUSE_RESULTS, SNOWFLAKE_ROLE_RESULTS)
     if not conn:
@@ -392,29 +620,31 @@ def write_to_snowflake(data_to_insert: dict):
         return False
 
     try:
-        print(f"INFO: Preparing to insert record into {SNOWFLAKE_TARGET_TABLE_RESULTS}...", file=sys.stderr)
+        print(f"INFO: Preparing to insert {len(records)} record(s) into {SNOWFLAKE_TARGET_TABLE_RESULTS}...", file=sys.stderr)
 
         # Define columns to insert - ensure these match your Snowflake table definition!
         # Use sorted keys for consistent order, quote names for case sensitivity
-        cols = sorted(data_to_insert.keys())
+        cols = sorted(records[0].keys())
         quoted_cols = [f'"{c.upper()}"' for c in cols] # Assuming Snowflake columns are uppercase
 
-        # Add the timestamp column explicitly if it's not in data_to_insert
+        # Add the timestamp column explicitly if it's not in the records
         # Assuming the column name is CREATED_TIMESTAMP_UTC in Snowflake
         timestamp_col_name = '"CREATED_TIMESTAMP_UTC"'
-        if timestamp_col_name not in quoted_cols:
-             quoted_cols.append(timestamp_col_name)
-             # Add placeholder for the timestamp value
-             placeholders = ", ".join(["%s"] * len(cols)) + ", %s"
-             current_time_utc = datetime.utcnow()
-             vals = [data_to_insert[key] for key in cols] + [current_time_utc]
-        else:
-            # Timestamp is already in the data_to_insert dict
-             placeholders = ", ".join(["%s"] * len(quoted_cols))
-             vals = [data_to_insert[key] for key in cols] # Order must match quoted_cols
-
-
-        sql = f'INSERT INTO {SNOWFLAKE_TARGET_TABLE_RESULTS} ({", ".join(quoted_cols)}) VALUES ({placeholders})'
+        add_timestamp = timestamp_col_name not in quoted_cols
+        if add_timestamp:
+            quoted_cols.append(timestamp_col_name)
+        current_time_utc = datetime.utcnow()
+
+        # One "(%s, ...)" group per record; values are flattened in the same order
+        row_placeholders = "(" + ", ".join(["%s"] * len(quoted_cols)) + ")"
+        vals = []
+        for record in records:
+            vals.extend(record[key] for key in cols) # Order must match quoted_cols
+            if add_timestamp:
+                vals.append(current_time_utc)
+
+        sql = (f'INSERT INTO {SNOWFLAKE_TARGET_TABLE_RESULTS} ({", ".join(quoted_cols)}) '
+               f'VALUES {", ".join([row_placeholders] * len(records))}')
 
         print(f"INFO: Executing Snowflake INSERT statement...", file=sys.stderr)
         # print(f"[DEBUG] SQL: {sql}", file=sys.stderr)
@@ -424,7 +654,7 @@ def write_to_snowflake(data_to_insert: dict):
             cur.execute(sql, vals)
 
         conn.commit()
-        print(f"INFO: Record successfully inserted into Snowflake table {SNOWFLAKE_TARGET_TABLE_RESULTS}.", file=sys.stderr)
+        print(f"INFO: {len(records)} record(s) successfully inserted into Snowflake table {SNOWFLAKE_TARGET_TABLE_RESULTS}.", file=sys.stderr)
         success = True
 
     except snowflake.connector.Error as sf_err:
@@ -451,12 +681,208 @@ def write_to_snowflake(data_to_insert: dict):
     return success
 
 
+def get_survey_type_config(survey_type_input: str):
+    """
+    Returns (template_filename, survey_type_suffix, survey_type_data) for 'Opt-In' or 'Opt-Out', else None.
+    """
+    return SURVEY_TYPES.get((survey_type_input or "").strip().lower())
+
+
+def share_with_default_collaborators(survey_id, user_id_for_sharing, rate_limiter: RateLimiter = None):
+    """
+    Shares the survey with DEFAULT_COLLABORATOR_IDS, skipping the requesting user.
+    Returns a list of (collaborator_id, status) tuples.
+    """
+    default_collaborator_status = []
+    for collab_id in DEFAULT_COLLABORATOR_IDS:
+        # Skip if this is the same as the requesting user (avoid duplicate sharing)
+        if collab_id == user_id_for_sharing:
+            print(f"INFO: Skipping default collaborator {collab_id} - same as requesting user", file=sys.stderr)
+            default_collaborator_status.append((collab_id, "skipped - requesting user"))
+            continue
+
+        print(f"INFO: Sharing survey {survey_id} with default collaborator {collab_id}...", file=sys.stderr)
+        sharing_result = share_survey_with_user(survey_id, collab_id, rate_limiter)
+        status = "success" if sharing_result else "failed"
+        default_collaborator_status.append((collab_id, status))
+
+        if not sharing_result:
+            print_error(f"WARNING: Failed to share survey {survey_id} with default collaborator {collab_id}")
+    return default_collaborator_status
+
+
+# --- Batch Mode ---
+def load_manifest(manifest_path: str) -> list:
+    """
+    Loads a batch manifest: a JSON list of objects, or a CSV file with a header row, using MANIFEST_FIELDS.
+    """
+    try:
+        with open(manifest_path, "r", encoding="utf-8-sig", newline="") as f:
+            if manifest_path.lower().endswith(".csv"):
+                entries = list(csv.DictReader(f))
+            else:
+                entries = json.load(f)
+    except FileNotFoundError:
+        print_error(f"Manifest file not found at: {manifest_path}")
+        return None
+    except (json.JSONDecodeError, csv.Error) as e:
+        print_error(f"Error parsing manifest file {manifest_path}: {e}")
+        return None
+    if not isinstance(entries, list) or not all(isinstance(entry, dict) for entry in entries):
+        print_error(f"Manifest {manifest_path} must contain a list of survey entries.")
+        return None
+    return entries
+
+
+def validate_manifest_entry(entry: dict) -> dict:
+    """
+    Normalizes one manifest entry, raising ValueError if a field is missing or invalid.
+    """
+    values = {field: str(entry.get(field) or "").strip() for field in MANIFEST_FIELDS}
+    missing = [field for field in MANIFEST_FIELDS if not values[field] and field != "client_facing_feature_name"]
+    if missing:
+        raise ValueError(f"Missing value(s) for: {', '.join(missing)}")
+    if not get_survey_type_config(values["survey_type"]):
+        raise ValueError(f"Invalid survey_type '{values['survey_type']}'. Must be 'Opt-In' or 'Opt-Out'.")
+    try:
+        start_dt = datetime.strptime(values["start_date"], '%Y-%m-%d')
+        end_dt = datetime.strptime(values["end_date"], '%Y-%m-%d')
+    except ValueError as date_err:
+        raise ValueError(f"Invalid date format: {date_err}. Expected YYYY-MM-DD.") from date_err
+    if end_dt < start_dt:
+        raise ValueError("End date cannot be before start date.")
+    if not values["client_facing_feature_name"]:
+        values["client_facing_feature_name"] = MISSING_FEATURE_NAME_TEXT
+    return values
+
+
+def provision_survey(entry: dict, template: CompiledQsf, user_id_for_sharing, rate_limiter: RateLimiter):
+    """
+    Fills the template for one validated manifest entry, uploads the survey and shares it.
+    Returns (result, record_data); record_data is None if the survey was not created.
+    """
+    _, survey_type_suffix, survey_type_data = get_survey_type_config(entry["survey_type"])
+    final_survey_name = f"{entry['feature_number']}-{entry['alpha_beta']}-{survey_type_suffix}"
+    result = {"surveyName": final_survey_name, "success": False, "surveyId": None, "surveyUrl": None, "sharingStatus": None}
+
+    qsf = template.render(entry["feature_number"], entry["alpha_beta"], entry["client_facing_feature_name"],
+                          entry["start_date"], entry["end_date"])
+    qualtrics_survey_id, editor_url, live_url, dc_id = upload_survey(qsf, final_survey_name, rate_limiter)
+    if not qualtrics_survey_id:
+        result["message"] = "Failed to create survey in Qualtrics."
+        return result, None
+
+    if user_id_for_sharing:
+        sharing_successful = share_survey_with_user(qualtrics_survey_id, user_id_for_sharing, rate_limiter)
+        sharing_status = "success" if sharing_successful else "failed"
+        if not sharing_successful:
+            print_error(f"CRITICAL WARNING: Survey {qualtrics_survey_id} created, but FAILED to share automatically with {user_id_for_sharing} ({entry['requesting_username']}). Manual sharing may be required.")
+    else:
+        sharing_status = "user_not_found"
+    share_with_default_collaborators(qualtrics_survey_id, user_id_for_sharing, rate_limiter)
+
+    result.update({
+        "success": True,
+        "surveyId": qualtrics_survey_id,
+        "surveyUrl": editor_url,
+        "sharingStatus": sharing_status,
+        "message": "Survey created."
+    })
+    record_data = {
+        "FEATURE_NUMBER": entry["feature_number"],
+        "ALPHA_BETA": entry["alpha_beta"],
+        "CLIENT_FACING_FEATURE_NAME": entry["client_facing_feature_name"],
+        "SURVEY_TYPE": survey_type_data,
+        "FINAL_SURVEY_NAME": final_survey_name,
+        "QUALTRICS_SURVEY_ID": qualtrics_survey_id,
+        "QUALTRICS_SURVEY_URL": live_url,
+        "REQUESTING_USER": entry["requesting_username"],
+        "SHARING_STATUS": sharing_status,
+        "SURVEY_START_DATE": entry["start_date"],
+        "SURVEY_END_DATE": entry["end_date"],
+    }
+    return result, record_data
+
+
+def main_batch(manifest_path: str):
+    """
+    Creates every survey in a manifest in one run.
+
+    Each template is loaded once, user IDs are looked up in one query, surveys are
+    uploaded and shared concurrently under QUALTRICS_MAX_REQUESTS_PER_SECOND, and
+    all result rows are written in one INSERT. Prints a JSON summary to stdout.
+    """
+    entries = load_manifest(manifest_path)
+    if entries is None:
+        print(json.dumps({"success": False, "message": f"Could not load manifest '{manifest_path}'."}))
+        sys.exit(1)
+
+    # Validate everything up front so a bad row is reported before any survey is created
+    results = [None] * len(entries)
+    valid = []
+    for index, entry in enumerate(entries):
+        try:
+            valid.append((index, validate_manifest_entry(entry)))
+        except ValueError as ve:
+            print_error(f"Manifest entry {index + 1} is invalid: {ve}")
+            results[index] = {"success": False, "message": f"Invalid manifest entry: {ve}"}
+    print(f"INFO: Batch manifest {manifest_path}: {len(valid)} valid of {len(entries)} entries.", file=sys.stderr)
+
+    templates = {}
+    for template_filename, _, _ in {get_survey_type_config(entry["survey_type"]) for _, entry in valid}:
+        templates[template_filename] = compile_qsf(load_qsf(os.path.join(BASE_TEMPLATE_PATH, template_filename)))
+
+    user_ids = get_qualtrics_user_ids(sorted({entry["requesting_username"] for _, entry in valid}))
+    rate_limiter = RateLimiter(QUALTRICS_MAX_REQUESTS_PER_SECOND)
+
+    def run(entry):
+        template = templates.get(get_survey_type_config(entry["survey_type"])[0])
+        if not template:
+            return {"success": False, "message": "Could not load template file."}, None
+        # One failed entry is reported as a failed result; the rest of the batch still runs and is recorded
+        try:
+            return provision_survey(entry, template, user_ids.get(entry["requesting_username"]), rate_limiter)
+        except Exception as e:
+            print_error(f"Unexpected error provisioning survey for feature {entry['feature_number']}: {e}")
+            print_error(traceback.format_exc())
+            return {"success": False, "message": f"Unexpected error: {e}"}, None
+
+    records = []
+    with ThreadPoolExecutor(max_workers=BATCH_MAX_WORKERS) as executor:
+        for (index, entry), (result, record_data) in zip(valid, executor.map(run, [entry for _, entry in valid])):
+            results[index] = result
+            if record_data:
+                records.append(record_data)
+
+    created = sum(1 for result in results if result["success"])
+    snowflake_write_success = write_records_to_snowflake(records)
+    if not snowflake_write_success:
+        print_error("CRITICAL WARNING: Failed to write survey details to Snowflake results table (logged above). Records may be missing.")
+
+    all_succeeded = created == len(entries) and snowflake_write_success
+    print(json.dumps({
+        "success": all_succeeded,
+        "created": created,
+        "failed": len(entries) - created,
+        "results": results,
+        "message": f"Created {created} of {len(entries)} surveys."
+    }))
+    print("INFO: Batch finished.", file=sys.stderr)
+    sys.exit(0 if all_succeeded else 1)
+
+
 # --- Main Execution Logic ---
 def main():
+    # Batch mode: python create_qualtrics_survey.py --batch <manifest.json|manifest.csv>
+    if len(sys.argv) == 3 and sys.argv[1] == "--batch":
+        main_batch(sys.argv[2])
+        return
+
     # Expect 8 arguments now: script_name, type, feature, stage, name, user, start_date, end_date
     expected_arg_count = 8
     if len(sys.argv) != expected_arg_count:
         print_error(f"Usage: python {sys.argv[0]} <survey_type> <FEATURE_NUMBER> <ALPHA_BETA> <CLIENT_FACING_FEATURE_NAME> <requesting_username> <start_date YYYY-MM-DD> <end_date YYYY-MM-DD>")
+        print_error(f"   or: python {sys.argv[0]} --batch <manifest.json|manifest.csv>")
         # Output JSON error message to stdout for the calling process (Node.js)
         print(json.dumps({
             "success": False,
@@ -493,7 +919,7 @@ def main():
 
         # --- New fallback for blank client-facing feature name ---
         if not client_facing_feature_name_arg.strip():
-            client_facing_feature_name_arg = "**PLEASE UPDATE WITH CLIENT FACING FEATURE NAME**"
+            client_facing_feature_name_arg = MISSING_FEATURE_NAME_TEXT
             print_error("CLIENT_FACING_FEATURE_NAME was blank; using placeholder text.")
 
     except IndexError:
@@ -508,19 +934,15 @@ def main():
     except Exception as e:
         # Catch any other unexpected errors during argument parsing
         print_error(f"Unexpected error parsing command-line arguments: {e}")
-        print_error(traceback.format_exc(), file=sys.stderr)
+        print_error(traceback.format_exc())
         print(json.dumps({"success": False, "message": f"Internal error processing arguments: {e}"}))
         sys.exit(1)
 
     # --- Determine Template Based on survey_type_input ---
-    if survey_type_input.lower() == "opt-in":
-        template_filename = "opt_in_survey.qsf"
-        survey_type_suffix = "Opt_In"
-        survey_type_data = "Opt-In" # Value to store in Snowflake
-    elif survey_type_input.lower() == "opt-out":
-        template_filename = "opt_out_survey.qsf"
-        survey_type_suffix = "Opt_Out"
-        survey_type_data = "Opt-Out" # Value to store in Snowflake
+    survey_type_config = get_survey_type_config(survey_type_input)
+    if survey_type_config:
+        # survey_type_data is the value to store in Snowflake, e.g. "Opt-In"
+        template_filename, survey_type_suffix, survey_type_data = survey_type_config
     else:
         print_error(f"Invalid survey_type provided: '{survey_type_input}'. Must be 'Opt-In' or 'Opt-Out'.")
         print(json.dumps({"success": False, "message": "Invalid survey_type provided. Choose 'Opt-In' or 'Opt-Out'."}))
@@ -547,22 +969,17 @@ def main():
         print(json.dumps({"success": False, "message": f"Internal server error: Could not load template file '{template_filename}'."}))
         sys.exit(1)
 
-    # --- Step 3: Update Placeholders in QSF ---
-    print("INFO: Updating placeholders (FEATURE_NUMBER, ALPHA_BETA, etc.) in QSF...", file=sys.stderr)
-    updated_qsf_placeholders = update_placeholders(qsf_data, feature_number_arg, alpha_beta_arg, client_facing_feature_name_arg)
-    if not updated_qsf_placeholders:
-         # Error already printed by update_placeholders
-         print(json.dumps({"success": False, "message": "Internal server error: Could not update placeholders in template."}))
-         sys.exit(1)
-
-    # --- Step 4: Update Dates and Expiration Option in QSF ---
-    print("INFO: Updating dates and expiration option in QSF...", file=sys.stderr)
-    final_qsf = update_qsf_dates(updated_qsf_placeholders, start_date_arg, end_date_arg)
-    if not final_qsf:
-        # Error already printed by update_qsf_dates
-        print(json.dumps({"success": False, "message": "Internal server error: Could not update survey dates in template."}))
+    # --- Step 3: Compile Template (locate placeholders and Survey Options) ---
+    compiled_qsf = compile_qsf(qsf_data)
+    if not compiled_qsf:
+        # Error already printed by compile_qsf
+        print(json.dumps({"success": False, "message": "Internal server error: Template is missing required survey sections."}))
         sys.exit(1)
 
+    # --- Step 4: Fill Placeholders, Dates and Expiration Option ---
+    print("INFO: Filling placeholders (FEATURE_NUMBER, ALPHA_BETA, etc.), dates and expiration option in QSF...", file=sys.stderr)
+    final_qsf = compiled_qsf.render(feature_number_arg, alpha_beta_arg, client_facing_feature_name_arg, start_date_arg, end_date_arg)
+
     # --- Step 5: Build Final Survey Name ---
     final_survey_name = f"{feature_number_arg}-{alpha_beta_arg}-{survey_type_suffix}"
     print(f"INFO: Final survey name will be: '{final_survey_name}'", file=sys.stderr)
@@ -604,22 +1021,7 @@ def main():
     # Add required collaborators regardless of whether the original user was found
     print(f"INFO: Sharing survey with required default collaborators...", file=sys.stderr)
     
-    # Track sharing status with default collaborators
-    default_collaborator_status = []
-    for collab_id in DEFAULT_COLLABORATOR_IDS:
-        # Skip if this is the same as the requesting user (avoid duplicate sharing)
-        if collab_id == user_id_for_sharing:
-            print(f"INFO: Skipping default collaborator {collab_id} - same as requesting user", file=sys.stderr)
-            default_collaborator_status.append((collab_id, "skipped - requesting user"))
-            continue
-            
-        print(f"INFO: Sharing with default collaborator {collab_id}...", file=sys.stderr)
-        sharing_result = share_survey_with_user(qualtrics_survey_id, collab_id)
-        status = "success" if sharing_result else "failed"
-        default_collaborator_status.append((collab_id, status))
-        
-        if not sharing_result:
-            print_error(f"WARNING: Failed to share survey {qualtrics_survey_id} with default collaborator {collab_id}")
+    default_collaborator_status = share_with_default_collaborators(qualtrics_survey_id, user_id_for_sharing)
 
     # --- Step 8: Write Results Record to Snowflake ---
     print("INFO: Attempting to write survey creation details to Snowflake...", file=sys.stderr)
@@ -666,7 +1068,7 @@ if __name__ == "__main__":
     except Exception as e:
         # Catch any unhandled exceptions in the main function flow
         print_error(f"An uncaught exception occurred in main execution: {e}")
-        print_error(traceback.format_exc(), file=sys.stderr) # Log the full traceback
+        print_error(traceback.format_exc()) # Log the full traceback
         # Output a standard JSON error message to stdout
         print(json.dumps({
             "success": False,
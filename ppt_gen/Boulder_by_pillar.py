@@ -14,6 +14,7 @@ Build Boulder Executive Update deck.
 from __future__ import annotations
 import os, re, logging, traceback
 from copy import deepcopy
+from typing import IO
 from datetime import datetime, timezone
 
 import pandas as pd
@@ -258,7 +259,8 @@ def populate_table(tbl, df: pd.DataFrame, pivot: pd.DataFrame):
 #   • Clones template slide, sets title, removes placeholder header, fills table.
 #   • Deletes the original template slide before saving output.
 #   - To change slide ordering or add additional elements, edit this function.
-def boulder_by_pillar_build_deck(template: str, output: str,
+#   - *output* may be a file path or a writable binary stream (e.g. BytesIO).
+def boulder_by_pillar_build_deck(template: str, output: str | IO[bytes],
                boulders: pd.DataFrame, features: pd.DataFrame):
     prs = Presentation(template)
     src_slide_idx = 0  # template slide (slide 1)
@@ -8,6 +8,9 @@ import sys
 import logging
 import traceback
 import re
+import hashlib
+import threading
+from collections import OrderedDict
 from datetime import datetime
 from copy import deepcopy
 import pandas as pd
@@ -16,7 +19,7 @@ from pptx import Presentation
 from pptx.enum.text import PP_ALIGN  # Import for text alignment
 
 # Use the new dbUtils module that matches Ask Amy's approach
-from dbUtils import execute_snowflake_query
+from dbUtils import execute_snowflake_query, execute_in_list_query, normalize_query
 
 # Database configuration
 DATABASE = "CORPANALYTICS_BUSINESS_PROD"
@@ -194,6 +197,15 @@ def parse_release_codes(release_codes_input: str) -> list:
             
     return valid_codes
 
+SQL_FEATURE_KEYS_BY_RELEASE = """
+SELECT DISTINCT FEATURE_KEY
+FROM CORPANALYTICS_BUSINESS_PROD.SCRATCHPAD_PRDPF.FEATURE_API_FULL
+WHERE 
+    TARGET_GA_RELEASE LIKE ANY ({placeholders})
+    AND INCLUDE_IN_ROADMAP_ARTIFACTS LIKE %s
+ORDER BY FEATURE_KEY
+"""
+
 def load_feature_keys_by_release(release_codes: list) -> list:
     """
     Load all feature keys associated with the given release codes, filtered for
@@ -204,29 +216,23 @@ def load_feature_keys_by_release(release_codes: list) -> list:
     
     logger.info(f"Loading feature keys for releases: {release_codes}")
     
-    # Sanitize release codes and build a series of LIKE conditions for the SQL query.
-    sanitized_codes = [code.strip().strip('*') for code in release_codes]
-    release_like_conditions = " OR ".join([f"TARGET_GA_RELEASE LIKE '%{code}%'" for code in sanitized_codes])
+    # Sanitize release codes and bind one LIKE pattern per distinct code
+    sanitized_codes = sorted({code.strip().strip('*') for code in release_codes})
+    patterns = [f"%{code}%" for code in sanitized_codes]
 
     # Define the specific artifact value to filter by
     artifact_filter = "External Roadmap: Create deep dive slide"
     
-    query = f"""
-    SELECT DISTINCT FEATURE_KEY
-    FROM CORPANALYTICS_BUSINESS_PROD.SCRATCHPAD_PRDPF.FEATURE_API_FULL
-    WHERE 
-        ({release_like_conditions})
-        AND INCLUDE_IN_ROADMAP_ARTIFACTS LIKE '%{artifact_filter}%'
-    """
+    query = normalize_query(SQL_FEATURE_KEYS_BY_RELEASE.format(placeholders=", ".join(["%s"] * len(patterns))))
 
     # Enhanced diagnostic logging
     logger.critical("="*80)
     logger.critical("EXECUTING THE FOLLOWING SQL QUERY FOR RELEASE-BASED SLIDE GENERATION:")
-    logger.critical(query)
+    logger.critical(f"{query} -- params: {patterns}")
     logger.critical("="*80)
 
     try:
-        results = execute_snowflake_query(query)
+        results = execute_snowflake_query(query, patterns + [f"%{artifact_filter}%"])
         df = pd.DataFrame(results)
         if df.empty:
             logger.warning(f"No features marked for deep dive slides found for releases: {release_codes}")
@@ -239,81 +245,48 @@ def load_feature_keys_by_release(release_codes: list) -> list:
         logger.error(traceback.format_exc())
         return []
 
-def format_feature_keys_for_sql(feature_keys: list) -> str:
-    """Format feature keys for SQL IN clause."""
-    formatted_keys = ', '.join([f"'{key}'" for key in feature_keys])
-    return formatted_keys
+# Columns fetched for each feature
+SQL_FEATURE_BY_KEY = """
+SELECT 
+    FEATURE_KEY,
+    CLIENT_FACING_FEATURE_NAME,
+    EXTERNALROADMAPTIMEFRAME,
+    EXTERNALROADMAPLANGUAGE,
+    WHAT_VALUE_DOES_IT_DELIVER,
+    WHAT_IS_YOUR_FEATURE,
+    TARGET_GA_RELEASE,
+    INDEX_RELEASES_AWAY,
+    INCLUDE_IN_ROADMAP_ARTIFACTS,
+    PO,
+    PO_EMAIL
+FROM CORPANALYTICS_BUSINESS_PROD.SCRATCHPAD_PRDPF.FEATURE_API_FULL
+WHERE FEATURE_KEY IN ({placeholders})
+ORDER BY FEATURE_KEY
+"""
+
+# Generated bullets (as tuples, so callers can't modify them), keyed by the feature text they were generated from
+BULLET_CACHE_SIZE = int(os.getenv("BULLET_CACHE_SIZE", "1024"))
+_bullet_cache: OrderedDict = OrderedDict()
+_bullet_cache_lock = threading.Lock()
 
-def load_feature_data(feature_keys: list) -> pd.DataFrame:
-    """Load feature data from Snowflake for the given feature keys."""
+def fetch_feature_data(feature_keys: list) -> pd.DataFrame:
+    """Fetch the raw feature rows from Snowflake, without generated bullets."""
     if not feature_keys:
         logger.error("No feature keys provided")
         return pd.DataFrame()  # Empty DataFrame
     
     logger.info(f"Loading data for {len(feature_keys)} features")
     
-    # SQL query for fetching feature data
-    SQL_FEATURE_BY_KEY = """
-    SELECT 
-        FEATURE_KEY,
-        CLIENT_FACING_FEATURE_NAME,
-        EXTERNALROADMAPTIMEFRAME,
-        EXTERNALROADMAPLANGUAGE,
-        WHAT_VALUE_DOES_IT_DELIVER,
-        WHAT_IS_YOUR_FEATURE,
-        TARGET_GA_RELEASE,
-        INDEX_RELEASES_AWAY,
-        INCLUDE_IN_ROADMAP_ARTIFACTS,
-        PO,
-        PO_EMAIL
-    FROM CORPANALYTICS_BUSINESS_PROD.SCRATCHPAD_PRDPF.FEATURE_API_FULL
-    WHERE FEATURE_KEY IN ({feature_keys})
-    """
-    
-    # Prepare SQL
-    formatted_keys = format_feature_keys_for_sql(feature_keys)
-    base_query = SQL_FEATURE_BY_KEY.format(feature_keys=formatted_keys)
-    
     try:
-        # Use dbUtils to execute the query
+        # Keys are bound as parameters, chunked and run in parallel for long lists
         logger.info("Running query for basic feature info")
-        results = execute_snowflake_query(base_query)
+        results = execute_in_list_query(SQL_FEATURE_BY_KEY, feature_keys)
         df = pd.DataFrame(results)
-        df['ATHENAGPT_BULLETS'] = None # Initialize column for generated bullets
         logger.info(f"Query returned {len(df)} rows")
         
-        # If no features found, return empty DataFrame
         if len(df) == 0:
             logger.warning(f"No features found for keys: {feature_keys}")
             return pd.DataFrame()
-        
-        # Generate bullet points using AthenaGPT instead of Snowflake Cortex
-        for idx, feature in df.iterrows():
-            feature_key = feature['FEATURE_KEY']
-            
-            # Build prompt for AthenaGPT
-            prompt = (
-                f"FEATURE_NAME: {feature['CLIENT_FACING_FEATURE_NAME']}\n"
-                f"Roadmap Language: {feature['EXTERNALROADMAPLANGUAGE']}\n"
-                f"Feature Value Statement: {feature['WHAT_VALUE_DOES_IT_DELIVER']}\n"
-                f"Feature Description: {feature['WHAT_IS_YOUR_FEATURE']}\n\n"
-                "Create 3 concise, high-impact bullet points that would be compelling to healthcare executives and providers. "
-                "Each bullet should focus on a different aspect (Clinical Impact, Workflow Efficiency, Financial/Strategic).\n"
-                "IMPORTANT GUIDELINES:\n"
-                "- Start each bullet with a strong verb or adverb (e.g., 'Automate', 'Empower', 'Reduce').\n"
-                "- Use sentence case and keep each bullet to roughly one slide line (≈ 15 words).\n"
-                "- Do not include bullet symbols or numbering; output just the 3 lines separated by newlines."
-            )
-            try:
-                gpt_response = _athenagpt_complete(prompt)
-                bullet_points = parse_bullet_points(gpt_response)
-                logger.info(f"AthenaGPT bullets for {feature_key}: {bullet_points}")
-                df.at[idx, 'ATHENAGPT_BULLETS'] = bullet_points
-            except Exception as gpt_err:
-                logger.error(f"AthenaGPT failed for {feature_key}: {gpt_err}")
-                df.at[idx, 'ATHENAGPT_BULLETS'] = []
-        
-        # Always return the DataFrame
         return df
             
     except Exception as e:
@@ -321,6 +294,72 @@ def load_feature_data(feature_keys: list) -> pd.DataFrame:
         logger.error(traceback.format_exc())
         return pd.DataFrame()  # Return empty DataFrame on error
 
+def _bullet_prompt(feature) -> str:
+    """Build the AthenaGPT prompt for a feature's slide bullets."""
+    return (
+        f"FEATURE_NAME: {feature['CLIENT_FACING_FEATURE_NAME']}\n"
+        f"Roadmap Language: {feature['EXTERNALROADMAPLANGUAGE']}\n"
+        f"Feature Value Statement: {feature['WHAT_VALUE_DOES_IT_DELIVER']}\n"
+        f"Feature Description: {feature['WHAT_IS_YOUR_FEATURE']}\n\n"
+        "Create 3 concise, high-impact bullet points that would be compelling to healthcare executives and providers. "
+        "Each bullet should focus on a different aspect (Clinical Impact, Workflow Efficiency, Financial/Strategic).\n"
+        "IMPORTANT GUIDELINES:\n"
+        "- Start each bullet with a strong verb or adverb (e.g., 'Automate', 'Empower', 'Reduce').\n"
+        "- Use sentence case and keep each bullet to roughly one slide line (≈ 15 words).\n"
+        "- Do not include bullet symbols or numbering; output just the 3 lines separated by newlines."
+    )
+
+def _bullet_cache_key(feature_key: str, prompt: str) -> tuple:
+    # Editing the feature text changes the prompt, so stale bullets are never reused
+    return feature_key, hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+def enrich_with_bullets(df: pd.DataFrame, generate: bool = True) -> pd.DataFrame:
+    """
+    Add an ATHENAGPT_BULLETS column to fetched feature rows.
+
+    Bullets already generated for the same feature text are reused from the cache.
+    With generate=False no AthenaGPT calls are made: features without cached
+    bullets get None.
+    """
+    if df.empty:
+        return df
+    df = df.copy()
+    df['ATHENAGPT_BULLETS'] = None # Initialize column for generated bullets
+    
+    for idx, feature in df.iterrows():
+        feature_key = feature['FEATURE_KEY']
+        cache_key = _bullet_cache_key(feature_key, _bullet_prompt(feature))
+        with _bullet_cache_lock:
+            bullet_points = _bullet_cache.get(cache_key)
+            if bullet_points is not None:
+                _bullet_cache.move_to_end(cache_key)
+        if bullet_points is not None:
+            logger.info(f"Using cached AthenaGPT bullets for {feature_key}")
+            df.at[idx, 'ATHENAGPT_BULLETS'] = list(bullet_points)
+            continue
+        if not generate:
+            continue
+        
+        # Generate bullet points using AthenaGPT instead of Snowflake Cortex
+        try:
+            gpt_response = _athenagpt_complete(_bullet_prompt(feature))
+            bullet_points = parse_bullet_points(gpt_response)
+            logger.info(f"AthenaGPT bullets for {feature_key}: {bullet_points}")
+            df.at[idx, 'ATHENAGPT_BULLETS'] = bullet_points
+            with _bullet_cache_lock:
+                _bullet_cache[cache_key] = tuple(bullet_points)
+                while len(_bullet_cache) > BULLET_CACHE_SIZE:
+                    _bullet_cache.popitem(last=False)
+        except Exception as gpt_err:
+            logger.error(f"AthenaGPT failed for {feature_key}: {gpt_err}")
+            df.at[idx, 'ATHENAGPT_BULLETS'] = []
+    
+    return df
+
+def load_feature_data(feature_keys: list) -> pd.DataFrame:
+    """Load feature data from Snowflake for the given feature keys, with AthenaGPT bullets."""
+    return enrich_with_bullets(fetch_feature_data(feature_keys))
+
 def parse_bullet_points(description: str) -> list:
     """Parse bullet points from the Cortex response."""
     if not description or description == 'No description available':
@@ -372,6 +411,8 @@ def find_shape_by_name(slide, name):
 def timeframe_title_fix(template_path, output_path, feature_keys):
     """
     Generate PowerPoint slides by creating a new slide for each feature and populating the placeholders.
+
+    output_path may be a file path or a writable binary stream (e.g. BytesIO) to render in memory.
     """
     logger.info(f"Starting slide generation with template: {template_path}")
     
@@ -396,7 +437,7 @@ def timeframe_title_fix(template_path, output_path, feature_keys):
             roadmap_lang = feature.get('EXTERNALROADMAPLANGUAGE', '')
             timeframe = _format_timeframe(feature.get('TARGET_GA_RELEASE', ''))
             bullet_points = feature.get('ATHENAGPT_BULLETS', [])
-            if not isinstance(bullet_points, list): bullet_points = []
+            bullet_points = list(bullet_points) if isinstance(bullet_points, (list, tuple)) else []
             while len(bullet_points) < 3: bullet_points.append("")
 
             # Parse title and subtitle
@@ -453,7 +494,7 @@ def timeframe_title_fix(template_path, output_path, feature_keys):
         logger.info("Template slide deleted.")
 
     prs.save(output_path)
-    logger.info(f"Finished generating presentation: {output_path}")
+    logger.info(f"Finished generating presentation: {output_path if isinstance(output_path, str) else 'in memory'}")
     return output_path
 
 if __name__ == "__main__":
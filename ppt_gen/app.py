@@ -2,15 +2,17 @@
 import os
 import sys
 import uuid
+import threading
 import traceback
 from datetime import datetime
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
 import codecs
 
 from flask import Flask, render_template, render_template_string, request, redirect, url_for, flash, send_file, Response, jsonify, session
 import flask
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
-from flask_bcrypt import Bcrypt
-from email_service import send_password_reset_email
+from email_service import send_password_reset_email, get_mail_queue
 from werkzeug.utils import secure_filename
 import jinja2
 from jinja2 import FileSystemLoader
@@ -19,6 +21,8 @@ from jinja2 import FileSystemLoader
 import dbUtils as database  # Using new dbUtils module that matches Ask Amy's approach
 from auth import User
 from usage_metrics import log_usage
+import hashing
+from artifact_store import ArtifactStore
 from Boulder_by_pillar import boulder_by_pillar_build_deck, boulder_by_pillar_load_data
 from DeepDiveSlideGeneration import timeframe_title_fix, parse_feature_keys, parse_release_codes, load_feature_keys_by_release
 
@@ -30,6 +34,14 @@ LOG_FOLDER = os.path.join(BASE_DIR, "logs")
 TEMPLATE_FOLDER = os.path.join(BASE_DIR, "templates")
 PPT_TEMPLATE_DIR = os.path.join(BASE_DIR, "ppt_templates")
 
+# Render decks into memory and stream them back, rather than writing then re-reading a file
+RENDER_DECKS_IN_MEMORY = os.getenv("RENDER_DECKS_IN_MEMORY", "true").lower() == "true"
+# Keep a copy of in-memory decks in the artifact store, written off the request thread
+PERSIST_GENERATED_DECKS = os.getenv("PERSIST_GENERATED_DECKS", "true").lower() == "true"
+PPTX_MIMETYPE = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+# Shown when password hashing is saturated or times out
+HASHING_BUSY_MESSAGE = "The server is busy. Please try again in a moment."
+
 # Custom template loader that handles different encodings
 class MultiEncodingFileSystemLoader(FileSystemLoader):
     """A custom template loader that tries multiple encodings when loading template files."""
@@ -100,8 +112,43 @@ app.config.update(
 for d in (UPLOAD_FOLDER, OUTPUT_FOLDER, PPT_TEMPLATE_DIR, LOG_FOLDER):
     os.makedirs(d, exist_ok=True)
 
+# Generated decks and generation logs, date-sharded, indexed and swept in the background
+artifacts = ArtifactStore(
+    {"deck": OUTPUT_FOLDER, "log": LOG_FOLDER},
+    index_path=os.path.join(OUTPUT_FOLDER, "artifact_index.db")
+)
+# Persists in-memory decks off the request thread; created by start_background_workers()
+deck_writer = None
+
+_background_workers_started = False
+_background_workers_lock = threading.Lock()
+
+
+@app.before_request
+def start_background_workers():
+    """
+    Starts this process's background workers, once: the artifact sweeper, the deck
+    writer, and the mail queue, which first sends any mail left in the spool by an
+    earlier run. Also settles the bcrypt cost, so its calibration hash doesn't run
+    on the first login.
+
+    Called from the __main__ block, and before the first request when served by a WSGI
+    server. Never called at import, so processes that only import this module don't
+    start their own.
+    """
+    global _background_workers_started, deck_writer
+    if _background_workers_started:
+        return
+    with _background_workers_lock:
+        if _background_workers_started:
+            return
+        artifacts.start_sweeper()
+        deck_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="deck-writer")
+        get_mail_queue()
+        hashing.get_bcrypt_rounds()
+        _background_workers_started = True
+
 # --- Authentication Setup ---
-bcrypt = Bcrypt(app)
 login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = 'index'  # Redirect to index page with login modal
@@ -126,13 +173,16 @@ def _list_predefined_templates():
     except FileNotFoundError:
         return []
 
+def _current_username() -> str:
+    return current_user.id if current_user.is_authenticated else "anonymous"
+
 def create_user_log(template_type: str, template_name: str, feature_keys: list | None = None):
     """Creates a user-specific log file for a generation event."""
     try:
-        username = current_user.id if current_user.is_authenticated else "anonymous"
+        username = _current_username()
         timestamp_file = datetime.now().strftime('%Y%m%d%H%M')
         log_filename = f"{username}_{template_type}_ppt_{timestamp_file}.log"
-        log_filepath = os.path.join(app.config["LOG_FOLDER"], log_filename)
+        log_filepath = artifacts.path_for("log", log_filename)
         
         with open(log_filepath, 'w') as f:
             f.write(f"Presentation generated by: {username}\n")
@@ -140,6 +190,7 @@ def create_user_log(template_type: str, template_name: str, feature_keys: list |
             f.write(f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
             if feature_keys:
                 f.write(f"Feature Keys: {', '.join(feature_keys)}\n")
+        artifacts.record("log", log_filepath, username, template_name)
         
         app.logger.info(f"Successfully created user log: {log_filepath}")
 
@@ -150,20 +201,53 @@ def create_user_log(template_type: str, template_name: str, feature_keys: list |
         flash(f"Warning: The presentation was generated, but the usage log could not be created. Details: {e}", "warning")
         app.logger.error(error_message)
 
+def _persist_deck(data: bytes, filename: str, username: str, template_name: str):
+    """Saves a deck rendered in memory to the artifact store (runs on deck_writer)."""
+    try:
+        path = artifacts.save_bytes("deck", filename, data, username, template_name)
+        app.logger.info(f"Persisted generated deck: {path}")
+    except Exception as e:
+        app.logger.error(f"Failed to persist generated deck {filename}: {e}")
+
+def render_deck(build, output_filename: str, template_path: str):
+    """
+    Runs build(output) for a deck and returns the download response.
+
+    With RENDER_DECKS_IN_MEMORY the deck is built into a BytesIO and streamed from
+    memory, and (with PERSIST_GENERATED_DECKS) handed to deck_writer for storage, so
+    no disk I/O happens on the request path. Otherwise it is written to the
+    artifact store first and sent from there.
+    """
+    template_name = os.path.basename(template_path)
+    if RENDER_DECKS_IN_MEMORY:
+        buffer = BytesIO()
+        build(buffer)
+        if PERSIST_GENERATED_DECKS:
+            deck_writer.submit(_persist_deck, buffer.getvalue(), output_filename, _current_username(), template_name)
+        buffer.seek(0)
+        response = send_file(buffer, as_attachment=True, download_name=output_filename, mimetype=PPTX_MIMETYPE)
+    else:
+        output_path = artifacts.path_for("deck", output_filename)
+        build(output_path)
+        artifacts.record("deck", output_path, _current_username(), template_name)
+        response = send_file(output_path, as_attachment=True)
+    response.set_cookie('fileDownload', 'true', max_age=20, path='/')
+    return response
+
 # --- Generation Handlers ---
 def handle_boulder_generation(template_path):
     """Handles the logic for generating the Boulder presentation."""
     try:
         boulders, features = boulder_by_pillar_load_data()
         output_filename = f"Boulder_Executive_Update_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pptx"
-        output_path = os.path.join(app.config["OUTPUT_FOLDER"], output_filename)
-        boulder_by_pillar_build_deck(template_path, output_path, boulders, features)
+        response = render_deck(
+            lambda output: boulder_by_pillar_build_deck(template_path, output, boulders, features),
+            output_filename, template_path
+        )
         
         log_usage(template_name=os.path.basename(template_path), status="SUCCESS")
         create_user_log("boulder", os.path.basename(template_path))
         
-        response = send_file(output_path, as_attachment=True)
-        response.set_cookie('fileDownload', 'true', max_age=20, path='/')
         return response
     except Exception as exc:
         app.logger.error(f"An unexpected error occurred during Boulder generation: {exc}")
@@ -191,15 +275,15 @@ def handle_deep_dive_generation(template_path):
 
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         output_filename = f"{os.path.basename(template_path).replace('.pptx', '')}_{timestamp}_{str(uuid.uuid4())[:8]}.pptx"
-        output_path = os.path.join(app.config["OUTPUT_FOLDER"], output_filename)
 
-        timeframe_title_fix(template_path, output_path, feature_keys)
+        response = render_deck(
+            lambda output: timeframe_title_fix(template_path, output, feature_keys),
+            output_filename, template_path
+        )
         
         log_usage(template_name=os.path.basename(template_path), status="SUCCESS", feature_keys=feature_keys)
         create_user_log("deepdive", os.path.basename(template_path), feature_keys)
         
-        response = send_file(output_path, as_attachment=True)
-        response.set_cookie('fileDownload', 'true', max_age=20, path='/')
         return response
     except Exception as e:
         error_message = f"An unexpected error occurred during Deep Dive generation: {e}"
@@ -238,7 +322,7 @@ def login():
             
             # Debug password verification
             try:
-                password_match = bcrypt.check_password_hash(user.password_hash, password)
+                password_match = hashing.check_password(user.password_hash, password)
                 app.logger.info(f"Password verification result: {password_match}")
                 
                 if user.is_active and password_match:
@@ -246,6 +330,13 @@ def login():
                     database.update_user_last_login(user.id)
                     app.logger.info(f"Successful login for user: {user.id}")
                     
+                    # Upgrade hashes made with an older bcrypt cost, without delaying the login
+                    if hashing.needs_rehash(user.password_hash):
+                        user_id = user.id
+                        hashing.rehash_in_background(
+                            password, lambda new_hash: database.update_password(user_id, new_hash)
+                        )
+                    
                     # Clear any force_password_change flag if it exists
                     if 'force_password_change' in session:
                         app.logger.info(f"Clearing force_password_change flag for user {user.id}")
@@ -259,6 +350,9 @@ def login():
                 else:
                     error_msg = "Invalid username or password"
                     app.logger.warning(f"Failed login attempt for {username}: incorrect password")
+            except (hashing.PasswordHashingBusy, FuturesTimeoutError) as e:
+                app.logger.warning(f"Password hashing busy during login for {username}: {type(e).__name__}")
+                error_msg = HASHING_BUSY_MESSAGE
             except Exception as e:
                 app.logger.error(f"Error during password verification: {str(e)}")
                 error_msg = "An error occurred during login. Please try again."
@@ -341,13 +435,18 @@ def change_password():
             
         user = User(user_data)
         
-        # Verify current password
-        if not bcrypt.check_password_hash(user.password_hash, current_password):
-            flash('Current password is incorrect.', 'error')
+        try:
+            # Verify current password
+            if not hashing.check_password(user.password_hash, current_password):
+                flash('Current password is incorrect.', 'error')
+                return render_template_string(change_password_template, force_change=force_change)
+                
+            # Hash the new password
+            hashed_password = hashing.hash_password(new_password)
+        except (hashing.PasswordHashingBusy, FuturesTimeoutError) as e:
+            app.logger.warning(f"Password hashing busy during password change for {current_user.id}: {type(e).__name__}")
+            flash(HASHING_BUSY_MESSAGE, 'error')
             return render_template_string(change_password_template, force_change=force_change)
-            
-        # Hash the new password
-        hashed_password = bcrypt.generate_password_hash(new_password).decode('utf-8')
         
         # Update password in database
         if database.update_password(current_user.id, hashed_password):
@@ -628,16 +727,9 @@ def reset_request():
         # Log the email being searched for debugging
         app.logger.info(f"Attempting to reset password for email: {email}")
         
-        # Try multiple approaches to find the user
-        # First try exact match with email
+        # Matches the full email or the username before '@' in one lookup
         user = database.get_user_by_username(email)
         
-        # If not found, try username without domain
-        if not user and '@' in email:
-            username = email.split('@')[0]
-            app.logger.info(f"Email not found, trying username: {username}")
-            user = database.get_user_by_username(username)
-        
         # Log the result for debugging
         if user:
             app.logger.info(f"User found: {user.get('USERNAME')}")
@@ -714,7 +806,12 @@ def register():
         
         if user_data:
             # User exists, update their password
-            hashed_password = bcrypt.generate_password_hash(password).decode('utf-8')
+            try:
+                hashed_password = hashing.hash_password(password)
+            except (hashing.PasswordHashingBusy, FuturesTimeoutError) as e:
+                app.logger.warning(f"Password hashing busy during registration for {username}: {type(e).__name__}")
+                flash(HASHING_BUSY_MESSAGE, 'error')
+                return render_template('reset_confirm.html', username=reset_username)
             if database.update_password(username, hashed_password):
                 # Clear the reset_username from session if it exists
                 if 'reset_username' in session:
@@ -792,9 +889,9 @@ def export_data():
         flash("No features found for the given input. Please enter valid Feature Keys or Release Codes to export.", 'error')
         return redirect(url_for('index'))
 
-    # Fetch the full data for the feature keys
-    from DeepDiveSlideGeneration import load_feature_data
-    feature_data = load_feature_data(feature_keys)
+    # Fetch the raw feature data; bullets are only included where already generated
+    from DeepDiveSlideGeneration import fetch_feature_data, enrich_with_bullets
+    feature_data = enrich_with_bullets(fetch_feature_data(feature_keys), generate=False)
 
     if feature_data.empty:
         flash("Could not retrieve data for the selected features.", 'error')
@@ -804,7 +901,6 @@ def export_data():
     simplified_data = feature_data[['FEATURE_KEY', 'PO', 'PO_EMAIL']].copy()
     
     # Create Excel file with multiple sheets in memory
-    from io import BytesIO
     import pandas as pd
     
     output = BytesIO()
@@ -1080,6 +1176,10 @@ def generate_change_password_template():
         return f"Error creating template: {str(e)}"
 
 if __name__ == '__main__':
+    # The debug reloader also runs this block in its watcher process; start workers only in the serving one
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        start_background_workers()
+
     # Display server information
     print("\n * Serving Flask app 'app'")
     print(" * Debug mode: on")
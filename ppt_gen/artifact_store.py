@@ -0,0 +1,219 @@
+"""
+Storage for generated decks and per-generation log files.
+
+Artifacts are written into date-sharded directories (<root>/YYYY/MM/DD/) and
+recorded in a SQLite index with the user and template that produced them. A
+background sweeper deletes artifacts older than ARTIFACT_MAX_AGE_DAYS, then the
+oldest ones until each kind fits within its size limit, and clears files left
+in the flat legacy layout by earlier versions.
+"""
+import os
+import time
+import shutil
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_MAX_AGE_DAYS = int(os.getenv("ARTIFACT_MAX_AGE_DAYS", "30"))
+ARTIFACT_MAX_TOTAL_MB = int(os.getenv("ARTIFACT_MAX_TOTAL_MB", "2048"))  # Per kind
+ARTIFACT_SWEEP_INTERVAL = int(os.getenv("ARTIFACT_SWEEP_INTERVAL", "3600"))  # Seconds
+
+# Files written directly into the root folders before sharding
+LEGACY_SUFFIXES = (".pptx", ".log", ".html")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS artifacts (
+    path TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    username TEXT,
+    template TEXT,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_artifacts_user ON artifacts(username, created_at);
+CREATE INDEX IF NOT EXISTS idx_artifacts_template ON artifacts(template, created_at);
+CREATE INDEX IF NOT EXISTS idx_artifacts_kind ON artifacts(kind, created_at);
+"""
+
+
+class ArtifactStore:
+    """Date-sharded artifact folders with an index by user and template and a TTL/size sweeper."""
+
+    def __init__(self, roots: dict, index_path: str,
+                 max_age_days: int = ARTIFACT_MAX_AGE_DAYS,
+                 max_total_bytes: int = ARTIFACT_MAX_TOTAL_MB * 1024 * 1024):
+        """
+        Args:
+            roots: Root folder for each artifact kind, e.g. {"deck": ".../generated"}.
+            index_path: Path of the SQLite index database.
+            max_age_days: Artifacts older than this are deleted by sweep().
+            max_total_bytes: Size limit per kind; the oldest artifacts go first.
+        """
+        self.roots = roots
+        self.index_path = index_path
+        self.max_age_days = max_age_days
+        self.max_total_bytes = max_total_bytes
+        self._sweeper = None
+        for root in roots.values():
+            os.makedirs(root, exist_ok=True)
+        os.makedirs(os.path.dirname(index_path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        """Opens an index connection, committing on success and always closing it."""
+        conn = sqlite3.connect(self.index_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def path_for(self, kind: str, filename: str, when: datetime | None = None) -> str:
+        """Returns the sharded path for a new artifact, creating its day folder."""
+        when = when or datetime.now()
+        shard = os.path.join(self.roots[kind], when.strftime("%Y"), when.strftime("%m"), when.strftime("%d"))
+        os.makedirs(shard, exist_ok=True)
+        return os.path.join(shard, filename)
+
+    def record(self, kind: str, path: str, username: str | None = None, template: str | None = None) -> None:
+        """Adds a written artifact to the index."""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO artifacts (path, kind, username, template, size, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (path, kind, username, template, os.path.getsize(path), time.time())
+            )
+
+    def save_bytes(self, kind: str, filename: str, data: bytes,
+                   username: str | None = None, template: str | None = None) -> str:
+        """Writes an artifact from memory into its shard and indexes it. Returns the path."""
+        path = self.path_for(kind, filename)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        self.record(kind, path, username, template)
+        return path
+
+    def find(self, username: str | None = None, template: str | None = None,
+             kind: str | None = None, limit: int = 100) -> list[dict]:
+        """Returns indexed artifacts, newest first, filtered by user, template and/or kind."""
+        clauses, params = [], []
+        for column, value in (("username", username), ("template", template), ("kind", kind)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT * FROM artifacts {where} ORDER BY created_at DESC LIMIT ?", params + [limit]
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def sweep(self) -> dict:
+        """
+        Deletes expired artifacts, then the oldest ones until each kind is within its size limit.
+
+        Returns:
+            Counts of deleted files and freed bytes.
+        """
+        cutoff = datetime.now() - timedelta(days=self.max_age_days)
+        deleted, freed = 0, 0
+
+        for kind, root in self.roots.items():
+            # Whole day folders past the cutoff go without a per-file stat
+            expired_shards = self._expired_shards(root, cutoff)
+            for day_dir in expired_shards:
+                for name in os.listdir(day_dir):
+                    freed += os.path.getsize(os.path.join(day_dir, name))
+                    deleted += 1
+                shutil.rmtree(day_dir, ignore_errors=True)
+            deleted_legacy, freed_legacy = self._sweep_legacy(root, cutoff.timestamp())
+            deleted += deleted_legacy
+            freed += freed_legacy
+
+            with self._connect() as conn:
+                conn.execute("DELETE FROM artifacts WHERE kind = ? AND created_at < ?", (kind, cutoff.timestamp()))
+                # Paths under a removed day folder sort between "<day_dir>/" and "<day_dir>0"
+                conn.executemany(
+                    "DELETE FROM artifacts WHERE path >= ? AND path < ?",
+                    [(day_dir + os.sep, day_dir + chr(ord(os.sep) + 1)) for day_dir in expired_shards]
+                )
+                total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM artifacts WHERE kind = ?", (kind,)).fetchone()[0]
+                if total > self.max_total_bytes:
+                    evicted = []
+                    for row in conn.execute(
+                        "SELECT path, size FROM artifacts WHERE kind = ? ORDER BY created_at", (kind,)
+                    ):
+                        if total <= self.max_total_bytes:
+                            break
+                        try:
+                            os.remove(row["path"])
+                            deleted += 1
+                            freed += row["size"]
+                        except FileNotFoundError:
+                            pass
+                        total -= row["size"]
+                        evicted.append((row["path"],))
+                    conn.executemany("DELETE FROM artifacts WHERE path = ?", evicted)
+
+        if deleted:
+            logger.info(f"Artifact sweep removed {deleted} files ({freed / 1024 / 1024:.1f} MB)")
+        return {"deleted": deleted, "freed_bytes": freed}
+
+    def _expired_shards(self, root: str, cutoff: datetime) -> list[str]:
+        """Returns the day folders under root dated before the cutoff day."""
+        expired = []
+        for year in _numeric_dirs(root):
+            for month in _numeric_dirs(os.path.join(root, year)):
+                for day in _numeric_dirs(os.path.join(root, year, month)):
+                    try:
+                        shard_date = datetime(int(year), int(month), int(day))
+                    except ValueError:
+                        continue
+                    if shard_date.date() < cutoff.date():
+                        expired.append(os.path.join(root, year, month, day))
+        return expired
+
+    def _sweep_legacy(self, root: str, cutoff_ts: float) -> tuple[int, int]:
+        """Deletes expired files left directly in root by the unsharded layout."""
+        deleted, freed = 0, 0
+        with os.scandir(root) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.endswith(LEGACY_SUFFIXES):
+                    stat = entry.stat()
+                    if stat.st_mtime < cutoff_ts:
+                        os.remove(entry.path)
+                        deleted += 1
+                        freed += stat.st_size
+        return deleted, freed
+
+    def start_sweeper(self, interval: int = ARTIFACT_SWEEP_INTERVAL) -> None:
+        """Runs sweep() every interval seconds on a daemon thread (once per store)."""
+        if self._sweeper is not None:
+            return
+
+        def run():
+            while True:
+                try:
+                    self.sweep()
+                except Exception as e:
+                    logger.error(f"Artifact sweep failed: {e}")
+                time.sleep(interval)
+
+        self._sweeper = threading.Thread(target=run, name="artifact-sweeper", daemon=True)
+        self._sweeper.start()
+
+
+def _numeric_dirs(path: str) -> list[str]:
+    try:
+        return sorted(name for name in os.listdir(path) if name.isdigit() and os.path.isdir(os.path.join(path, name)))
+    except FileNotFoundError:
+        return []
@@ -4,6 +4,8 @@ import snowflake.connector
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
 
+from dbUtils import USER_LOOKUP_QUERY, user_lookup_params
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -24,51 +26,27 @@ RESET_TOKEN_TABLE = "CR_APP_PASSWORD_RESET_TOKENS"
 
 def get_user_by_username(username: str) -> dict | None:
     """
-    Retrieves a user from the database by their username.
+    Retrieves a user from the database by their username or email address.
 
     Args:
-        username: The username to look up.
+        username: The username or email to look up; an email also matches its bare username.
 
     Returns:
         A dictionary containing user data if found, otherwise None.
     """
-    if not username:
+    if not username or not username.strip():
         print("Warning: Empty username provided to get_user_by_username")
         return None
         
-    # Print debug info
     print(f"Looking up user with username: '{username}'")
-    
-    # First try exact match
-    query = f"SELECT USERNAME, PASSWORD_HASH, IS_ACTIVE, FIRST_NAME FROM {USER_TABLE} WHERE LOWER(USERNAME) = %s"
     try:
         with snowflake.connector.connect(**SNOWFLAKE_CFG) as conn:
             with conn.cursor(snowflake.connector.cursor.DictCursor) as cursor:
-                cursor.execute(query, (username.lower(),))
-                user_data = cursor.fetchone()
-                if user_data:
-                    print(f"Found user with exact match: {user_data['USERNAME']}")
-                    return user_data
-                    
-                # If not found and username contains @, try with just the username part
-                if '@' in username:
-                    username_only = username.split('@')[0]
-                    print(f"Trying with username part only: '{username_only}'")
-                    cursor.execute(query, (username_only.lower(),))
-                    user_data = cursor.fetchone()
-                    if user_data:
-                        print(f"Found user with username part: {user_data['USERNAME']}")
-                        return user_data
-                        
-                # If still not found, try a more flexible search
-                print(f"Trying flexible search for username: '{username}'")
-                flex_query = f"SELECT USERNAME, PASSWORD_HASH, IS_ACTIVE, FIRST_NAME FROM {USER_TABLE} WHERE USERNAME ILIKE %s LIMIT 1"
-                cursor.execute(flex_query, (f"%{username.lower()}%",))
+                cursor.execute(USER_LOOKUP_QUERY, user_lookup_params(username))
                 user_data = cursor.fetchone()
                 if user_data:
-                    print(f"Found user with flexible match: {user_data['USERNAME']}")
+                    print(f"Found user: {user_data['USERNAME']}")
                     return user_data
-                    
                 print(f"No user found for '{username}'")
                 return None
     except Exception as e:
@@ -3,7 +3,9 @@ Database utilities for Snowflake connections.
 Similar to the successful Ask Amy implementation.
 """
 import os
-from typing import Dict, List, Optional, Union, Any
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Union, Any, Iterable
 import snowflake.connector
 from dotenv import load_dotenv
 
@@ -56,44 +58,91 @@ def execute_snowflake_query(query: str, params: List = None) -> Any:
         print(f"[DB Query Error] Error Message: {str(e)}")
         raise
 
+# Large IN lists are split into chunks of this many bound values, queried in parallel
+IN_LIST_CHUNK_SIZE = int(os.getenv("SNOWFLAKE_IN_LIST_CHUNK_SIZE", "500"))
+IN_LIST_MAX_WORKERS = int(os.getenv("SNOWFLAKE_IN_LIST_MAX_WORKERS", "4"))
+
+def normalize_query(query: str) -> str:
+    """
+    Collapses whitespace in a query so the same logical query always has the same
+    text (Snowflake only reuses cached results for identical query text).
+    """
+    return re.sub(r"\s+", " ", query).strip()
+
+def execute_in_list_query(query: str, values: Iterable, params_before: List = None,
+                          params_after: List = None, chunk_size: int = IN_LIST_CHUNK_SIZE,
+                          max_workers: int = IN_LIST_MAX_WORKERS) -> List[Dict]:
+    """
+    Runs a query whose {placeholders} marks an IN (...) list, binding the values as parameters.
+
+    Values are de-duplicated and sorted, so the same set of keys in any order or
+    with repeats produces the same query text and parameters and can be served
+    from the result cache. Lists longer than chunk_size are split into chunks run
+    in parallel, each on its own connection; rows come back in chunk order.
+
+    Args:
+        query: SQL containing "{placeholders}" inside an IN (...) clause.
+        values: The values for the IN list.
+        params_before / params_after: Parameters bound before / after the IN list.
+    """
+    values = sorted(set(values))
+    if not values:
+        return []
+    params_before = params_before or []
+    params_after = params_after or []
+    chunks = [values[i:i + chunk_size] for i in range(0, len(values), chunk_size)]
+
+    def run(chunk):
+        chunk_query = normalize_query(query.format(placeholders=", ".join(["%s"] * len(chunk))))
+        return execute_snowflake_query(chunk_query, params_before + chunk + params_after)
+
+    if len(chunks) == 1:
+        return run(chunks[0])
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as pool:
+        return [row for rows in pool.map(run, chunks) for row in rows]
+
 # User authentication functions
 USER_TABLE = "CR_APP_USERS"
 
+# Users are matched on the trimmed, lower-cased USERNAME
+USERNAME_NORM = "LOWER(TRIM(USERNAME))"
+
+USER_LOOKUP_QUERY = f"""
+SELECT USERNAME, PASSWORD_HASH, IS_ACTIVE, FIRST_NAME
+FROM {USER_TABLE}
+WHERE {USERNAME_NORM} IN (%s, %s)
+ORDER BY CASE WHEN {USERNAME_NORM} = %s THEN 0 ELSE 1 END
+LIMIT 1
+"""
+
+def normalize_username(username: str) -> str:
+    """Returns the canonical form of a username or email used for lookups."""
+    return username.strip().lower()
+
+def user_lookup_params(username: str) -> List[str]:
+    """
+    Returns the parameters for USER_LOOKUP_QUERY: the normalized name and, for an
+    email address, its local part (the full name is preferred when both match).
+    """
+    normalized = normalize_username(username)
+    bare_username = normalized.split('@')[0] if '@' in normalized else normalized
+    return [normalized, bare_username, normalized]
+
 def get_user_by_username(username: str) -> Optional[Dict]:
     """
-    Retrieves a user from the database by username.
+    Retrieves a user from the database by username or email address.
+    One equality query covers both the full name and the part before '@'.
     """
-    if not username:
+    if not username or not username.strip():
         print("Warning: Empty username provided to get_user_by_username")
         return None
         
     print(f"Looking up user with username: '{username}'")
-    
-    # Try exact match first
-    query = f"SELECT USERNAME, PASSWORD_HASH, IS_ACTIVE, FIRST_NAME FROM {USER_TABLE} WHERE LOWER(USERNAME) = %s"
     try:
-        result = execute_snowflake_query(query, [username.lower()])
-        if result and len(result) > 0:
-            print(f"Found user with exact match: {result[0]['USERNAME']}")
-            return result[0]
-            
-        # If not found and username contains @, try with just the username part
-        if '@' in username:
-            username_only = username.split('@')[0]
-            print(f"Trying with username part only: '{username_only}'")
-            result = execute_snowflake_query(query, [username_only.lower()])
-            if result and len(result) > 0:
-                print(f"Found user with username part: {result[0]['USERNAME']}")
-                return result[0]
-                
-        # If still not found, try a more flexible search
-        print(f"Trying flexible search for username: '{username}'")
-        flex_query = f"SELECT USERNAME, PASSWORD_HASH, IS_ACTIVE, FIRST_NAME FROM {USER_TABLE} WHERE USERNAME ILIKE %s LIMIT 1"
-        result = execute_snowflake_query(flex_query, [f"%{username.lower()}%"])
-        if result and len(result) > 0:
-            print(f"Found user with flexible match: {result[0]['USERNAME']}")
+        result = execute_snowflake_query(USER_LOOKUP_QUERY, user_lookup_params(username))
+        if result:
+            print(f"Found user: {result[0]['USERNAME']}")
             return result[0]
-            
         print(f"No user found for '{username}'")
         return None
     except Exception as e:
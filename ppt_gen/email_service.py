@@ -2,13 +2,19 @@
 Email service for sending application emails.
 
 This module handles sending emails for various application functions,
-including password reset links.
+including password reset links. Messages are written to an on-disk spool
+and delivered by a background thread over a reused SMTP connection, so
+callers never wait on the mail server.
 """
 import os
 import sys
+import json
+import time
+import uuid
 import smtplib
 import logging
 import datetime
+import threading
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from dotenv import load_dotenv
@@ -30,6 +36,15 @@ USE_TLS = os.getenv("EMAIL_USE_TLS", "False").lower() == "true"
 SMTP_USERNAME = os.getenv("SMTP_USERNAME", "")
 SMTP_PASSWORD = os.getenv("SMTP_PASSWORD", "")
 
+# Outbound mail spool and delivery settings
+MAIL_SPOOL_DIR = os.getenv("EMAIL_SPOOL_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "mail_spool"))
+SMTP_TIMEOUT = 10                  # Seconds per SMTP operation
+SMTP_IDLE_TIMEOUT = 60             # Close the connection after this long without mail
+SMTP_NOOP_INTERVAL = 30            # Check an idle connection with NOOP before reusing it
+DELIVERY_BATCH_SIZE = 20           # Messages sent per connection check
+MAX_DELIVERY_ATTEMPTS = 5
+RETRY_BASE_DELAY = 30              # Seconds; doubles after each failed attempt
+
 # Print configuration for debugging
 logger.info(f"Email Configuration: SMTP_SERVER={SMTP_SERVER}, SMTP_PORT={SMTP_PORT}, USE_TLS={USE_TLS}")
 logger.info(f"Using authentication: {bool(SMTP_USERNAME and SMTP_PASSWORD)}")
@@ -124,7 +139,10 @@ def save_email_to_file(recipient_email: str, subject: str, html_content: str, te
 
 def send_password_reset_email(recipient_email: str, reset_link: str, user_name: str = None) -> bool:
     """
-    Sends a password reset email to the specified recipient.
+    Queues a password reset email for the specified recipient.
+    
+    The message is spooled to disk and sent by the background mail queue,
+    so this returns without contacting the SMTP server.
     
     Args:
         recipient_email: The recipient's email address.
@@ -132,9 +150,9 @@ def send_password_reset_email(recipient_email: str, reset_link: str, user_name:
         user_name: The recipient's name, if available.
         
     Returns:
-        True if the email was sent successfully, False otherwise.
+        True if the email was queued (or saved to file), False otherwise.
     """
-    logger.info(f"Preparing to send password reset email to: {recipient_email}")
+    logger.info(f"Preparing password reset email for: {recipient_email}")
     subject = "Password Reset Request - Product Operations Generator"
     
     # Create message container
@@ -214,49 +232,239 @@ athenahealth
     msg.attach(part2)
     
     try:
-        logger.info(f"Connecting to SMTP server: {SMTP_SERVER}:{SMTP_PORT}")
-        # Connect to the SMTP server
-        server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT, timeout=10)
-        
-        # Set debug level to see detailed SMTP communication
-        server.set_debuglevel(1)
-        
-        # Identify ourselves to the server
-        server.ehlo()
-        
-        if USE_TLS:
-            logger.info("Starting TLS connection")
-            server.starttls()
-            server.ehlo()  # Re-identify ourselves over TLS connection
-        
-        # Login if credentials are provided
-        if SMTP_USERNAME and SMTP_PASSWORD:
-            logger.info(f"Logging in with username: {SMTP_USERNAME}")
-            server.login(SMTP_USERNAME, SMTP_PASSWORD)
-        
-        # Send the email
-        logger.info(f"Sending email from {EMAIL_SENDER} to {recipient_email}")
-        server.sendmail(EMAIL_SENDER, recipient_email, msg.as_string())
-        
-        # Close the connection
-        server.quit()
-        
-        logger.info("Email sent successfully")
+        get_mail_queue().enqueue(recipient_email, msg, html, text)
         return True
-    except (smtplib.SMTPException, ConnectionRefusedError, TimeoutError, Exception) as e:
-        # Log the error with specific error type
-        error_type = type(e).__name__
-        error_msg = f"{error_type} while sending email: {str(e)}"
-        log_error(error_msg)
+    except Exception as e:
+        log_error(f"{type(e).__name__} while queueing email: {str(e)}")
         
         # Use fallback mechanism - save email to file
         try:
             filepath = save_email_to_file(recipient_email, subject, html, text)
-            log_error(f"Email delivery failed. Email saved to file: {filepath}")
-            print(f"\nIMPORTANT: Email could not be sent due to SMTP server issues.")
-            print(f"A copy of the email has been saved to: {filepath}")
-            print(f"Please check the logs for more details.\n")
+            log_error(f"Email could not be queued. Email saved to file: {filepath}")
             return True  # Return true so the application flow continues
         except Exception as save_error:
             log_error(f"Failed to save email to file: {str(save_error)}")
             return False
+
+
+class MailQueue:
+    """
+    Spooled outbound mail with a single background sender.
+
+    Each message is written to MAIL_SPOOL_DIR as a JSON file before enqueue()
+    returns, so queued mail survives a restart. The sender thread delivers
+    pending messages in batches over one SMTP connection, which it keeps open
+    between batches (checked with NOOP) until it has been idle for
+    SMTP_IDLE_TIMEOUT. Failed messages are retried with exponential backoff and,
+    after MAX_DELIVERY_ATTEMPTS, saved with save_email_to_file() for follow-up.
+    A sent message's file is renamed to .sent before it is deleted, so a failed
+    delete never causes it to be sent again.
+    """
+
+    def __init__(self, spool_dir: str = MAIL_SPOOL_DIR):
+        self.spool_dir = spool_dir
+        os.makedirs(spool_dir, exist_ok=True)
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._server = None
+        self._last_used = 0.0
+        # Sent messages whose spool file could not be retired; never sent again by this process
+        self._delivered = set()
+        self._thread = threading.Thread(target=self._run, name="mail-queue", daemon=True)
+        self._thread.start()
+
+    def enqueue(self, recipient_email: str, msg, html_content: str, text_content: str) -> str:
+        """Writes a message to the spool and wakes the sender. Returns the spool file path."""
+        entry = {
+            "recipient": recipient_email,
+            "subject": msg['Subject'],
+            "message": msg.as_string(),
+            "html": html_content,
+            "text": text_content,
+            "attempts": 0,
+            "next_attempt": 0,
+        }
+        filename = f"{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex}.json"
+        path = os.path.join(self.spool_dir, filename)
+        self._write_entry(path, entry)
+        logger.info(f"Queued email to {recipient_email} ({filename})")
+        self._wakeup.set()
+        return path
+
+    def stop(self, timeout: float = 10):
+        """Stops the sender after its current batch; unsent mail stays in the spool."""
+        self._stopping.set()
+        self._wakeup.set()
+        self._thread.join(timeout)
+
+    def _write_entry(self, path: str, entry: dict):
+        # Write then rename, so the sender never reads a partial file
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+    def _pending(self):
+        """Returns (path, entry) for spooled messages due now, oldest first, and the next due time."""
+        due, next_due = [], None
+        now = time.time()
+        for filename in sorted(os.listdir(self.spool_dir)):
+            if filename.endswith(".sent"):
+                self._remove_sent(os.path.join(self.spool_dir, filename))
+                continue
+            if not filename.endswith(".json"):
+                continue
+            path = os.path.join(self.spool_dir, filename)
+            if path in self._delivered:
+                continue
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    entry = json.load(f)
+            except (OSError, ValueError) as e:
+                log_error(f"Skipping unreadable spooled email {filename}: {str(e)}")
+                continue
+            if entry["next_attempt"] <= now:
+                due.append((path, entry))
+            elif next_due is None or entry["next_attempt"] < next_due:
+                next_due = entry["next_attempt"]
+        return due, next_due
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                due, next_due = self._pending()
+                for start in range(0, len(due), DELIVERY_BATCH_SIZE):
+                    if self._stopping.is_set():
+                        break
+                    self._deliver_batch(due[start:start + DELIVERY_BATCH_SIZE])
+                if due:
+                    continue  # Look again: retries or new mail may be due
+                wait = SMTP_IDLE_TIMEOUT if next_due is None else max(min(next_due - time.time(), SMTP_IDLE_TIMEOUT), 0)
+            except Exception as e:
+                log_error(f"Mail queue error: {type(e).__name__}: {str(e)}")
+                wait = RETRY_BASE_DELAY
+            self._wakeup.wait(wait)
+            self._wakeup.clear()
+            if self._server and time.time() - self._last_used >= SMTP_IDLE_TIMEOUT:
+                self._disconnect()
+        self._disconnect()
+
+    def _deliver_batch(self, batch):
+        """Sends a batch over the shared connection, rescheduling messages that fail."""
+        try:
+            server = self._connection()
+        except (smtplib.SMTPException, OSError) as e:
+            log_error(f"{type(e).__name__} while connecting to SMTP server: {str(e)}")
+            for path, entry in batch:
+                self._record_failure(path, entry, e)
+            return
+
+        for path, entry in batch:
+            try:
+                logger.info(f"Sending email from {EMAIL_SENDER} to {entry['recipient']}")
+                server.sendmail(EMAIL_SENDER, entry["recipient"], entry["message"])
+            except (smtplib.SMTPServerDisconnected, OSError) as e:
+                # The connection is gone; reconnect for the rest of the batch
+                self._disconnect()
+                self._record_failure(path, entry, e)
+                try:
+                    server = self._connection()
+                except (smtplib.SMTPException, OSError):
+                    return
+            except smtplib.SMTPException as e:
+                self._record_failure(path, entry, e)
+            else:
+                logger.info(f"Email sent successfully to {entry['recipient']}")
+                self._mark_delivered(path)
+            self._last_used = time.time()
+
+    def _mark_delivered(self, path: str):
+        """Retires a sent message's spool file so no later pass sends it again."""
+        # Renaming is the delivery marker: _pending() only picks up .json files
+        sent_path = path[:-len(".json")] + ".sent"
+        try:
+            os.replace(path, sent_path)
+        except OSError as e:
+            log_error(f"Could not mark spooled email {os.path.basename(path)} as sent: {str(e)}")
+            self._delivered.add(path)
+            return
+        self._remove_sent(sent_path)
+
+    def _remove_sent(self, sent_path: str):
+        try:
+            os.remove(sent_path)
+        except OSError as e:
+            # Left-over .sent files are never resent; the next pass tries again
+            logger.warning(f"Could not remove sent email {os.path.basename(sent_path)}: {str(e)}")
+
+    def _record_failure(self, path: str, entry: dict, error: Exception):
+        entry["attempts"] += 1
+        if entry["attempts"] >= MAX_DELIVERY_ATTEMPTS:
+            log_error(f"Giving up on email to {entry['recipient']} after {entry['attempts']} attempts: {str(error)}")
+            try:
+                filepath = save_email_to_file(entry["recipient"], entry["subject"], entry["html"], entry["text"])
+                log_error(f"Email delivery failed. Email saved to file: {filepath}")
+            except Exception as save_error:
+                log_error(f"Failed to save email to file: {str(save_error)}")
+            os.remove(path)
+            return
+        delay = RETRY_BASE_DELAY * 2 ** (entry["attempts"] - 1)
+        entry["next_attempt"] = time.time() + delay
+        log_error(f"{type(error).__name__} while sending email to {entry['recipient']}; retrying in {delay}s: {str(error)}")
+        self._write_entry(path, entry)
+
+    def _connection(self) -> smtplib.SMTP:
+        """Returns an open SMTP connection, checking an idle one with NOOP before reuse."""
+        if self._server and time.time() - self._last_used >= SMTP_NOOP_INTERVAL:
+            try:
+                if self._server.noop()[0] != 250:
+                    self._disconnect()
+            except (smtplib.SMTPException, OSError):
+                self._disconnect()
+        if self._server is None:
+            logger.info(f"Connecting to SMTP server: {SMTP_SERVER}:{SMTP_PORT}")
+            server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT, timeout=SMTP_TIMEOUT)
+            try:
+                # Identify ourselves to the server
+                server.ehlo()
+                if USE_TLS:
+                    logger.info("Starting TLS connection")
+                    server.starttls()
+                    server.ehlo()  # Re-identify ourselves over TLS connection
+                # Login if credentials are provided
+                if SMTP_USERNAME and SMTP_PASSWORD:
+                    logger.info(f"Logging in with username: {SMTP_USERNAME}")
+                    server.login(SMTP_USERNAME, SMTP_PASSWORD)
+            except Exception:
+                server.close()
+                raise
+            self._server = server
+            self._last_used = time.time()
+        return self._server
+
+    def _disconnect(self):
+        if self._server is None:
+            return
+        try:
+            self._server.quit()
+        except (smtplib.SMTPException, OSError):
+            self._server.close()
+        self._server = None
+
+
+_mail_queue = None
+_mail_queue_lock = threading.Lock()
+
+
+def get_mail_queue() -> MailQueue:
+    """
+    Returns the process-wide mail queue, starting its sender thread on first use.
+
+    The app calls this at startup, so mail spooled before a restart is sent without
+    waiting for a new message to be queued.
+    """
+    global _mail_queue
+    with _mail_queue_lock:
+        if _mail_queue is None:
+            _mail_queue = MailQueue()
+        return _mail_queue
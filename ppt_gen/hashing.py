@@ -0,0 +1,189 @@
+"""
+Password hashing for application logins.
+
+bcrypt hashing and verification run in a small process pool, so a burst of
+logins cannot tie up the web server's worker threads or the interpreter. The
+bcrypt cost is taken from BCRYPT_ROUNDS, or measured at first use to fit
+PASSWORD_HASH_TARGET_MS, and hashes made with a lower cost are upgraded on the
+next successful login.
+"""
+import os
+import math
+import time
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import bcrypt
+
+logger = logging.getLogger(__name__)
+
+# Fixed bcrypt cost; when unset, the cost is measured against PASSWORD_HASH_TARGET_MS
+BCRYPT_ROUNDS = os.getenv("BCRYPT_ROUNDS")
+PASSWORD_HASH_TARGET_MS = int(os.getenv("PASSWORD_HASH_TARGET_MS", "250"))
+MIN_BCRYPT_ROUNDS = 10
+MAX_BCRYPT_ROUNDS = 14
+
+# Worker processes, and the number of hashing jobs that may wait for one
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_QUEUE_LIMIT = PASSWORD_HASH_WORKERS * 8
+PASSWORD_HASH_TIMEOUT = 15  # Seconds a request waits for a hashing result
+
+# bcrypt only uses the first 72 bytes of a password
+BCRYPT_MAX_PASSWORD_BYTES = 72
+
+
+class PasswordHashingBusy(RuntimeError):
+    """Raised when too many hashing jobs are already waiting."""
+
+
+def _encode(password: str) -> bytes:
+    return password.encode("utf-8")[:BCRYPT_MAX_PASSWORD_BYTES]
+
+
+def _hash(password: str, rounds: int) -> str:
+    return bcrypt.hashpw(_encode(password), bcrypt.gensalt(rounds)).decode("utf-8")
+
+
+def _check(password_hash: str, password: str) -> bool:
+    try:
+        return bcrypt.checkpw(_encode(password), password_hash.encode("utf-8"))
+    except ValueError:
+        # Not a bcrypt hash
+        return False
+
+
+def measure_bcrypt_rounds(target_ms: int = PASSWORD_HASH_TARGET_MS) -> int:
+    """
+    Returns the highest bcrypt cost whose hash takes at most target_ms on this machine.
+
+    Each extra round doubles the work, so one hash at MIN_BCRYPT_ROUNDS is enough to
+    extrapolate. The result is clamped to [MIN_BCRYPT_ROUNDS, MAX_BCRYPT_ROUNDS].
+    """
+    start = time.perf_counter()
+    _hash("calibration-password", MIN_BCRYPT_ROUNDS)
+    elapsed_ms = max((time.perf_counter() - start) * 1000, 0.001)
+    rounds = MIN_BCRYPT_ROUNDS + math.floor(math.log2(target_ms / elapsed_ms))
+    return max(MIN_BCRYPT_ROUNDS, min(MAX_BCRYPT_ROUNDS, rounds))
+
+
+_rounds = None
+_pool = None
+_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(PASSWORD_HASH_QUEUE_LIMIT)
+# Saves rehashed passwords, keeping database writes off the pool's result thread
+_rehash_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="password-rehash")
+
+
+def get_bcrypt_rounds() -> int:
+    """
+    Returns the configured bcrypt cost, measuring it on first use if BCRYPT_ROUNDS is not set.
+
+    The app calls this at startup, so the calibration hash doesn't run on a login request.
+    """
+    global _rounds
+    with _lock:
+        if _rounds is None:
+            if BCRYPT_ROUNDS:
+                _rounds = int(BCRYPT_ROUNDS)
+                logger.info(f"Using configured bcrypt cost: {_rounds}")
+            else:
+                _rounds = measure_bcrypt_rounds()
+                logger.info(f"Measured bcrypt cost for ~{PASSWORD_HASH_TARGET_MS}ms per hash: {_rounds}")
+        return _rounds
+
+
+def _get_pool():
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=PASSWORD_HASH_WORKERS)
+        return _pool
+
+
+def _discard_pool(pool):
+    global _pool
+    with _lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _submit(fn, *args):
+    """
+    Runs fn in the process pool and returns a future, holding a queue slot until it finishes.
+
+    Raises PasswordHashingBusy at once when every slot is taken, so a saturated pool
+    turns requests away instead of tying up their threads.
+    """
+    if not _slots.acquire(blocking=False):
+        raise PasswordHashingBusy("Too many password hashing requests in progress")
+    pool = _get_pool()
+    try:
+        future = pool.submit(fn, *args)
+    except (BrokenProcessPool, RuntimeError):
+        # The pool died (e.g. a worker was killed); start a fresh one
+        _discard_pool(pool)
+        try:
+            future = _get_pool().submit(fn, *args)
+        except BaseException:
+            _slots.release()
+            raise
+    except BaseException:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+    return future
+
+
+def hash_password(password: str) -> str:
+    """Hashes a password with the configured bcrypt cost, off the calling thread."""
+    return _submit(_hash, password, get_bcrypt_rounds()).result(timeout=PASSWORD_HASH_TIMEOUT)
+
+
+def check_password(password_hash: str, password: str) -> bool:
+    """Checks a password against a bcrypt hash, off the calling thread."""
+    if not password_hash or password is None:
+        return False
+    return _submit(_check, password_hash, password).result(timeout=PASSWORD_HASH_TIMEOUT)
+
+
+def needs_rehash(password_hash: str) -> bool:
+    """
+    Returns True if a bcrypt hash ('$2b$<cost>$...') was made with a lower cost than configured.
+
+    Hashes are never downgraded: a measured cost can differ slightly between processes,
+    and rehashing in both directions would rewrite the same hashes back and forth.
+    """
+    try:
+        return int(password_hash.split("$")[2]) < get_bcrypt_rounds()
+    except (AttributeError, IndexError, ValueError):
+        return False
+
+
+def rehash_in_background(password: str, on_hashed) -> None:
+    """
+    Hashes a password with the configured cost and passes the new hash to on_hashed,
+    without making the caller wait. on_hashed runs on a separate writer thread, so a
+    slow database write never holds up the pool. Failures are logged; the old hash
+    stays valid.
+    """
+    def save(new_hash):
+        try:
+            on_hashed(new_hash)
+        except Exception as e:
+            logger.error(f"Saving rehashed password failed: {e}")
+
+    def done(future):
+        try:
+            new_hash = future.result()
+        except Exception as e:
+            logger.error(f"Background password rehash failed: {e}")
+            return
+        _rehash_writer.submit(save, new_hash)
+
+    try:
+        _submit(_hash, password, get_bcrypt_rounds()).add_done_callback(done)
+    except Exception as e:
+        logger.error(f"Could not schedule password rehash: {e}")
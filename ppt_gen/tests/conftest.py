@@ -0,0 +1,12 @@
+"""
+Configuration for pytest so the app's flat modules import as they do at runtime.
+"""
+
+import sys
+from pathlib import Path
+
+
+# Add the app directory to Python path for imports
+app_dir = Path(__file__).resolve().parent.parent
+if str(app_dir) not in sys.path:
+    sys.path.insert(0, str(app_dir))
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Pytest tests for the spooled mail queue, delivering to a local aiosmtpd server.
+"""
+
+import os
+import json
+import time
+import socket
+import pytest
+from email.mime.text import MIMEText
+from aiosmtpd.controller import Controller
+
+import email_service
+from email_service import MailQueue
+
+
+class RecordingHandler:
+    """SMTP handler that records delivered messages, rejecting the first `failures` with a 451."""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.attempts = 0
+        self.delivered = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.attempts += 1
+        if self.attempts <= self.failures:
+            return "451 Try again later"
+        self.delivered.append(envelope)
+        return "250 Message accepted for delivery"
+
+
+def free_port():
+    """Return a local port that is free to listen on."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server(monkeypatch):
+    """Fixture to run a local SMTP server and point the mail queue at it."""
+    servers = []
+
+    def start(failures=0):
+        handler = RecordingHandler(failures)
+        controller = Controller(handler, hostname="127.0.0.1", port=free_port())
+        controller.start()
+        servers.append(controller)
+        monkeypatch.setattr(email_service, "SMTP_SERVER", "127.0.0.1")
+        monkeypatch.setattr(email_service, "SMTP_PORT", controller.port)
+        monkeypatch.setattr(email_service, "USE_TLS", False)
+        monkeypatch.setattr(email_service, "SMTP_USERNAME", "")
+        monkeypatch.setattr(email_service, "RETRY_BASE_DELAY", 0)
+        return handler
+
+    yield start
+    for controller in servers:
+        controller.stop()
+
+
+@pytest.fixture
+def queues():
+    """Fixture to stop every mail queue a test starts."""
+    started = []
+
+    def start(spool_dir):
+        queue = MailQueue(spool_dir=str(spool_dir))
+        started.append(queue)
+        return queue
+
+    yield start
+    for queue in started:
+        queue.stop()
+
+
+def message(subject="Reset your password"):
+    """Build a minimal message as send_password_reset_email() does."""
+    msg = MIMEText("Reset link", "plain")
+    msg["Subject"] = subject
+    msg["From"] = email_service.EMAIL_SENDER
+    msg["To"] = "user@example.com"
+    return msg
+
+
+def wait_for(condition, timeout=10):
+    """Poll until condition() is true or the timeout passes."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return condition()
+
+
+def test_enqueued_mail_is_delivered(smtp_server, queues, tmp_path):
+    """Test that a queued message is sent and removed from the spool."""
+    handler = smtp_server()
+    queue = queues(tmp_path)
+
+    path = queue.enqueue("user@example.com", message(), "<p>Reset link</p>", "Reset link")
+
+    assert wait_for(lambda: handler.delivered)
+    assert handler.delivered[0].rcpt_tos == ["user@example.com"]
+    assert b"Subject: Reset your password" in handler.delivered[0].original_content
+    assert wait_for(lambda: not os.path.exists(path))
+
+
+def test_rejected_mail_is_retried(smtp_server, queues, tmp_path):
+    """Test that a temporary rejection is retried until the message is delivered."""
+    handler = smtp_server(failures=2)
+    queue = queues(tmp_path)
+
+    path = queue.enqueue("user@example.com", message(), "<p>Reset link</p>", "Reset link")
+
+    assert wait_for(lambda: handler.delivered)
+    assert handler.attempts == 3
+    assert wait_for(lambda: not os.path.exists(path))
+
+
+def test_mail_spooled_before_start_is_delivered(smtp_server, queues, tmp_path):
+    """Test that a new queue sends mail left in the spool by an earlier run."""
+    handler = smtp_server()
+    entry = {
+        "recipient": "user@example.com",
+        "subject": "Left over",
+        "message": message("Left over").as_string(),
+        "html": "<p>Reset link</p>",
+        "text": "Reset link",
+        "attempts": 0,
+        "next_attempt": 0,
+    }
+    path = tmp_path / "20240101_000000_leftover.json"
+    path.write_text(json.dumps(entry), encoding="utf-8")
+
+    queues(tmp_path)
+
+    assert wait_for(lambda: handler.delivered)
+    assert b"Subject: Left over" in handler.delivered[0].original_content
+    assert wait_for(lambda: not path.exists())
+
+
+def test_sent_mail_is_not_resent_when_spool_cleanup_fails(smtp_server, queues, tmp_path, monkeypatch):
+    """Test that a delivered message whose spool file can't be deleted is not sent again."""
+    handler = smtp_server()
+    monkeypatch.setattr(MailQueue, "_remove_sent", lambda self, sent_path: None)
+    queue = queues(tmp_path)
+
+    path = queue.enqueue("user@example.com", message(), "<p>Reset link</p>", "Reset link")
+    assert wait_for(lambda: handler.delivered)
+    queue.enqueue("other@example.com", message("Second"), "<p>Second</p>", "Second")
+    assert wait_for(lambda: len(handler.delivered) == 2)
+    time.sleep(0.2)
+
+    assert [envelope.rcpt_tos for envelope in handler.delivered] == [["user@example.com"], ["other@example.com"]]
+    assert not os.path.exists(path)
+    assert os.path.exists(path[:-len(".json")] + ".sent")
+
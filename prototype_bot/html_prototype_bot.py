@@ -8,7 +8,8 @@ Uses Athena GPT to create modern, responsive HTML with CSS styling.
 import streamlit as st
 import json
 import os
-from typing import Dict, Any, Optional
+import re
+from typing import Dict, Any, Iterator, List, Optional, Union
 from openai import AzureOpenAI
 from pathlib import Path
 import time
@@ -17,6 +18,8 @@ import webbrowser
 import tempfile
 import subprocess
 
+import token_budget
+
 # Page configuration
 st.set_page_config(
     page_title="HTML Prototype Bot",
@@ -108,7 +111,8 @@ def load_config() -> Dict[str, Any]:
         "api_version": "2025-01-01-preview",
         "model": "gpt-4o-mini-2024-07-18",
         "environment": "uat",
-        "max_history": 5,  # Reduced to prevent token limit issues
+        "max_prompt_tokens": 24000,  # Upper bound on prompt tokens sent per request
+        "max_message_tokens": 12000,  # Upper bound on the tokens of any single message
     }
     
     # API endpoints
@@ -120,6 +124,8 @@ def load_config() -> Dict[str, Any]:
     # Override from environment variables if present
     config["environment"] = os.environ.get("ATHENAGPT_ENVIRONMENT", "uat")
     config["api_key"] = os.environ.get("AGPT_API") or os.environ.get("ATHENAGPT_API_KEY")
+    if os.environ.get("PROTOTYPE_MAX_PROMPT_TOKENS"):
+        config["max_prompt_tokens"] = int(os.environ["PROTOTYPE_MAX_PROMPT_TOKENS"])
     
     # Debug: Print environment variable status
     print(f"DEBUG: AGPT_API found: {'Yes' if os.environ.get('AGPT_API') else 'No'}")
@@ -155,12 +161,34 @@ def read_api_key(cred_file_path: Path) -> Optional[str]:
         st.error(f"Error reading API key: {e}")
         return None
 
+def summarize_dropped_requests(dropped: List[Dict[str, str]]) -> str:
+    """Note what was asked in the turns dropped from the prompt."""
+    requests = [m["content"].strip().splitlines()[0][:200] for m in dropped if m["role"] == "user" and m["content"].strip()]
+    return f"[{len(dropped)} earlier messages omitted. Earlier requests: " + "; ".join(requests) + "]"
+
+# GPT-4o's maximum output token limit
+MAX_OUTPUT_TOKENS = 16000
+
+EMPTY_RESPONSE_ERROR = "❌ API Error: Received empty response from Athena GPT. This might be due to content filtering or service issues. Try breaking your request into smaller parts."
+
+# Seconds between redraws while a response is streaming
+STREAM_RENDER_INTERVAL = 0.3
+
 class HTMLPrototypeBot:
     """HTML Prototype Generation Bot using Athena GPT."""
     
     def __init__(self):
         self.config = load_config()
         self.client = None
+        self.token_counter = token_budget.TokenCounter(self.config["model"])
+        # HTML from all but the latest reply is replaced with a reference (the latest
+        # prototype is the one being edited), and dropped turns leave a note of the requests
+        self.history_budget = token_budget.HistoryBudget(
+            self.token_counter,
+            max_prompt_tokens=self.config["max_prompt_tokens"],
+            max_message_tokens=self.config["max_message_tokens"],
+            summarizer=summarize_dropped_requests
+        )
         self.system_prompt = """You are an expert HTML/CSS/JavaScript developer specializing in creating modern, responsive prototypes for internal business tools and applications.
 
 **CRITICAL TOKEN LIMIT AWARENESS:**
@@ -216,39 +244,41 @@ Always stay within token limits and provide working, complete solutions."""
             st.error(f"Failed to initialize client: {e}")
             return False
 
-    def send_message(self, message: str, conversation_history: list) -> str:
-        """Send a message to Athena GPT and get response."""
+    def send_message(self, message: str, conversation_history: list, stream: bool = False) -> Union[str, Iterator[str]]:
+        """Send a message to Athena GPT and get response.
+        
+        With stream=True an iterator over the response text is returned instead,
+        yielding pieces as the model generates them.
+        """
         if not self.client:
             if not self.initialize_client():
-                return "❌ Unable to connect to Athena GPT. Please check your API configuration."
+                error = "❌ Unable to connect to Athena GPT. Please check your API configuration."
+                return iter([error]) if stream else error
+        
+        # Add conversation history and the current message (the UI may already have appended it)
+        history = list(conversation_history or [])
+        if not history or history[-1] != {"role": "user", "content": message}:
+            history.append({"role": "user", "content": message})
+        
+        # Fit the system prompt and history to the prompt token budget
+        messages = self.history_budget.compact([{"role": "system", "content": self.system_prompt}] + history)
+        
+        print(f"DEBUG: Making API call to {self.config['api_endpoint']}")
+        print(f"DEBUG: Using model: {self.config['model']}")
+        print(f"DEBUG: API key present: {'Yes' if self.config['api_key'] else 'No'}")
+        print(f"DEBUG: Message count: {len(messages)}")
+        print(f"DEBUG: Prompt tokens: {self.token_counter.count_messages(messages)}")
+        
+        if stream:
+            return self._stream_response(messages)
         
         try:
-            # Prepare messages with conversation history
-            messages = [{"role": "system", "content": self.system_prompt}]
-            
-            # Add conversation history (limit to max_history)
-            if conversation_history:
-                messages.extend(conversation_history[-self.config["max_history"]:])
-            
-            # Add current message
-            messages.append({"role": "user", "content": message})
-            
-            print(f"DEBUG: Making API call to {self.config['api_endpoint']}")
-            print(f"DEBUG: Using model: {self.config['model']}")
-            print(f"DEBUG: API key present: {'Yes' if self.config['api_key'] else 'No'}")
-            print(f"DEBUG: Message count: {len(messages)}")
-            print(f"DEBUG: Last message length: {len(messages[-1]['content']) if messages else 0}")
-            
-            # Use GPT-4o's maximum output limit of 16K tokens
-            max_tokens_to_use = 16000  # GPT-4o's maximum output token limit
-            print(f"DEBUG: Using max_tokens: {max_tokens_to_use}")
-            
             # Call Athena GPT
             response = self.client.chat.completions.create(
                 model=self.config["model"],
                 messages=messages,
                 temperature=0.7,
-                max_tokens=max_tokens_to_use
+                max_tokens=MAX_OUTPUT_TOKENS
             )
             
             print(f"DEBUG: Response object type: {type(response)}")
@@ -264,7 +294,7 @@ Always stay within token limits and provide working, complete solutions."""
             
             # Check if response is valid
             if not response or not response.choices or len(response.choices) == 0:
-                return "❌ API Error: Received empty response from Athena GPT. This might be due to content filtering or service issues. Try breaking your request into smaller parts."
+                return EMPTY_RESPONSE_ERROR
             
             if not response.choices[0].message or not response.choices[0].message.content:
                 return "❌ API Error: Received invalid response structure from Athena GPT. The request might have been filtered or blocked. Try simplifying your request."
@@ -272,20 +302,49 @@ Always stay within token limits and provide working, complete solutions."""
             return response.choices[0].message.content
             
         except Exception as e:
-            print(f"DEBUG: Full error details: {type(e).__name__}: {str(e)}")
-            error_str = str(e).lower()
-            
-            # Check for specific error types
-            if "expecting value" in error_str:
-                return f"❌ API Response Error: The request was too complex and the response was truncated. Try breaking your request into smaller, simpler parts."
-            elif "token" in error_str and "limit" in error_str:
-                return f"❌ Token Limit Error: Your request is too long. Try using fewer words or break it into smaller requests."
-            elif "rate limit" in error_str:
-                return f"❌ Rate Limit Error: Too many requests. Please wait a moment and try again."
-            elif "timeout" in error_str:
-                return f"❌ Timeout Error: The request took too long. Try a simpler request."
-            else:
-                return f"❌ Error communicating with Athena GPT: {str(e)}"
+            return self._format_error(e)
+
+    def _stream_response(self, messages: list) -> Iterator[str]:
+        """Stream a completion, yielding text as it arrives (first token instead of full-completion latency)."""
+        received = False
+        try:
+            stream = self.client.chat.completions.create(
+                model=self.config["model"],
+                messages=messages,
+                temperature=0.7,
+                max_tokens=MAX_OUTPUT_TOKENS,
+                stream=True
+            )
+            for chunk in stream:
+                # Azure sends a leading chunk with no choices (content filter results)
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    received = True
+                    yield delta
+            if not received:
+                yield EMPTY_RESPONSE_ERROR
+        except Exception as e:
+            error = self._format_error(e)
+            yield f"\n\n{error}" if received else error
+
+    def _format_error(self, e: Exception) -> str:
+        """Turn an API exception into a message for the chat."""
+        print(f"DEBUG: Full error details: {type(e).__name__}: {str(e)}")
+        error_str = str(e).lower()
+        
+        # Check for specific error types
+        if "expecting value" in error_str:
+            return f"❌ API Response Error: The request was too complex and the response was truncated. Try breaking your request into smaller, simpler parts."
+        elif "token" in error_str and "limit" in error_str:
+            return f"❌ Token Limit Error: Your request is too long. Try using fewer words or break it into smaller requests."
+        elif "rate limit" in error_str:
+            return f"❌ Rate Limit Error: Too many requests. Please wait a moment and try again."
+        elif "timeout" in error_str:
+            return f"❌ Timeout Error: The request took too long. Try a simpler request."
+        else:
+            return f"❌ Error communicating with Athena GPT: {str(e)}"
 
 def extract_html_from_response(response: str) -> Optional[str]:
     """Extract HTML code from the bot response."""
@@ -309,6 +368,61 @@ def extract_html_from_response(response: str) -> Optional[str]:
     
     return None
 
+def extract_partial_html(response: str) -> Optional[str]:
+    """Extract the HTML generated so far from a response that may still be streaming."""
+    html = extract_html_from_response(response)
+    if html:
+        return html
+    
+    # An opened html block (or an unlabelled block starting with markup) that hasn't closed yet
+    fence_match = re.search(r'```(?:html)?\s*(?=<)', response, re.IGNORECASE)
+    if not fence_match:
+        return None
+    
+    # Drop a closing fence that has only partly arrived
+    partial = response[fence_match.end():].rstrip('`').strip()
+    return partial or None
+
+def split_streaming_reply(response: str):
+    """Split a streaming response into the chat text before its code block and the partial HTML."""
+    partial_html = extract_partial_html(response)
+    if partial_html is None:
+        return response, None
+    
+    fence_start = response.find('```')
+    return response[:fence_start].strip(), partial_html
+
+def stream_bot_response(prompt: str) -> str:
+    """Stream the bot's reply into the page as it arrives and return the full response.
+    
+    Chat text and the partial HTML are redrawn at most every STREAM_RENDER_INTERVAL seconds.
+    """
+    chat_placeholder = st.empty()
+    html_placeholder = st.empty()
+    parts = []
+    last_render = 0.0
+    
+    for piece in st.session_state.bot.send_message(prompt, st.session_state.conversation_history, stream=True):
+        parts.append(piece)
+        now = time.time()
+        if now - last_render < STREAM_RENDER_INTERVAL:
+            continue
+        last_render = now
+        
+        chat_text, partial_html = split_streaming_reply("".join(parts))
+        if partial_html is not None:
+            chat_text = f"{chat_text}<br><em>Generating HTML... ({len(partial_html):,} characters so far)</em>"
+        chat_placeholder.markdown(
+            f'<div class="chat-message assistant-message"><strong>🤖 Prototype Bot:</strong><br>{chat_text}</div>',
+            unsafe_allow_html=True
+        )
+        if partial_html is not None:
+            html_placeholder.code(partial_html, language="html")
+    
+    chat_placeholder.empty()
+    html_placeholder.empty()
+    return "".join(parts)
+
 def clean_response_for_chat(response: str) -> str:
     """Remove HTML code blocks from response for clean chat display."""
     import re
@@ -377,15 +491,14 @@ def main():
                 # Add template message to conversation
                 st.session_state.conversation_history.append({"role": "user", "content": template_prompt})
                 
-                # Get bot response
-                with st.spinner(f"Generating {template_name} prototype..."):
-                    response = st.session_state.bot.send_message(template_prompt, st.session_state.conversation_history)
-                    st.session_state.conversation_history.append({"role": "assistant", "content": response})
-                    
-                    # Extract HTML if present
-                    html_content = extract_html_from_response(response)
-                    if html_content:
-                        st.session_state.generated_html = html_content
+                # Get bot response, rendering it as it streams in
+                response = stream_bot_response(template_prompt)
+                st.session_state.conversation_history.append({"role": "assistant", "content": response})
+                
+                # Extract HTML if present
+                html_content = extract_html_from_response(response)
+                if html_content:
+                    st.session_state.generated_html = html_content
                 
                 st.rerun()
         
@@ -486,15 +599,14 @@ def main():
                     # Add user message to conversation
                     st.session_state.conversation_history.append({"role": "user", "content": user_input})
                     
-                    # Get bot response
-                    with st.spinner("Generating your prototype..."):
-                        response = st.session_state.bot.send_message(user_input, st.session_state.conversation_history)
-                        st.session_state.conversation_history.append({"role": "assistant", "content": response})
-                        
-                        # Extract HTML if present
-                        html_content = extract_html_from_response(response)
-                        if html_content:
-                            st.session_state.generated_html = html_content
+                    # Get bot response, rendering it as it streams in
+                    response = stream_bot_response(user_input)
+                    st.session_state.conversation_history.append({"role": "assistant", "content": response})
+                    
+                    # Extract HTML if present
+                    html_content = extract_html_from_response(response)
+                    if html_content:
+                        st.session_state.generated_html = html_content
                     
                     st.rerun()
         with col_btn2:
@@ -0,0 +1,171 @@
+"""
+Token budgeting for chat history.
+
+This module counts prompt tokens with a local tokenizer (tiktoken when it is
+installed, a character-based estimate otherwise) and compacts conversation
+history to fit a prompt budget: generated HTML from earlier turns is replaced
+with short references, oversized messages are truncated, and the oldest turns
+are folded into a brief summary.
+
+The bot is deployed on its own, so this is a local copy of the ROIA suite
+backend's app/token_budget.py; keep the two in step.
+"""
+
+import re
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Rough characters per token for English text and code, used without tiktoken
+CHARS_PER_TOKEN = 4
+
+# Tokens the chat format adds around each message (role, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# Fenced HTML blocks, or bare documents, produced by earlier turns
+HTML_BLOB_PATTERN = re.compile(
+    r'```html\s*.*?```|<!DOCTYPE html>.*?</html>',
+    re.DOTALL | re.IGNORECASE
+)
+
+# Smallest leftover budget worth spending on a summary of dropped turns
+MIN_SUMMARY_TOKENS = 32
+
+TRUNCATION_MARKER = "\n[... {omitted} tokens omitted ...]\n"
+
+
+class TokenCounter:
+    """Counts tokens with tiktoken, or estimates them from text length."""
+
+    def __init__(self, model: Optional[str] = None):
+        """Initialize the counter.
+
+        Args:
+            model: Model name used to pick the tiktoken encoding
+        """
+        self.encoding = None
+        if tiktoken is not None:
+            try:
+                self.encoding = tiktoken.encoding_for_model(model or "")
+            except KeyError:
+                self.encoding = tiktoken.get_encoding("o200k_base")
+        # Messages are re-counted on every turn, so remember recent texts
+        self.count = lru_cache(maxsize=2048)(self._count)
+
+    def _count(self, text: str) -> int:
+        if not text:
+            return 0
+        if self.encoding is not None:
+            return len(self.encoding.encode(text, disallowed_special=()))
+        return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+    def count_messages(self, messages: List[Dict[str, str]]) -> int:
+        """Return the prompt tokens used by a list of chat messages."""
+        return sum(self.count(m.get("content") or "") + MESSAGE_OVERHEAD_TOKENS for m in messages)
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Shorten text to at most max_tokens (marker included), keeping its beginning and end."""
+        total = self.count(text)
+        if total <= max_tokens:
+            return text
+        marker = TRUNCATION_MARKER.format(omitted=total - max_tokens)
+        available = max_tokens - self.count(marker)
+        if available <= 0:
+            return ""
+        # Keep proportional slices of characters from each end, shrinking them
+        # until the result fits (token density varies along the text)
+        keep_chars = int(len(text) * available / total)
+        while True:
+            head = keep_chars * 2 // 3
+            tail = keep_chars - head
+            truncated = text[:head] + marker + (text[-tail:] if tail else "")
+            if keep_chars == 0 or self.count(truncated) <= max_tokens:
+                return truncated
+            keep_chars = keep_chars * 9 // 10
+
+
+def replace_html_blobs(text: str, label: str) -> str:
+    """Replace generated HTML in a message with a short reference to it."""
+    return HTML_BLOB_PATTERN.sub(f"[{label} omitted from history]", text)
+
+
+def summarize_turns(messages: List[Dict[str, str]], max_chars: int = 200) -> str:
+    """Summarize dropped turns by the opening line of each message."""
+    lines = []
+    for message in messages:
+        content = (message.get("content") or "").strip()
+        first_line = content.splitlines()[0] if content else ""
+        if len(first_line) > max_chars:
+            first_line = first_line[:max_chars] + "..."
+        lines.append(f"- {message['role']}: {first_line}")
+    return "Summary of earlier conversation:\n" + "\n".join(lines)
+
+
+class HistoryBudget:
+    """Compacts chat history so each prompt stays within a token budget."""
+
+    def __init__(self, counter: TokenCounter, max_prompt_tokens: int, max_message_tokens: int,
+                 summarizer: Optional[Callable[[List[Dict[str, str]]], str]] = None):
+        """Initialize the budget.
+
+        Args:
+            counter: Token counter for the model
+            max_prompt_tokens: Upper bound on the tokens sent per request
+            max_message_tokens: Upper bound on the tokens of any single message
+            summarizer: Optional function condensing dropped turns (defaults to summarize_turns)
+        """
+        self.counter = counter
+        self.max_prompt_tokens = max_prompt_tokens
+        self.max_message_tokens = max_message_tokens
+        self.summarizer = summarizer or summarize_turns
+
+    def compact(self, messages: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """Return the messages to send, fitted to the prompt budget.
+
+        The leading system message and the latest message are always kept.
+        HTML generated before the latest assistant message is replaced with a
+        reference, messages over max_message_tokens are truncated, and the
+        oldest turns are dropped (and summarized) until the prompt fits.
+
+        Args:
+            messages: Full history, optionally starting with a system message
+
+        Returns:
+            A new list of messages; the input is not modified
+        """
+        if not messages:
+            return []
+        system = [messages[0]] if messages[0]["role"] == "system" else []
+        turns = [dict(m) for m in messages[len(system):]]
+
+        # Only the most recent prototype is worth resending in full
+        last_assistant = max((i for i, m in enumerate(turns) if m["role"] == "assistant"), default=-1)
+        version = 0
+        for i, message in enumerate(turns):
+            if message["role"] == "assistant" and i != last_assistant and HTML_BLOB_PATTERN.search(message["content"] or ""):
+                version += 1
+                message["content"] = replace_html_blobs(message["content"], f"HTML prototype v{version}")
+
+        for message in turns:
+            message["content"] = self.counter.truncate(message["content"] or "", self.max_message_tokens)
+
+        budget = self.max_prompt_tokens - self.counter.count_messages(system)
+        kept_tokens = 0
+        first_kept = len(turns)
+        for i in range(len(turns) - 1, -1, -1):
+            tokens = self.counter.count_messages([turns[i]])
+            if kept_tokens + tokens > budget and first_kept < len(turns):
+                break
+            kept_tokens += tokens
+            first_kept = i
+
+        dropped, kept = turns[:first_kept], turns[first_kept:]
+        summary_budget = budget - kept_tokens - MESSAGE_OVERHEAD_TOKENS
+        if dropped and summary_budget >= MIN_SUMMARY_TOKENS:
+            summary = self.counter.truncate(self.summarizer(dropped), summary_budget)
+            kept = [{"role": "system", "content": summary}] + kept
+        return system + kept
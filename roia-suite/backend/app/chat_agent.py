@@ -5,9 +5,10 @@ This module provides a ChatAgent class for interacting with the athenaGPT API
 using Azure OpenAI client.
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterator, Union
 from openai import AzureOpenAI
 from .config import load_config
+from .token_budget import HistoryBudget, TokenCounter
 
 class ChatAgent:
     """A chat agent for interacting with athenaGPT API."""
@@ -26,36 +27,43 @@ class ChatAgent:
         )
         self.messages = [{"role": "system", "content": system_message}]
         self.max_history = self.config["max_history"]
+        self.history_budget = HistoryBudget(
+            TokenCounter(self.config["model"]),
+            max_prompt_tokens=self.config["max_prompt_tokens"],
+            max_message_tokens=self.config["max_message_tokens"]
+        )
+        self.last_prompt_tokens = 0
     
-    def send_message(self, message: str) -> str:
+    def send_message(self, message: str, stream: bool = False) -> Union[str, Iterator[str]]:
         """Send a message to the chat agent and get the response.
         
         Args:
             message: The user message to send
+            stream: Whether to return the response incrementally
             
         Returns:
-            The assistant's response
+            The assistant's response, or an iterator over its text as it is
+            generated when stream is True
         """
-        # Add user message to history
-        self.messages.append({"role": "user", "content": message})
+        # The user message joins the history only with a reply, so a failed call
+        # doesn't leave a dangling user turn for the next request
+        user_message = {"role": "user", "content": message}
         
-        # Ensure we don't exceed max history (keep system message plus max_history messages)
-        if len(self.messages) > self.max_history + 1:
-            # Keep system message (first one) and trim oldest messages
-            self.messages = [self.messages[0]] + self.messages[-(self.max_history):]
+        if stream:
+            return self._stream_response(user_message)
         
         try:
             # Call the API
             completion = self.client.chat.completions.create(
                 model=self.config["model"],
-                messages=self.messages
+                messages=self._prompt_messages(user_message)
             )
             
             # Extract the response
             response = completion.choices[0].message.content
             
-            # Add assistant response to history
-            self.messages.append({"role": "assistant", "content": response})
+            # Add the exchange to history
+            self._record_turn(user_message, response)
             
             return response
         except Exception as e:
@@ -63,6 +71,55 @@ class ChatAgent:
             print(error_msg)
             return error_msg
     
+    def _prompt_messages(self, user_message: Dict[str, str]) -> List[Dict[str, str]]:
+        """Return the history plus the new user message, compacted to the prompt token budget.
+        
+        The full history is kept; only the copy sent to the API is compacted.
+        """
+        prompt = self.history_budget.compact(self.messages + [user_message])
+        self.last_prompt_tokens = self.history_budget.counter.count_messages(prompt)
+        return prompt
+    
+    def _record_turn(self, user_message: Dict[str, str], response: str) -> None:
+        """Add a completed exchange to the history.
+        
+        The prompt is fitted to the token budget in _prompt_messages; max_history only
+        bounds the memory a long conversation holds (system message plus max_history messages).
+        """
+        self.messages.extend([user_message, {"role": "assistant", "content": response}])
+        if len(self.messages) > self.max_history + 1:
+            self.messages = [self.messages[0]] + self.messages[-(self.max_history):]
+    
+    def _stream_response(self, user_message: Dict[str, str]) -> Iterator[str]:
+        """Stream the completion for the history and user_message, yielding text as it arrives.
+        
+        The exchange is added to the history once the stream ends, unless it failed
+        before any text arrived.
+        """
+        parts = []
+        try:
+            stream = self.client.chat.completions.create(
+                model=self.config["model"],
+                messages=self._prompt_messages(user_message),
+                stream=True
+            )
+            for chunk in stream:
+                # Azure sends a leading chunk with no choices (content filter results)
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    parts.append(delta)
+                    yield delta
+        except Exception as e:
+            error_msg = f"Error calling athenaGPT API: {str(e)}"
+            print(error_msg)
+            if not parts:
+                yield error_msg
+                return
+        
+        self._record_turn(user_message, "".join(parts))
+    
     def get_history(self) -> List[Dict[str, str]]:
         """Get the conversation history.
         
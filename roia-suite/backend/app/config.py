@@ -14,7 +14,9 @@ DEFAULT_CONFIG = {
     "api_version": "2025-01-01-preview",
     "model": "gpt-4o-mini-2024-07-18",
     "environment": "uat",  # "prod" or "uat"
-    "max_history": 10,  # Number of messages to keep in history
+    "max_history": 200,  # Messages kept in memory; prompts are budgeted by tokens
+    "max_prompt_tokens": 12000,  # Upper bound on prompt tokens sent per request
+    "max_message_tokens": 6000,  # Upper bound on the tokens of any single message
 }
 
 # API endpoints
@@ -68,6 +70,12 @@ def load_config() -> Dict[str, Any]:
     if os.environ.get("ATHENAGPT_MAX_HISTORY"):
         config["max_history"] = int(os.environ.get("ATHENAGPT_MAX_HISTORY"))
     
+    if os.environ.get("ATHENAGPT_MAX_PROMPT_TOKENS"):
+        config["max_prompt_tokens"] = int(os.environ.get("ATHENAGPT_MAX_PROMPT_TOKENS"))
+    
+    if os.environ.get("ATHENAGPT_MAX_MESSAGE_TOKENS"):
+        config["max_message_tokens"] = int(os.environ.get("ATHENAGPT_MAX_MESSAGE_TOKENS"))
+    
     # Load API key - first check AGPT_API (user's environment variable)
     config["api_key"] = os.environ.get("AGPT_API")
     
@@ -46,6 +46,22 @@ class ProcessTranscriptResponse(BaseModel):
     processing_time_ms: int = Field(..., description="Processing time in milliseconds")
     error_message: Optional[str] = Field(None, description="Error message if processing failed")
 
+class BatchTranscriptRequest(BaseModel):
+    transcripts: List[str] = Field(default_factory=list, description="Raw transcripts, one per story")
+    transcript_file: Optional[str] = Field(None, description="Text of a transcript file to split into segments")
+    segment_separator: Optional[str] = Field(None, description="Separator between file segments (blank lines by default)")
+    user_id: Optional[str] = Field(None, description="User identifier for personalization")
+    project_context: Optional[str] = Field(None, description="Optional project context")
+
+class BatchProcessTranscriptResponse(BaseModel):
+    success: bool = Field(..., description="Whether every transcript was processed successfully")
+    results: List[ProcessTranscriptResponse] = Field(default_factory=list, description="Per-transcript results, in input order")
+    total: int = Field(..., description="Number of transcripts in the batch")
+    succeeded: int = Field(..., description="Number of transcripts processed successfully")
+    exported: int = Field(0, description="Number of stories written to the story log")
+    processing_time_ms: int = Field(..., description="Processing time for the whole batch in milliseconds")
+    error_message: Optional[str] = Field(None, description="Error message if the batch export failed")
+
 class HealthResponse(BaseModel):
     status: Literal["healthy", "unhealthy"] = Field(..., description="System health status")
     athenagpt_configured: bool = Field(..., description="AthenaGPT API configuration status")
@@ -6,6 +6,7 @@ import logging
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel, Field
+from starlette.concurrency import run_in_threadpool
 
 from ..services.confluence_service import ConfluenceService, ConfluencePage
 from ..models import ClassifiedIntent, UserInfo
@@ -53,6 +54,7 @@ async def health_check(confluence_service: ConfluenceService = Depends(get_confl
 async def get_pages(
     space_key: str = "ROIA",
     max_results: int = 50,
+    include_content: bool = True,
     confluence_service: ConfluenceService = Depends(get_confluence_service)
 ):
     """
@@ -61,9 +63,10 @@ async def get_pages(
     Args:
         space_key: The space key to retrieve pages from
         max_results: Maximum number of pages to return
+        include_content: Whether to include page bodies and excerpts
     """
     try:
-        pages = confluence_service.get_pages_from_space(space_key, max_results)
+        pages = confluence_service.get_pages_from_space(space_key, max_results, include_content=include_content)
         return pages
     except Exception as e:
         logger.error(f"Error retrieving pages: {str(e)}", exc_info=True)
@@ -94,7 +97,8 @@ async def match_pages(
                 user_info = None
         
         # Find matching pages
-        matching_pages = confluence_service.find_matching_pages(
+        matching_pages = await run_in_threadpool(
+            confluence_service.find_matching_pages,
             classified_intent=request.classified_intent,
             user_info=user_info,
             space_key=request.space_key,
@@ -108,6 +112,24 @@ async def match_pages(
         logger.error(f"Error matching pages: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to match pages: {str(e)}")
 
+@router.post("/sync-index")
+async def sync_index(
+    space_key: str = "ROIA",
+    confluence_service: ConfluenceService = Depends(get_confluence_service)
+):
+    """
+    Delta-sync a Confluence space into the local page index used for matching.
+    
+    Args:
+        space_key: The space key to sync
+    """
+    try:
+        stats = await run_in_threadpool(confluence_service.sync_page_index, space_key, force=True)
+        return {"success": True, "space_key": space_key, **stats}
+    except Exception as e:
+        logger.error(f"Error syncing page index for {space_key}: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to sync page index: {str(e)}")
+
 @router.post("/update-page", response_model=PageUpdateResponse)
 async def update_page(
     request: PageUpdateRequest,
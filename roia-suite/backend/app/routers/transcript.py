@@ -1,13 +1,20 @@
+import json
 import time
+import asyncio
+import logging
+import threading
 from datetime import datetime
 from fastapi import APIRouter, HTTPException, Depends
-from fastapi.responses import FileResponse
-from typing import Optional
+from fastapi.responses import FileResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from typing import Any, Callable, Iterator, List, Optional, Tuple
 import os
 
 from app.models import (
     TranscriptRequest, 
     ProcessTranscriptResponse, 
+    BatchTranscriptRequest,
+    BatchProcessTranscriptResponse,
     ClassifiedIntent, 
     EpicMatch,
     ErrorResponse
@@ -15,9 +22,24 @@ from app.models import (
 from app.services.llm import LLMService
 from app.services.athena_gpt import AthenaGPTService
 from app.services.excel_export import ExcelExportService
+from app.services.epic_matcher import SemanticEpicMatcher, get_epic_matcher
+from app.services.jira_service import JiraService
+from app.services.transcript_cleaner import split_transcript_segments
+
+logger = logging.getLogger(__name__)
+
+# Jira project whose epics transcripts are matched against
+EPIC_PROJECT_KEY = "ROIA"
+
+# Maximum number of concurrent LLM classifications in a batch, and transcripts per batch
+BATCH_MAX_CONCURRENCY = int(os.environ.get("TRANSCRIPT_BATCH_CONCURRENCY", "4"))
+BATCH_MAX_TRANSCRIPTS = int(os.environ.get("TRANSCRIPT_BATCH_MAX", "200"))
 
 router = APIRouter()
 
+# Held while the epic index is being refreshed, so concurrent requests don't refresh it again
+_epic_refresh_lock = threading.Lock()
+
 def get_llm_service():
     """Dependency to get LLM service instance.
     
@@ -29,11 +51,69 @@ def get_excel_service() -> ExcelExportService:
     """Dependency to get Excel export service instance."""
     return ExcelExportService()
 
+def refresh_epic_index(epic_matcher: SemanticEpicMatcher, project_key: str = EPIC_PROJECT_KEY) -> None:
+    """Re-sync the epic index from Jira when it is stale.
+    
+    Blocking; call it through run_in_threadpool from async code. If another refresh is
+    already running this returns at once. Failures are logged, retried with backoff,
+    and matching continues against the persisted index.
+    """
+    if not os.getenv("JIRA") or not epic_matcher.needs_refresh():
+        return
+    if not _epic_refresh_lock.acquire(blocking=False):
+        return
+    
+    try:
+        # Every epic is fetched (the sync prunes epics missing from the list), without issue counts
+        epics = JiraService().get_epics(project_key=project_key, max_results=None, include_issue_counts=False)
+        epic_matcher.sync([
+            {
+                "id": epic.epic_key,
+                "name": epic.epic_name,
+                "description": epic.epic_description or epic.epic_summary
+            }
+            for epic in epics
+        ])
+    except Exception as e:
+        epic_matcher.record_sync_failure()
+        logger.warning(f"Could not refresh epic index from Jira: {e}")
+    finally:
+        _epic_refresh_lock.release()
+
+async def classify_concurrently(
+    cleaned_transcripts: List[str],
+    llm_service_factory: Callable[[], LLMService],
+    max_concurrency: int = BATCH_MAX_CONCURRENCY
+) -> List[Tuple[ClassifiedIntent, Optional[str]]]:
+    """Classify transcripts concurrently, with at most max_concurrency LLM calls in flight.
+    
+    Each in-flight call gets its own LLMService, because a ChatAgent keeps conversation
+    history; services are reused with their history cleared so classifications stay independent.
+    
+    Returns:
+        (intent, error) per transcript, in input order; error is set when the keyword
+        fallback classification was used
+    """
+    semaphore = asyncio.Semaphore(max(max_concurrency, 1))
+    idle_services: List[LLMService] = []
+    
+    async def classify(cleaned_transcript: str) -> Tuple[ClassifiedIntent, Optional[str]]:
+        async with semaphore:
+            llm_service = idle_services.pop() if idle_services else llm_service_factory()
+            try:
+                return await run_in_threadpool(llm_service.classify_intent_with_status, cleaned_transcript)
+            finally:
+                llm_service.chat_agent.clear_history()
+                idle_services.append(llm_service)
+    
+    return await asyncio.gather(*(classify(text) for text in cleaned_transcripts))
+
 @router.post("/transcript/process", response_model=ProcessTranscriptResponse)
 async def process_transcript(
     request: TranscriptRequest,
     llm_service: LLMService = Depends(get_llm_service),
-    excel_service: ExcelExportService = Depends(get_excel_service)
+    excel_service: ExcelExportService = Depends(get_excel_service),
+    epic_matcher: SemanticEpicMatcher = Depends(get_epic_matcher)
 ):
     """
     Process a voice transcript and extract structured project management data.
@@ -41,7 +121,7 @@ async def process_transcript(
     This endpoint:
     1. Cleans and normalizes the transcript
     2. Uses LLM to classify intent and extract structured data
-    3. Attempts to match to existing epics (placeholder for now)
+    3. Matches the intent to existing Jira epics by embedding similarity
     4. Returns structured data ready for Jira integration
     """
     start_time = time.time()
@@ -60,17 +140,13 @@ async def process_transcript(
         # Step 2: Classify intent using LLM
         classified_intent = llm_service.classify_intent(cleaned_transcript)
         
-        # Step 3: Find epic matches (placeholder implementation)
-        # TODO: Replace with actual Jira API integration
-        mock_epics = [
-            {"id": "EPIC-1", "name": "User Authentication", "description": "Login and user management features"},
-            {"id": "EPIC-2", "name": "Dashboard", "description": "Main dashboard and reporting"},
-            {"id": "EPIC-3", "name": "API Integration", "description": "Third-party API connections"},
-        ]
+        # Step 3: Find epic matches against the semantic epic index (no LLM call)
+        await run_in_threadpool(refresh_epic_index, epic_matcher)
         
         epic_match_data = llm_service.find_epic_matches(
-            classified_intent.epic_keywords, 
-            mock_epics
+            classified_intent.epic_keywords,
+            classified_intent=classified_intent,
+            matcher=epic_matcher
         )
         
         epic_match = EpicMatch(
@@ -124,6 +200,179 @@ async def process_transcript(
             error_message=f"Processing failed: {str(e)}"
         )
 
+def format_sse(event: str, data: Any) -> str:
+    """Format one server-sent event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+@router.post("/transcript/process/stream")
+async def process_transcript_stream(
+    request: TranscriptRequest,
+    llm_service: LLMService = Depends(get_llm_service),
+    excel_service: ExcelExportService = Depends(get_excel_service),
+    epic_matcher: SemanticEpicMatcher = Depends(get_epic_matcher)
+):
+    """
+    Process a voice transcript like /transcript/process, streaming progress as server-sent events.
+    
+    Events, in order:
+    - cleaned: {"cleaned_transcript"}
+    - token: {"text"} for each piece of the model's output as it arrives
+    - classified: the ClassifiedIntent
+    - epic_match: the EpicMatch
+    - done: {"processing_time_ms", "story_id"}
+    An error event ends the stream if processing fails.
+    """
+    if not request.transcript or not request.transcript.strip():
+        raise HTTPException(
+            status_code=400,
+            detail="Transcript cannot be empty"
+        )
+    
+    def events() -> Iterator[str]:
+        start_time = time.time()
+        try:
+            cleaned_transcript = llm_service.clean_transcript(request.transcript)
+            yield format_sse("cleaned", {"cleaned_transcript": cleaned_transcript})
+            
+            classified_intent = None
+            for kind, value in llm_service.stream_classification(cleaned_transcript):
+                if kind == "token":
+                    yield format_sse("token", {"text": value})
+                else:
+                    classified_intent = value
+            yield format_sse("classified", classified_intent.model_dump(mode="json"))
+            
+            refresh_epic_index(epic_matcher)
+            epic_match_data = llm_service.find_epic_matches(
+                classified_intent.epic_keywords,
+                classified_intent=classified_intent,
+                matcher=epic_matcher
+            )
+            epic_match = EpicMatch(
+                epic_id=epic_match_data.get("epic_id"),
+                epic_name=epic_match_data.get("epic_name"),
+                match_confidence=epic_match_data.get("match_confidence", 0.0),
+                keywords_matched=epic_match_data.get("keywords_matched", [])
+            )
+            yield format_sse("epic_match", epic_match.model_dump(mode="json"))
+            
+            processing_time_ms = int((time.time() - start_time) * 1000)
+            excel_result = excel_service.export_story(
+                classified_intent=classified_intent,
+                epic_match=epic_match,
+                cleaned_transcript=cleaned_transcript,
+                original_transcript=request.transcript,
+                processing_time_ms=processing_time_ms
+            )
+            yield format_sse("done", {
+                "processing_time_ms": processing_time_ms,
+                "story_id": excel_result.get("story_id")
+            })
+        except Exception as e:
+            logger.error(f"Error streaming transcript processing: {e}")
+            yield format_sse("error", {"error_message": f"Processing failed: {str(e)}"})
+    
+    # Sync generators are iterated in a worker thread, so the blocking LLM stream is off the event loop
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/transcript/process/batch", response_model=BatchProcessTranscriptResponse)
+async def process_transcript_batch(
+    request: BatchTranscriptRequest,
+    llm_service: LLMService = Depends(get_llm_service),
+    excel_service: ExcelExportService = Depends(get_excel_service),
+    epic_matcher: SemanticEpicMatcher = Depends(get_epic_matcher)
+):
+    """
+    Process many transcripts, or a transcript file split into segments, in one request.
+    
+    This endpoint:
+    1. Cleans every transcript
+    2. Classifies them concurrently, under the TRANSCRIPT_BATCH_CONCURRENCY limit
+    3. Matches every intent against one refresh of the epic index
+    4. Exports all stories to the story log in a single write
+    """
+    start_time = time.time()
+    
+    transcripts = [t for t in request.transcripts if t and t.strip()]
+    if request.transcript_file:
+        transcripts.extend(split_transcript_segments(request.transcript_file, request.segment_separator))
+    if not transcripts:
+        raise HTTPException(
+            status_code=400,
+            detail="Batch must contain at least one non-empty transcript"
+        )
+    if len(transcripts) > BATCH_MAX_TRANSCRIPTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch cannot contain more than {BATCH_MAX_TRANSCRIPTS} transcripts"
+        )
+    
+    # Step 1: Clean the transcripts
+    cleaned_transcripts = [llm_service.clean_transcript(t) for t in transcripts]
+    
+    # Step 2: Classify intents concurrently
+    classifications = await classify_concurrently(cleaned_transcripts, get_llm_service)
+    
+    # Step 3: Refresh the epic index once so every transcript sees the same epics
+    await run_in_threadpool(refresh_epic_index, epic_matcher)
+    
+    results = []
+    stories = []
+    for transcript, cleaned_transcript, (classified_intent, error_message) in zip(transcripts, cleaned_transcripts, classifications):
+        try:
+            epic_match_data = llm_service.find_epic_matches(
+                classified_intent.epic_keywords,
+                classified_intent=classified_intent,
+                matcher=epic_matcher
+            )
+            epic_match = EpicMatch(
+                epic_id=epic_match_data.get("epic_id"),
+                epic_name=epic_match_data.get("epic_name"),
+                match_confidence=epic_match_data.get("match_confidence", 0.0),
+                keywords_matched=epic_match_data.get("keywords_matched", [])
+            )
+        except Exception as e:
+            logger.warning(f"Epic matching failed for batch transcript: {e}")
+            epic_match = EpicMatch()
+            error_message = error_message or f"Epic matching failed: {e}"
+        
+        processing_time_ms = int((time.time() - start_time) * 1000)
+        stories.append({
+            "classified_intent": classified_intent,
+            "epic_match": epic_match,
+            "cleaned_transcript": cleaned_transcript,
+            "original_transcript": transcript,
+            "processing_time_ms": processing_time_ms
+        })
+        results.append(ProcessTranscriptResponse(
+            success=error_message is None,
+            classified_intent=classified_intent,
+            epic_match=epic_match,
+            cleaned_transcript=cleaned_transcript,
+            processing_time_ms=processing_time_ms,
+            error_message=error_message
+        ))
+    
+    # Step 4: Export every story in one transaction
+    excel_result = await run_in_threadpool(excel_service.export_stories, stories)
+    if not excel_result["success"]:
+        logger.error(f"Batch export failed: {excel_result.get('error')}")
+    
+    succeeded = sum(1 for result in results if result.success)
+    return BatchProcessTranscriptResponse(
+        success=excel_result["success"] and succeeded == len(transcripts),
+        results=results,
+        total=len(transcripts),
+        succeeded=succeeded,
+        exported=len(excel_result["story_ids"]),
+        processing_time_ms=int((time.time() - start_time) * 1000),
+        error_message=None if excel_result["success"] else excel_result["message"]
+    )
+
 @router.get("/transcript/health")
 async def transcript_health_check():
     """Health check endpoint for transcript processing service."""
@@ -201,8 +450,11 @@ async def download_excel_file(
 ):
     """
     Download the Excel file containing all exported stories.
+    
+    The workbook is rebuilt from the story log if stories were exported since the last download.
     """
     try:
+        await run_in_threadpool(excel_service.build_workbook)
         excel_path = excel_service.get_excel_file_path()
         
         if not os.path.exists(excel_path):
@@ -6,12 +6,12 @@ transcript processing and project management tasks.
 """
 
 import os
-import re
 import json
 from typing import List, Dict, Any, Optional
 
 from app.models import ClassifiedIntent, IssueType, Priority
 from app.chat_agent import ChatAgent
+from app.services.transcript_cleaner import clean_transcript
 
 class AthenaGPTService:
     """Service for interacting with athenaGPT for project management tasks."""
@@ -49,35 +49,7 @@ Return your response as valid JSON with the following structure:
     
     def clean_transcript(self, transcript: str) -> str:
         """Clean and normalize transcript text."""
-        # Remove common filler words and normalize text
-        filler_words = [
-            r'\buh+\b', r'\bum+\b', r'\ber+\b', r'\bah+\b', r'\blike\b', 
-            r'\byou know\b', r'\bactually\b', r'\bbasically\b', r'\bso\b',
-            r'\bwell\b', r'\bokay\b', r'\bright\b'
-        ]
-        
-        cleaned = transcript.lower()
-        
-        # Remove filler words
-        for pattern in filler_words:
-            cleaned = re.sub(pattern, '', cleaned, flags=re.IGNORECASE)
-        
-        # Clean up extra spaces and punctuation
-        cleaned = re.sub(r'\s+', ' ', cleaned)  # Multiple spaces to single
-        cleaned = re.sub(r'[,]{2,}', ',', cleaned)  # Multiple commas
-        cleaned = re.sub(r'[.]{2,}', '.', cleaned)  # Multiple periods
-        cleaned = cleaned.strip()
-        
-        # Capitalize first letter of sentences
-        sentences = cleaned.split('.')
-        cleaned_sentences = []
-        for sentence in sentences:
-            sentence = sentence.strip()
-            if sentence:
-                sentence = sentence[0].upper() + sentence[1:] if len(sentence) > 1 else sentence.upper()
-                cleaned_sentences.append(sentence)
-        
-        return '. '.join(cleaned_sentences) if cleaned_sentences else transcript
+        return clean_transcript(transcript)
 
     def classify_intent(self, cleaned_transcript: str) -> ClassifiedIntent:
         """Use athenaGPT to classify transcript intent and extract structured data."""
@@ -0,0 +1,232 @@
+"""
+Confluence Page Index for AI-Driven Project Management Suite
+
+This module keeps a local SQLite copy of Confluence page metadata and excerpts,
+with an FTS5 table for keyword search. Spaces are delta-synced: only pages whose
+version number changed since the last sync have their bodies refetched.
+"""
+
+import os
+import logging
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional
+
+from app.services.text_index import tokenize
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Backend directory, so the cache location does not depend on the working directory
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_INDEX_PATH = os.path.join(BASE_DIR, "cache", "confluence_pages.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    page_id TEXT PRIMARY KEY,
+    space_key TEXT NOT NULL,
+    space_name TEXT,
+    page_title TEXT NOT NULL,
+    page_url TEXT,
+    content_excerpt TEXT,
+    author TEXT,
+    version INTEGER NOT NULL,
+    last_modified TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_pages_space ON pages(space_key);
+CREATE VIRTUAL TABLE IF NOT EXISTS pages_fts USING fts5(
+    page_title, content_excerpt, page_id UNINDEXED, space_key UNINDEXED
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    space_key TEXT PRIMARY KEY,
+    last_synced REAL NOT NULL,
+    page_count INTEGER NOT NULL
+);
+"""
+
+PAGE_COLUMNS = (
+    "page_id", "space_key", "space_name", "page_title", "page_url",
+    "content_excerpt", "author", "version", "last_modified"
+)
+
+
+class ConfluencePageIndex:
+    """Local SQLite/FTS5 index of Confluence pages with version-based delta sync."""
+
+    def __init__(self, db_path: str = DEFAULT_INDEX_PATH):
+        """
+        Initialize the index, creating the database if needed.
+
+        Args:
+            db_path: Path of the SQLite database file
+        """
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        """Open a connection, committing on success and always closing it."""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def last_synced(self, space_key: str) -> Optional[float]:
+        """Return the time a space was last synced, or None if it never was."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT last_synced FROM sync_state WHERE space_key = ?", (space_key,)
+            ).fetchone()
+        return row["last_synced"] if row else None
+
+    def is_stale(self, space_key: str, max_age: float) -> bool:
+        """Return True if a space has never been synced or was synced over max_age seconds ago."""
+        last_synced = self.last_synced(space_key)
+        return last_synced is None or time.time() - last_synced > max_age
+
+    def page_versions(self, space_key: str) -> Dict[str, int]:
+        """Return the indexed version number of every page in a space."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT page_id, version FROM pages WHERE space_key = ?", (space_key,)
+            ).fetchall()
+        return {row["page_id"]: row["version"] for row in rows}
+
+    def upsert_pages(self, pages: List[Dict[str, Any]]) -> None:
+        """
+        Insert or replace pages in the index.
+
+        Args:
+            pages: Page dictionaries with the PAGE_COLUMNS keys
+        """
+        if not pages:
+            return
+        with self._connect() as conn:
+            page_ids = [(page["page_id"],) for page in pages]
+            conn.executemany("DELETE FROM pages_fts WHERE page_id = ?", page_ids)
+            conn.executemany(
+                f"INSERT OR REPLACE INTO pages ({', '.join(PAGE_COLUMNS)}) "
+                f"VALUES ({', '.join('?' for _ in PAGE_COLUMNS)})",
+                [tuple(page.get(column) for column in PAGE_COLUMNS) for page in pages]
+            )
+            conn.executemany(
+                "INSERT INTO pages_fts (page_title, content_excerpt, page_id, space_key) VALUES (?, ?, ?, ?)",
+                [
+                    (page["page_title"], page.get("content_excerpt") or "", page["page_id"], page["space_key"])
+                    for page in pages
+                ]
+            )
+
+    def delete_pages(self, page_ids: List[str]) -> None:
+        """Remove pages from the index."""
+        if not page_ids:
+            return
+        with self._connect() as conn:
+            params = [(page_id,) for page_id in page_ids]
+            conn.executemany("DELETE FROM pages_fts WHERE page_id = ?", params)
+            conn.executemany("DELETE FROM pages WHERE page_id = ?", params)
+
+    def sync_space(self, confluence_service, space_key: str, max_pages: int = 10000) -> Dict[str, Any]:
+        """
+        Delta-sync a space from Confluence.
+
+        Crawls page metadata for the whole space, refetches bodies only for pages
+        that are new or whose version number changed, and drops deleted pages.
+        If the crawl is incomplete, the pages it did read are updated but nothing
+        is dropped and the space is not marked as synced, so it is retried.
+
+        Args:
+            confluence_service: ConfluenceService used to crawl the space
+            space_key: The space key to sync
+            max_pages: Upper bound on the number of pages crawled
+
+        Returns:
+            Dictionary with counts of pages seen, updated and removed, and whether the crawl completed
+        """
+        remote_pages, complete = confluence_service.crawl_pages(
+            space_key, max_results=max_pages, include_content=False
+        )
+        if not remote_pages:
+            # An empty crawl is more likely an outage than an emptied space
+            logger.warning(f"No pages returned while syncing space {space_key}; keeping existing index")
+            return {"seen": 0, "updated": 0, "removed": 0, "complete": False}
+
+        indexed_versions = self.page_versions(space_key)
+        changed = [page for page in remote_pages if indexed_versions.get(page.page_id) != page.version]
+        confluence_service.fetch_page_bodies(changed)
+
+        # Pages whose body failed to load keep their old version and are retried next sync
+        updated = [page for page in changed if page.page_content is not None]
+        self.upsert_pages([
+            {column: getattr(page, column) for column in PAGE_COLUMNS}
+            for page in updated
+        ])
+        if not complete:
+            logger.warning(
+                f"Crawl of space {space_key} stopped after {len(remote_pages)} pages; "
+                f"updated {len(updated)} pages, skipping removals until a complete sync"
+            )
+            return {"seen": len(remote_pages), "updated": len(updated), "removed": 0, "complete": False}
+
+        remote_ids = {page.page_id for page in remote_pages}
+        removed = [page_id for page_id in indexed_versions if page_id not in remote_ids]
+        self.delete_pages(removed)
+
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sync_state (space_key, last_synced, page_count) VALUES (?, ?, ?)",
+                (space_key, time.time(), len(remote_pages))
+            )
+
+        logger.info(
+            f"Synced space {space_key}: {len(remote_pages)} pages, "
+            f"{len(updated)} updated, {len(removed)} removed"
+        )
+        return {"seen": len(remote_pages), "updated": len(updated), "removed": len(removed), "complete": True}
+
+    def search(self, space_key: str, keywords: List[str], limit: int = 200) -> List[Dict[str, Any]]:
+        """
+        Find pages in a space containing any of the keywords, best BM25 match first.
+
+        Title matches are weighted above excerpt matches.
+
+        Args:
+            space_key: The space key to search
+            keywords: Keywords to search for
+            limit: Maximum number of pages to return
+
+        Returns:
+            List of page dictionaries
+        """
+        terms = sorted({token for keyword in keywords for token in tokenize(keyword)})
+        if not terms:
+            return []
+        query = " OR ".join(f'"{term}"' for term in terms)
+
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT {', '.join('p.' + column for column in PAGE_COLUMNS)} "
+                "FROM pages_fts JOIN pages p ON p.page_id = pages_fts.page_id "
+                "WHERE pages_fts MATCH ? AND pages_fts.space_key = ? "
+                "ORDER BY bm25(pages_fts, 10.0, 1.0) LIMIT ?",
+                (query, space_key, limit)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def count(self, space_key: Optional[str] = None) -> int:
+        """Return the number of indexed pages, optionally for one space."""
+        with self._connect() as conn:
+            if space_key:
+                row = conn.execute("SELECT COUNT(*) FROM pages WHERE space_key = ?", (space_key,)).fetchone()
+            else:
+                row = conn.execute("SELECT COUNT(*) FROM pages").fetchone()
+        return row[0]
@@ -8,12 +8,19 @@ matching content, and updating pages based on AI-processed transcripts.
 import os
 import logging
 import re
+import time
+import threading
 import requests
 import urllib3
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 from pydantic import BaseModel
 import json
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+
+from app.services.text_index import TextIndex, matching_keywords
+from app.services.confluence_index import ConfluencePageIndex, DEFAULT_INDEX_PATH
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -21,6 +28,113 @@ logger = logging.getLogger(__name__)
 # Configure SSL warnings
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+# Space crawl settings: Confluence caps body-expanded requests at 25 results,
+# while metadata-only requests can use much larger windows
+CRAWL_PAGE_SIZE = 100
+CRAWL_BODY_PAGE_SIZE = 25
+CRAWL_MAX_WORKERS = int(os.environ.get("CONFLUENCE_CRAWL_WORKERS", "4"))
+# Attempts per result window before a crawl is reported incomplete
+CRAWL_WINDOW_ATTEMPTS = 3
+CRAWL_RETRY_DELAY = 0.5
+
+# Page index settings: how often a space is delta-synced, and how many
+# full-text candidates are scored per match request
+INDEX_SYNC_INTERVAL = int(os.environ.get("CONFLUENCE_INDEX_SYNC_SECONDS", "600"))
+INDEX_MATCH_CANDIDATES = 200
+
+# Spaces with a page index sync running in the background, shared by every service instance
+_background_syncs: Dict[str, threading.Thread] = {}
+_background_syncs_lock = threading.Lock()
+
+# Title and excerpt text indexes, one pair per space, kept across requests and updated as pages change
+_page_text_indexes: Dict[str, Tuple[TextIndex, TextIndex]] = {}
+# Page index sync time each pair was last pruned against
+_page_text_indexes_pruned: Dict[str, float] = {}
+_page_text_indexes_lock = threading.Lock()
+
+class _ExcerptParser(HTMLParser):
+    """Collects visible text from Confluence storage format until a length limit is reached."""
+    
+    # Elements whose content is never rendered as page text
+    SKIPPED_TAGS = {'script', 'style', 'head', 'title', 'ac:parameter'}
+    
+    def __init__(self, limit: int):
+        super().__init__(convert_charrefs=True)
+        self.limit = limit
+        self.parts: List[str] = []
+        self.length = 0
+        self.skip_depth = 0
+        # Text between two tags; a chunk boundary can split it across handle_data calls
+        self.run: List[str] = []
+        self.run_length = 0
+    
+    @property
+    def done(self) -> bool:
+        return self.length + self.run_length > self.limit
+    
+    def flush(self):
+        """Close the current text run, normalizing its whitespace."""
+        if self.run:
+            text = ' '.join(''.join(self.run).split())
+            if text:
+                self.length += len(text) + (1 if self.parts else 0)
+                self.parts.append(text)
+            self.run = []
+            self.run_length = 0
+    
+    def handle_starttag(self, tag, attrs):
+        self.flush()
+        if tag in self.SKIPPED_TAGS:
+            self.skip_depth += 1
+    
+    def handle_startendtag(self, tag, attrs):
+        self.flush()
+    
+    def handle_endtag(self, tag):
+        self.flush()
+        if tag in self.SKIPPED_TAGS and self.skip_depth:
+            self.skip_depth -= 1
+    
+    def handle_data(self, data):
+        if not self.skip_depth:
+            self.run.append(data)
+            self.run_length += len(data)
+
+
+def extract_text_excerpt(html_content: Optional[str], max_length: int = 200, chunk_size: int = 1024) -> str:
+    """
+    Extract a plain text excerpt from Confluence storage-format HTML.
+    
+    The document is fed to the parser in chunks and parsing stops as soon as
+    more than max_length characters of visible text have been collected, so
+    cost depends on the excerpt length rather than the page size.
+    
+    Args:
+        html_content: HTML content to extract text from
+        max_length: Maximum length of the excerpt
+        chunk_size: Number of characters fed to the parser at a time
+        
+    Returns:
+        Plain text excerpt, with "..." appended if it was truncated
+    """
+    if not html_content:
+        return ""
+    
+    parser = _ExcerptParser(max_length)
+    for offset in range(0, len(html_content), chunk_size):
+        parser.feed(html_content[offset:offset + chunk_size])
+        if parser.done:
+            break
+    else:
+        parser.close()
+    parser.flush()
+    
+    text = ' '.join(parser.parts)
+    if len(text) > max_length:
+        text = text[:max_length] + "..."
+    return text
+
+
 class ConfluencePage(BaseModel):
     """Model representing a Confluence page."""
     page_id: str
@@ -56,8 +170,63 @@ class ConfluenceService:
         verify_ssl = os.environ.get("CONFLUENCE_VERIFY_SSL", "false").lower() == "true"
         self.session.verify = verify_ssl
         
+        self._page_index = None
+        
         logger.info("Confluence service initialized")
     
+    @property
+    def page_index(self) -> ConfluencePageIndex:
+        """Local page index, opened on first use."""
+        if self._page_index is None:
+            self._page_index = ConfluencePageIndex(
+                os.environ.get("CONFLUENCE_INDEX_PATH", DEFAULT_INDEX_PATH)
+            )
+        return self._page_index
+    
+    def sync_page_index(self, space_key: str = "ROIA", force: bool = False) -> Dict[str, Any]:
+        """
+        Delta-sync a space into the local page index.
+        
+        Blocking, and slow on a first sync; run it off the event loop.
+        
+        Args:
+            space_key: The space key to sync
+            force: Sync even if the index was refreshed within INDEX_SYNC_INTERVAL
+            
+        Returns:
+            Dictionary with counts of pages seen, updated and removed (see ConfluencePageIndex.sync_space)
+        """
+        if not force and not self.page_index.is_stale(space_key, INDEX_SYNC_INTERVAL):
+            return {"seen": 0, "updated": 0, "removed": 0}
+        return self.page_index.sync_space(self, space_key)
+    
+    def sync_page_index_in_background(self, space_key: str = "ROIA") -> bool:
+        """
+        Start a delta sync of a stale space on a background thread.
+        
+        Returns:
+            True if a sync was started, False if the index is fresh or a sync is already running
+        """
+        if not self.page_index.is_stale(space_key, INDEX_SYNC_INTERVAL):
+            return False
+        
+        def run():
+            try:
+                self.page_index.sync_space(self, space_key)
+            except Exception as e:
+                logger.warning(f"Background sync of space {space_key} failed: {e}")
+            finally:
+                with _background_syncs_lock:
+                    _background_syncs.pop(space_key, None)
+        
+        with _background_syncs_lock:
+            if space_key in _background_syncs:
+                return False
+            thread = threading.Thread(target=run, name=f"confluence-sync-{space_key}", daemon=True)
+            _background_syncs[space_key] = thread
+        thread.start()
+        return True
+    
     def health_check(self) -> Dict[str, Any]:
         """
         Check the health of the Confluence connection.
@@ -105,93 +274,216 @@ class ConfluenceService:
                 "server_configured": bool(self.confluence_base_url)
             }
     
-    def get_pages_from_space(self, space_key: str = "ROIA", max_results: int = 50) -> List[ConfluencePage]:
+    def get_pages_from_space(self, space_key: str = "ROIA", max_results: int = 50,
+                             include_content: bool = True) -> List[ConfluencePage]:
         """
         Retrieve pages from a specific Confluence space.
         
+        Result windows are fetched concurrently (up to CRAWL_MAX_WORKERS at a time).
+        Without include_content only page metadata is requested, which allows much
+        larger windows; bodies can then be loaded on demand with fetch_page_bodies.
+        
         Args:
             space_key: The space key to retrieve pages from (defaults to ROIA)
             max_results: Maximum number of pages to return
+            include_content: Whether to fetch page bodies and build excerpts
             
         Returns:
             List of ConfluencePage objects
         """
         try:
-            if not self.confluence_token:
-                raise ValueError("Confluence token not configured")
+            pages, complete = self.crawl_pages(space_key, max_results, include_content)
+            # Stopping at max_results is expected here; only a failed window is an error
+            if not complete and len(pages) < max_results:
+                logger.error(f"Listing of space {space_key} is incomplete: stopped after {len(pages)} pages")
+            return pages
             
-            pages = []
-            start = 0
-            limit = min(25, max_results)  # API limit is usually 25 per request
+        except Exception as e:
+            logger.error(f"Error retrieving pages from space {space_key}: {e}")
+            return []
+    
+    def crawl_pages(self, space_key: str, max_results: int,
+                    include_content: bool = True) -> Tuple[List[ConfluencePage], bool]:
+        """
+        Retrieve pages from a space and report whether the whole space was read.
+        
+        Args:
+            space_key: The space key to retrieve pages from
+            max_results: Maximum number of pages to return
+            include_content: Whether to fetch page bodies and build excerpts
             
-            while len(pages) < max_results:
-                # Get pages with content expansion
-                response = self.session.get(
-                    f"{self.api_base_url}/content",
-                    params={
-                        'spaceKey': space_key,
-                        'type': 'page',
-                        'status': 'current',
-                        'expand': 'space,version,body.storage',
-                        'start': start,
-                        'limit': limit
-                    }
+        Returns:
+            Tuple of (pages, complete); complete is False when a result window could
+            not be fetched, in which case pages holds only those read before it, or
+            when the crawl stopped at max_results before reaching the end of the space
+        """
+        if not self.confluence_token:
+            raise ValueError("Confluence token not configured")
+        
+        if include_content:
+            expand, page_size = 'space,version,body.storage', CRAWL_BODY_PAGE_SIZE
+        else:
+            expand, page_size = 'space,version', CRAWL_PAGE_SIZE
+        
+        results, complete = self._crawl_space(space_key, max_results, expand, page_size)
+        pages = []
+        for page_data in results:
+            try:
+                pages.append(self._page_from_data(page_data))
+            except Exception as page_error:
+                logger.warning(f"Error processing page {page_data.get('id', 'unknown')}: {page_error}")
+        
+        logger.info(f"Retrieved {len(pages)} pages from space {space_key}")
+        return pages, complete
+    
+    def _fetch_content_window_with_retries(self, space_key: str, start: int, limit: int,
+                                           expand: str) -> Optional[List[Dict[str, Any]]]:
+        """Fetch one window, retrying failed requests; None if every attempt failed."""
+        for attempt in range(1, CRAWL_WINDOW_ATTEMPTS + 1):
+            try:
+                window = self._fetch_content_window(space_key, start, limit, expand)
+            except Exception as e:
+                logger.error(f"Error fetching pages at offset {start}: {e}")
+                window = None
+            if window is not None:
+                return window
+            if attempt < CRAWL_WINDOW_ATTEMPTS:
+                time.sleep(CRAWL_RETRY_DELAY * attempt)
+        return None
+    
+    def _fetch_content_window(self, space_key: str, start: int, limit: int, expand: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Fetch one window of pages from the content API.
+        
+        Returns:
+            List of raw page dictionaries, or None if the request failed
+        """
+        response = self.session.get(
+            f"{self.api_base_url}/content",
+            params={
+                'spaceKey': space_key,
+                'type': 'page',
+                'status': 'current',
+                'expand': expand,
+                'start': start,
+                'limit': limit
+            }
+        )
+        
+        if response.status_code != 200:
+            logger.error(f"Error fetching pages at offset {start}: HTTP {response.status_code}")
+            return None
+        
+        return response.json().get('results', [])
+    
+    def _crawl_space(self, space_key: str, max_results: int, expand: str,
+                     page_size: int) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Page through a space's content, fetching result windows concurrently.
+        
+        The first window is fetched alone so small spaces cost a single request;
+        after that, CRAWL_MAX_WORKERS consecutive windows are requested per wave
+        until a short or empty window marks the end of the space. A window that
+        still fails after CRAWL_WINDOW_ATTEMPTS, or reaching max_results before the
+        end of the space, stops the crawl as incomplete.
+        
+        Returns:
+            Tuple of (raw page dictionaries in space order, whether the crawl completed)
+        """
+        results: List[Dict[str, Any]] = []
+        limit = min(page_size, max_results)
+        if limit <= 0:
+            return results, True
+        
+        offsets = [0]
+        with ThreadPoolExecutor(max_workers=CRAWL_MAX_WORKERS) as executor:
+            while offsets:
+                windows = executor.map(
+                    lambda offset: self._fetch_content_window_with_retries(space_key, offset, limit, expand),
+                    offsets
                 )
                 
-                if response.status_code != 200:
-                    logger.error(f"Error fetching pages: HTTP {response.status_code}")
+                finished = False
+                for window in windows:
+                    if window is None:
+                        return results[:max_results], False
+                    if not window:
+                        finished = True
+                        break
+                    results.extend(window)
+                    if len(window) < limit:
+                        finished = True
+                        break
+                    if len(results) >= max_results:
+                        # Stopped at the cap; the space may hold more pages
+                        return results[:max_results], False
+                if finished:
                     break
                 
-                data = response.json()
-                results = data.get('results', [])
-                
-                if not results:
-                    break
-                
-                for page_data in results:
-                    try:
-                        # Extract page content (HTML)
-                        content = ""
-                        if 'body' in page_data and 'storage' in page_data['body']:
-                            content = page_data['body']['storage']['value']
-                        
-                        # Create content excerpt (first 200 chars of text)
-                        excerpt = self._extract_text_excerpt(content, 200)
-                        
-                        page = ConfluencePage(
-                            page_id=page_data['id'],
-                            page_title=page_data['title'],
-                            page_url=f"{self.confluence_base_url}/pages/viewpage.action?pageId={page_data['id']}",
-                            space_key=page_data['space']['key'],
-                            space_name=page_data['space']['name'],
-                            page_content=content,
-                            last_modified=page_data['version']['when'],
-                            author=page_data['version']['by']['displayName'] if 'by' in page_data['version'] else None,
-                            version=page_data['version']['number'],
-                            content_excerpt=excerpt
-                        )
-                        
-                        pages.append(page)
-                        
-                        if len(pages) >= max_results:
-                            break
-                            
-                    except Exception as page_error:
-                        logger.warning(f"Error processing page {page_data.get('id', 'unknown')}: {page_error}")
-                        continue
-                
-                # Check if there are more pages
-                if len(results) < limit:
-                    break
-                    
-                start += limit
-            
-            logger.info(f"Retrieved {len(pages)} pages from space {space_key}")
-            return pages
+                next_start = offsets[-1] + limit
+                offsets = [
+                    offset for offset in range(next_start, next_start + limit * CRAWL_MAX_WORKERS, limit)
+                    if offset < max_results
+                ]
+        
+        return results[:max_results], True
+    
+    def _page_from_data(self, page_data: Dict[str, Any]) -> ConfluencePage:
+        """Build a ConfluencePage from a content API result."""
+        # Extract page content (HTML) if the body was expanded
+        content = None
+        excerpt = None
+        if 'body' in page_data and 'storage' in page_data['body']:
+            content = page_data['body']['storage']['value']
+            # Create content excerpt (first 200 chars of text)
+            excerpt = self._extract_text_excerpt(content, 200)
+        
+        return ConfluencePage(
+            page_id=page_data['id'],
+            page_title=page_data['title'],
+            page_url=f"{self.confluence_base_url}/pages/viewpage.action?pageId={page_data['id']}",
+            space_key=page_data['space']['key'],
+            space_name=page_data['space']['name'],
+            page_content=content,
+            last_modified=page_data['version']['when'],
+            author=page_data['version']['by']['displayName'] if 'by' in page_data['version'] else None,
+            version=page_data['version']['number'],
+            content_excerpt=excerpt
+        )
+    
+    def fetch_page_bodies(self, pages: List[ConfluencePage]) -> List[ConfluencePage]:
+        """
+        Load bodies and excerpts for pages retrieved without content.
+        
+        Bodies are fetched concurrently (up to CRAWL_MAX_WORKERS at a time); pages
+        that already have content are left as they are.
+        
+        Args:
+            pages: Pages to fill in
             
-        except Exception as e:
-            logger.error(f"Error retrieving pages from space {space_key}: {e}")
-            return []
+        Returns:
+            The same pages, with page_content and content_excerpt populated where available
+        """
+        def load_body(page: ConfluencePage) -> None:
+            try:
+                response = self.session.get(
+                    f"{self.api_base_url}/content/{page.page_id}",
+                    params={'expand': 'body.storage'}
+                )
+                if response.status_code != 200:
+                    logger.warning(f"Error fetching body for page {page.page_id}: HTTP {response.status_code}")
+                    return
+                page.page_content = response.json()['body']['storage']['value']
+                page.content_excerpt = self._extract_text_excerpt(page.page_content, 200)
+            except Exception as e:
+                logger.warning(f"Error fetching body for page {page.page_id}: {e}")
+        
+        missing = [page for page in pages if page.page_content is None]
+        if missing:
+            with ThreadPoolExecutor(max_workers=CRAWL_MAX_WORKERS) as executor:
+                list(executor.map(load_body, missing))
+        
+        return pages
     
     def get_page_by_id(self, page_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -304,13 +596,6 @@ class ConfluenceService:
             List of matching ConfluencePage objects with match_score populated
         """
         try:
-            # Get all pages from the space
-            all_pages = self.get_pages_from_space(space_key, max_results=100)
-            
-            if not all_pages:
-                logger.warning(f"No pages found in space {space_key}")
-                return []
-            
             # Extract keywords from the intent
             keywords = []
             if hasattr(classified_intent, 'epic_keywords') and classified_intent.epic_keywords:
@@ -325,17 +610,35 @@ class ConfluenceService:
             
             logger.info(f"Matching pages with keywords: {keywords}")
             
+            # Get full-text candidates from the whole space via the local page index
+            all_pages = self._get_candidate_pages(space_key, keywords)
+            
+            if not all_pages:
+                logger.warning(f"No pages found in space {space_key}")
+                return []
+            
+            # Keyword lookups use the space's long-lived text indexes
+            with _page_text_indexes_lock:
+                title_index, content_index = self._update_page_text_indexes(space_key, all_pages)
+                title_matches = title_index.match_counts(keywords)
+                content_matches = content_index.match_counts(keywords)
+                relevance = title_index.score(keywords)
+            
             # Score each page based on relevance
             scored_pages = []
             for page in all_pages:
-                score = self._calculate_page_match_score(page, keywords, classified_intent, user_info)
+                score = self._calculate_page_match_score(
+                    page, keywords, classified_intent, user_info,
+                    title_matches=title_matches.get(page.page_id, 0),
+                    content_matches=content_matches.get(page.page_id, 0)
+                )
                 if score > 0:  # Only include pages with some relevance
                     page_copy = page.model_copy()
                     page_copy.match_score = score
                     scored_pages.append(page_copy)
             
-            # Sort by score and return top matches
-            scored_pages.sort(key=lambda x: x.match_score, reverse=True)
+            # Sort by score and return top matches, using title BM25 relevance to break ties
+            scored_pages.sort(key=lambda x: (x.match_score, relevance.get(x.page_id, 0.0)), reverse=True)
             top_matches = scored_pages[:max_results]
             
             logger.info(f"Found {len(top_matches)} matching pages with scores: {[p.match_score for p in top_matches]}")
@@ -345,6 +648,52 @@ class ConfluenceService:
             logger.error(f"Error finding matching pages: {e}")
             return []
     
+    def _update_page_text_indexes(self, space_key: str, pages: List[ConfluencePage]) -> Tuple[TextIndex, TextIndex]:
+        """
+        Bring a space's title and excerpt indexes up to date; call with _page_text_indexes_lock held.
+        
+        Candidate pages are added, re-tokenizing only those whose text changed. After
+        each sync of the local page index, pages it no longer holds are removed.
+        
+        Returns:
+            Tuple of (title index, excerpt index) for the space
+        """
+        title_index, content_index = _page_text_indexes.setdefault(space_key, (TextIndex(), TextIndex()))
+        
+        try:
+            last_synced = self.page_index.last_synced(space_key)
+            if last_synced is not None and _page_text_indexes_pruned.get(space_key) != last_synced:
+                indexed = self.page_index.page_versions(space_key)
+                for page_id in title_index:
+                    if page_id not in indexed:
+                        title_index.remove(page_id)
+                        content_index.remove(page_id)
+                _page_text_indexes_pruned[space_key] = last_synced
+        except Exception as index_error:
+            logger.warning(f"Could not prune text indexes for space {space_key}: {index_error}")
+        
+        title_index.sync({page.page_id: page.page_title for page in pages}, remove_missing=False)
+        content_index.sync({page.page_id: page.content_excerpt for page in pages}, remove_missing=False)
+        return title_index, content_index
+    
+    def _get_candidate_pages(self, space_key: str, keywords: List[str]) -> List[ConfluencePage]:
+        """
+        Get pages worth scoring for a set of keywords.
+        
+        Searches the local page index, refreshing it in the background when stale,
+        and falls back to crawling the first 100 pages of the space while the index
+        is still empty (e.g. during its first build) or unavailable.
+        """
+        try:
+            self.sync_page_index_in_background(space_key)
+            rows = self.page_index.search(space_key, keywords, limit=INDEX_MATCH_CANDIDATES)
+            if rows or self.page_index.count(space_key):
+                return [ConfluencePage(**row) for row in rows]
+        except Exception as index_error:
+            logger.warning(f"Page index unavailable for space {space_key}, crawling instead: {index_error}")
+        
+        return self.get_pages_from_space(space_key, max_results=100)
+    
     def update_page_content(self, page_id: str, new_content: str, comment: str = "Updated via AI Project Management Suite") -> bool:
         """
         Update the content of a Confluence page.
@@ -494,24 +843,19 @@ class ConfluenceService:
             Plain text excerpt
         """
         try:
-            if not html_content:
-                return ""
-            
-            # Use BeautifulSoup to extract text
-            soup = BeautifulSoup(html_content, 'html.parser')
-            text = soup.get_text(separator=' ', strip=True)
-            
-            # Truncate to max_length
-            if len(text) > max_length:
-                text = text[:max_length] + "..."
-                
-            return text
+            return extract_text_excerpt(html_content, max_length)
         except Exception as e:
             logger.warning(f"Error extracting text excerpt: {e}")
-            return html_content[:max_length] if html_content else ""
+            return ""
+    
+    def _count_keyword_matches(self, text: Optional[str], keywords: List[str]) -> int:
+        """Count keywords whose tokens all appear as whole words in the text."""
+        return len(matching_keywords(keywords, text))
     
     def _calculate_page_match_score(self, page: ConfluencePage, keywords: List[str], 
-                                   classified_intent, user_info: Optional[Dict[str, Any]]) -> float:
+                                   classified_intent, user_info: Optional[Dict[str, Any]],
+                                   title_matches: Optional[int] = None,
+                                   content_matches: Optional[int] = None) -> float:
         """
         Calculate a match score between a page and the classified intent.
         
@@ -520,6 +864,10 @@ class ConfluenceService:
             keywords: List of keywords from the intent
             classified_intent: The classified intent object
             user_info: Optional user information for context-based matching
+            title_matches: Precomputed number of keywords found in the title
+                (from a TextIndex); computed here when not provided
+            content_matches: Precomputed number of keywords found in the excerpt
+                (from a TextIndex); computed here when not provided
             
         Returns:
             Match score between 0 and 1
@@ -530,17 +878,16 @@ class ConfluenceService:
             return score
         
         # 1. Title matching (highest weight)
-        title_text = page.page_title.lower()
-        title_matches = sum(1 for keyword in keywords if keyword in title_text)
+        if title_matches is None:
+            title_matches = self._count_keyword_matches(page.page_title, keywords)
         if title_matches > 0:
             score += 0.4 * (title_matches / len(keywords))
         
         # 2. Content matching (medium weight)
-        if page.content_excerpt:
-            content_text = page.content_excerpt.lower()
-            content_matches = sum(1 for keyword in keywords if keyword in content_text)
-            if content_matches > 0:
-                score += 0.3 * (content_matches / len(keywords))
+        if content_matches is None:
+            content_matches = self._count_keyword_matches(page.content_excerpt, keywords)
+        if content_matches > 0:
+            score += 0.3 * (content_matches / len(keywords))
         
         # 3. Recent activity bonus (pages modified recently)
         if page.last_modified:
@@ -0,0 +1,421 @@
+"""
+Semantic Epic Matcher for AI-Driven Project Management Suite
+
+This service embeds epics and classified intents as vectors and matches them
+with cosine similarity, entirely in-process. Epic vectors are kept in a
+persisted NumPy index that is updated incrementally as epics change.
+"""
+
+import os
+import json
+import logging
+import hashlib
+import threading
+import time
+import zlib
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from app.services.text_index import tokenize
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    SentenceTransformer = None
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Backend directory, so the cache location does not depend on the working directory
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_INDEX_PATH = os.path.join(BASE_DIR, "cache", "epic_vectors.npz")
+DEFAULT_MODEL_NAME = "all-MiniLM-L6-v2"
+
+
+class HashedNgramEmbedder:
+    """Embeds text as signed, hashed word and character n-gram counts."""
+
+    def __init__(self, dim: int = 1024, char_ngrams: Tuple[int, ...] = (3, 4)):
+        """
+        Initialize the embedder.
+
+        Args:
+            dim: Dimension of the output vectors
+            char_ngrams: Character n-gram sizes taken from each padded token
+        """
+        self.dim = dim
+        self.char_ngrams = char_ngrams
+        self.name = f"hashed-ngram-{dim}"
+
+    def _features(self, text: str) -> List[str]:
+        """Return the word, word-bigram and character n-gram features of a text."""
+        tokens = tokenize(text)
+        features = [f"w:{token}" for token in tokens]
+        features.extend(f"b:{a}_{b}" for a, b in zip(tokens, tokens[1:]))
+        for token in tokens:
+            padded = f"<{token}>"
+            for n in self.char_ngrams:
+                features.extend(f"c:{padded[i:i + n]}" for i in range(len(padded) - n + 1))
+        return features
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed a batch of texts.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            Array of shape (len(texts), dim) with L2-normalized rows
+        """
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                # crc32 is stable across processes, unlike hash()
+                h = zlib.crc32(feature.encode("utf-8"))
+                vectors[row, h % self.dim] += 1.0 if (h >> 31) & 1 else -1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+
+class SentenceEmbedder:
+    """Embeds text with a small local sentence-transformers model on CPU."""
+
+    def __init__(self, model_name: str = DEFAULT_MODEL_NAME):
+        """
+        Load the model.
+
+        Args:
+            model_name: sentence-transformers model name or local path
+        """
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.dim = self.model.get_sentence_embedding_dimension()
+        self.name = f"st-{model_name}"
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed a batch of texts.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            Array of shape (len(texts), dim) with L2-normalized rows
+        """
+        vectors = self.model.encode(texts, normalize_embeddings=True, convert_to_numpy=True)
+        return vectors.astype(np.float32)
+
+
+def create_embedder():
+    """
+    Create the best available embedder.
+
+    Uses the local sentence-transformers model named by EPIC_EMBEDDING_MODEL when the
+    package is installed, and hashed n-gram vectors otherwise.
+    """
+    model_name = os.environ.get("EPIC_EMBEDDING_MODEL", DEFAULT_MODEL_NAME)
+    if SentenceTransformer is not None and model_name.lower() != "hashed":
+        try:
+            return SentenceEmbedder(model_name)
+        except Exception as e:
+            logger.warning(f"Could not load embedding model {model_name}, using hashed n-grams: {e}")
+    return HashedNgramEmbedder()
+
+
+class EpicVectorIndex:
+    """Persisted, incrementally updated store of epic vectors with cosine top-k search."""
+
+    def __init__(self, dim: int, embedder_name: str, path: Optional[str] = None):
+        """
+        Initialize the index, loading it from disk if a compatible file exists.
+
+        Args:
+            dim: Vector dimension
+            embedder_name: Name of the embedder that produced the vectors
+            path: Optional .npz file the index is persisted to
+        """
+        self.dim = dim
+        self.embedder_name = embedder_name
+        self.path = path
+        self.keys: List[str] = []
+        self.epics: List[Dict[str, Any]] = []
+        self.fingerprints: List[str] = []
+        self.vectors = np.zeros((0, dim), dtype=np.float32)
+        self._positions: Dict[str, int] = {}
+
+        if path and os.path.exists(path):
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def fingerprint(self, key: str) -> Optional[str]:
+        """Return the stored content fingerprint for an epic, if indexed."""
+        position = self._positions.get(key)
+        return self.fingerprints[position] if position is not None else None
+
+    def upsert(self, epics: List[Dict[str, Any]], fingerprints: List[str], vectors: np.ndarray) -> None:
+        """
+        Insert or replace epics and their vectors.
+
+        Args:
+            epics: Epic dictionaries with at least an "id" key
+            fingerprints: Content fingerprints, one per epic
+            vectors: Array of shape (len(epics), dim)
+        """
+        new_rows = []
+        for epic, fingerprint, vector in zip(epics, fingerprints, vectors):
+            position = self._positions.get(epic["id"])
+            if position is None:
+                self._positions[epic["id"]] = len(self.keys)
+                self.keys.append(epic["id"])
+                self.epics.append(epic)
+                self.fingerprints.append(fingerprint)
+                new_rows.append(vector)
+            else:
+                self.epics[position] = epic
+                self.fingerprints[position] = fingerprint
+                self.vectors[position] = vector
+        if new_rows:
+            self.vectors = np.vstack([self.vectors, np.asarray(new_rows, dtype=np.float32)])
+
+    def retain(self, keys: List[str]) -> int:
+        """
+        Drop every epic not in the given keys.
+
+        Args:
+            keys: Epic keys to keep
+
+        Returns:
+            Number of epics removed
+        """
+        keep = set(keys)
+        positions = [i for i, key in enumerate(self.keys) if key in keep]
+        removed = len(self.keys) - len(positions)
+        if removed:
+            self.keys = [self.keys[i] for i in positions]
+            self.epics = [self.epics[i] for i in positions]
+            self.fingerprints = [self.fingerprints[i] for i in positions]
+            self.vectors = self.vectors[positions]
+            self._positions = {key: i for i, key in enumerate(self.keys)}
+        return removed
+
+    def vector(self, key: str) -> Optional[np.ndarray]:
+        """Return the stored vector for an epic, if indexed."""
+        position = self._positions.get(key)
+        return self.vectors[position] if position is not None else None
+
+    def search(self, query_vector: np.ndarray, k: int = 3) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        Find the epics most similar to a query vector.
+
+        Args:
+            query_vector: L2-normalized query vector
+            k: Number of results to return
+
+        Returns:
+            List of (epic, cosine similarity) pairs, best first
+        """
+        return top_k_similar(self.epics, self.vectors, query_vector, k)
+
+    def save(self) -> None:
+        """Persist the index to its .npz file."""
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp.npz"
+        np.savez(
+            tmp_path,
+            vectors=self.vectors,
+            keys=np.array(self.keys, dtype=str),
+            fingerprints=np.array(self.fingerprints, dtype=str),
+            epics=np.array(json.dumps(self.epics)),
+            embedder=np.array(self.embedder_name),
+        )
+        os.replace(tmp_path, self.path)
+
+    def load(self) -> None:
+        """Load the index from its .npz file, ignoring files built by another embedder."""
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                if str(data["embedder"]) != self.embedder_name or data["vectors"].shape[1:] != (self.dim,):
+                    logger.info(f"Ignoring epic index at {self.path} built with a different embedder")
+                    return
+                self.vectors = data["vectors"].astype(np.float32)
+                self.keys = [str(key) for key in data["keys"]]
+                self.fingerprints = [str(f) for f in data["fingerprints"]]
+                self.epics = json.loads(str(data["epics"]))
+            self._positions = {key: i for i, key in enumerate(self.keys)}
+            logger.info(f"Loaded {len(self.keys)} epic vectors from {self.path}")
+        except Exception as e:
+            logger.warning(f"Could not load epic index from {self.path}: {e}")
+
+
+def top_k_similar(epics: List[Dict[str, Any]], vectors: np.ndarray, query_vector: np.ndarray,
+                  k: int) -> List[Tuple[Dict[str, Any], float]]:
+    """Return the k epics whose vectors are most similar to the query, best first."""
+    if not epics or k <= 0:
+        return []
+    similarities = vectors @ query_vector.astype(np.float32)
+    k = min(k, len(similarities))
+    candidates = np.argpartition(-similarities, k - 1)[:k]
+    candidates = candidates[np.argsort(-similarities[candidates], kind="stable")]
+    return [(epics[i], float(similarities[i])) for i in candidates]
+
+
+class SemanticEpicMatcher:
+    """Matches classified intents to epics by embedding similarity."""
+
+    def __init__(self, index_path: Optional[str] = DEFAULT_INDEX_PATH, embedder=None,
+                 refresh_interval: int = 900, retry_interval: int = 60):
+        """
+        Initialize the matcher.
+
+        Args:
+            index_path: Optional .npz file the epic index is persisted to
+            embedder: Embedder to use (defaults to create_embedder())
+            refresh_interval: Seconds before epics should be re-synced from Jira
+            retry_interval: Seconds before retrying a failed re-sync; doubles with
+                each consecutive failure, up to refresh_interval
+        """
+        self.embedder = embedder or create_embedder()
+        self.index = EpicVectorIndex(self.embedder.dim, self.embedder.name, index_path)
+        self.refresh_interval = refresh_interval
+        self.retry_interval = retry_interval
+        self.last_synced = 0.0
+        self.last_failed = 0.0
+        self.failures = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def epic_text(epic: Dict[str, Any]) -> str:
+        """Return the text an epic is embedded from."""
+        return f"{epic.get('name') or ''}. {epic.get('description') or ''}"
+
+    @staticmethod
+    def intent_text(classified_intent=None, epic_keywords: Optional[List[str]] = None) -> str:
+        """Return the text a classified intent is embedded from."""
+        parts = []
+        if classified_intent is not None:
+            parts.extend([classified_intent.summary or "", classified_intent.description or ""])
+            epic_keywords = epic_keywords or classified_intent.epic_keywords
+        if epic_keywords:
+            parts.append(" ".join(epic_keywords))
+        return ". ".join(part for part in parts if part)
+
+    def needs_refresh(self) -> bool:
+        """Return True if the epics should be re-synced from their source."""
+        now = time.time()
+        if self.failures:
+            backoff = min(self.retry_interval * 2 ** (self.failures - 1), self.refresh_interval)
+            if now - self.last_failed < backoff:
+                return False
+        return not len(self.index) or now - self.last_synced > self.refresh_interval
+
+    def record_sync_failure(self) -> None:
+        """Note a failed re-sync so needs_refresh() backs off before the next attempt."""
+        self.failures += 1
+        self.last_failed = time.time()
+
+    def sync(self, epics: List[Dict[str, Any]], prune: bool = True) -> int:
+        """
+        Bring the index up to date with a list of epics, embedding only new or changed ones.
+
+        Args:
+            epics: Epic dictionaries with "id", "name" and "description" keys
+            prune: Whether to drop indexed epics missing from the list
+
+        Returns:
+            Number of epics that were (re-)embedded
+        """
+        with self._lock:
+            changed, fingerprints = [], []
+            for epic in epics:
+                fingerprint = hashlib.sha1(self.epic_text(epic).encode("utf-8")).hexdigest()
+                if self.index.fingerprint(epic["id"]) != fingerprint:
+                    changed.append(epic)
+                    fingerprints.append(fingerprint)
+
+            if changed:
+                vectors = self.embedder.embed([self.epic_text(epic) for epic in changed])
+                self.index.upsert(changed, fingerprints, vectors)
+            removed = self.index.retain([epic["id"] for epic in epics]) if prune else 0
+
+            if changed or removed:
+                self.index.save()
+            self.last_synced = time.time()
+            self.failures = 0
+
+            logger.info(f"Epic index synced: {len(changed)} embedded, {removed} removed, {len(self.index)} total")
+            return len(changed)
+
+    def match(self, classified_intent=None, epic_keywords: Optional[List[str]] = None,
+              max_results: int = 3) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        Find the epics most similar to a classified intent.
+
+        Args:
+            classified_intent: Optional ClassifiedIntent to match
+            epic_keywords: Optional keywords, used alone or alongside the intent
+            max_results: Maximum number of epics to return
+
+        Returns:
+            List of (epic, cosine similarity) pairs, best first
+        """
+        text = self.intent_text(classified_intent, epic_keywords)
+        if not text:
+            return []
+        query = self.embedder.embed([text])[0]
+        with self._lock:
+            return self.index.search(query, max_results)
+
+    def match_among(self, epics: List[Dict[str, Any]], classified_intent=None,
+                    epic_keywords: Optional[List[str]] = None,
+                    max_results: int = 3) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        Find the most similar epics among a given list, leaving the index unchanged.
+
+        Vectors of indexed, unchanged epics are reused; the rest are embedded for this call only.
+
+        Args:
+            epics: Candidate epic dictionaries with "id", "name" and "description" keys
+            classified_intent: Optional ClassifiedIntent to match
+            epic_keywords: Optional keywords, used alone or alongside the intent
+            max_results: Maximum number of epics to return
+
+        Returns:
+            List of (epic, cosine similarity) pairs, best first
+        """
+        text = self.intent_text(classified_intent, epic_keywords)
+        if not text or not epics:
+            return []
+        texts = [self.epic_text(epic) for epic in epics]
+        vectors: List[Optional[np.ndarray]] = []
+        with self._lock:
+            for epic, epic_text in zip(epics, texts):
+                fingerprint = hashlib.sha1(epic_text.encode("utf-8")).hexdigest()
+                indexed = self.index.fingerprint(epic["id"]) == fingerprint
+                vectors.append(self.index.vector(epic["id"]) if indexed else None)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            for i, vector in zip(missing, self.embedder.embed([texts[i] for i in missing])):
+                vectors[i] = vector
+        query = self.embedder.embed([text])[0]
+        return top_k_similar(epics, np.asarray(vectors, dtype=np.float32), query, max_results)
+
+
+_default_matcher: Optional[SemanticEpicMatcher] = None
+_default_matcher_lock = threading.Lock()
+
+
+def get_epic_matcher() -> SemanticEpicMatcher:
+    """Return the process-wide matcher, persisted at EPIC_INDEX_PATH."""
+    global _default_matcher
+    with _default_matcher_lock:
+        if _default_matcher is None:
+            _default_matcher = SemanticEpicMatcher(
+                index_path=os.environ.get("EPIC_INDEX_PATH", DEFAULT_INDEX_PATH)
+            )
+        return _default_matcher
@@ -1,70 +1,200 @@
 import os
-import pandas as pd
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from openpyxl import Workbook, load_workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, PatternFill, Alignment
-from openpyxl.utils.dataframe import dataframe_to_rows
+from openpyxl.utils import get_column_letter
 
 from app.models import ClassifiedIntent, EpicMatch
 
+# Columns for our export, in workbook order
+COLUMNS = [
+    "Timestamp",
+    "Story ID",
+    "Type",
+    "Priority",
+    "Summary",
+    "Description",
+    "Acceptance Criteria",
+    "Epic Keywords",
+    "Matched Epic ID",
+    "Matched Epic Name",
+    "Epic Match Confidence",
+    "AI Confidence",
+    "Processing Time (ms)",
+    "Cleaned Transcript",
+    "Original Transcript"
+]
+COLUMN_WIDTHS = [20, 12, 10, 10, 40, 60, 50, 30, 15, 25, 15, 12, 15, 60, 60]
+WRAPPED_COLUMNS = {"Description", "Acceptance Criteria", "Cleaned Transcript", "Original Transcript"}
+
+# Conditional formatting based on type and priority
+TYPE_FILLS = {"BUG": "FFCCCC", "STORY": "CCE5FF", "EPIC": "E6CCFF", "TASK": "CCFFCC"}
+PRIORITY_FILLS = {"CRITICAL": "FF6666", "HIGH": "FF9966", "MEDIUM": "FFFF66"}
+
+STORY_LOG_SCHEMA = """
+CREATE TABLE IF NOT EXISTS stories (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    story_id TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    type TEXT,
+    priority TEXT,
+    row_json TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+# Serializes workbook builds within this process; builds in other processes
+# write to their own temporary file and replace the workbook atomically
+_build_lock = threading.Lock()
+
+# Story logs already initialized by this process; the service is created per request
+_initialized_logs = set()
+_init_lock = threading.Lock()
+
 class ExcelExportService:
     def __init__(self, export_directory: str = "exports"):
         self.export_directory = export_directory
         self.excel_filename = "project_stories.xlsx"
         self.excel_path = os.path.join(export_directory, self.excel_filename)
-        
+        self.log_path = os.path.join(export_directory, "project_stories.db")
+
         # Create exports directory if it doesn't exist
         os.makedirs(export_directory, exist_ok=True)
-        
-        # Initialize Excel file if it doesn't exist
-        if not os.path.exists(self.excel_path):
-            self._create_initial_excel_file()
-
-    def _create_initial_excel_file(self):
-        """Create initial Excel file with headers."""
-        # Define columns for our export
-        columns = [
-            "Timestamp",
-            "Story ID",
-            "Type",
-            "Priority", 
-            "Summary",
-            "Description",
-            "Acceptance Criteria",
-            "Epic Keywords",
-            "Matched Epic ID",
-            "Matched Epic Name",
-            "Epic Match Confidence",
-            "AI Confidence",
-            "Processing Time (ms)",
-            "Cleaned Transcript",
-            "Original Transcript"
-        ]
-        
-        # Create DataFrame with headers
-        df = pd.DataFrame(columns=columns)
-        
-        # Create workbook and write data
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Project Stories"
-        
-        # Write headers
-        for col_num, column in enumerate(columns, 1):
-            cell = ws.cell(row=1, column=col_num)
-            cell.value = column
-            cell.font = Font(bold=True)
-            cell.fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-            cell.font = Font(color="FFFFFF", bold=True)
-            cell.alignment = Alignment(horizontal="center", vertical="center")
-        
-        # Auto-adjust column widths
-        column_widths = [20, 12, 10, 10, 40, 60, 50, 30, 15, 25, 15, 12, 15, 60, 60]
-        for col_num, width in enumerate(column_widths, 1):
-            ws.column_dimensions[ws.cell(row=1, column=col_num).column_letter].width = width
-        
-        wb.save(self.excel_path)
+
+        # Initialize the story log, importing any pre-existing workbook, once per process
+        # (again if the log file has since been removed)
+        with _init_lock:
+            log_key = os.path.abspath(self.log_path)
+            if log_key not in _initialized_logs or not os.path.exists(self.log_path):
+                self._init_story_log()
+                _initialized_logs.add(log_key)
+
+    @contextmanager
+    def _connect(self, immediate: bool = False):
+        """Open the story log, holding SQLite's write lock for the transaction if immediate."""
+        conn = sqlite3.connect(self.log_path, timeout=30, isolation_level=None)
+        try:
+            conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+            yield conn
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def _init_story_log(self):
+        """Create the story log and import rows from a workbook written before it existed."""
+        conn = sqlite3.connect(self.log_path, timeout=30)
+        try:
+            conn.executescript(STORY_LOG_SCHEMA)
+        finally:
+            conn.close()
+
+        with self._connect(immediate=True) as conn:
+            if not conn.execute("SELECT value FROM meta WHERE key = 'counters_ready'").fetchone():
+                self._rebuild_counters(conn)
+            if conn.execute("SELECT value FROM meta WHERE key = 'legacy_imported'").fetchone():
+                return
+            if os.path.exists(self.excel_path):
+                wb = load_workbook(self.excel_path, read_only=True)
+                rows = [
+                    [value if value is not None else "" for value in row[:len(COLUMNS)]]
+                    for row in wb.active.iter_rows(min_row=2, values_only=True)
+                    if any(value is not None for value in row)
+                ]
+                wb.close()
+                self._insert_rows(conn, rows)
+                conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('workbook_rows', ?)",
+                    (str(len(rows)),)
+                )
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('legacy_imported', '1')")
+
+    def _insert_rows(self, conn: sqlite3.Connection, rows: List[List[Any]]) -> int:
+        """Append rows (values in COLUMNS order) to the story log and return the last row id.
+
+        The summary counters are updated in the same transaction.
+        """
+        cursor = None
+        increments: Dict[str, int] = {}
+        for row in rows:
+            cursor = conn.execute(
+                "INSERT INTO stories (story_id, created_at, type, priority, row_json) VALUES (?, ?, ?, ?, ?)",
+                (row[1], row[0], row[2], row[3], json.dumps(row, default=str))
+            )
+            for name in ("total", f"type:{row[2]}", f"priority:{row[3]}"):
+                increments[name] = increments.get(name, 0) + 1
+        conn.executemany(
+            "INSERT INTO counters (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            list(increments.items())
+        )
+        if rows:
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('last_story_at', ?)",
+                (str(rows[-1][0]),)
+            )
+        return cursor.lastrowid if cursor else 0
+
+    def _rebuild_counters(self, conn: sqlite3.Connection) -> None:
+        """Recompute the summary counters from the story log (for logs created before counters existed)."""
+        conn.execute("DELETE FROM counters")
+        conn.execute("INSERT INTO counters (name, value) SELECT 'total', COUNT(*) FROM stories")
+        conn.execute("INSERT INTO counters (name, value) SELECT 'type:' || type, COUNT(*) FROM stories GROUP BY type")
+        conn.execute("INSERT INTO counters (name, value) SELECT 'priority:' || priority, COUNT(*) FROM stories GROUP BY priority")
+        last = conn.execute("SELECT created_at FROM stories ORDER BY id DESC LIMIT 1").fetchone()
+        if last:
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('last_story_at', ?)", (last[0],))
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('counters_ready', '1')")
+
+    def _story_count(self, conn: sqlite3.Connection) -> int:
+        """Return the number of logged stories from the running counter."""
+        row = conn.execute("SELECT value FROM counters WHERE name = 'total'").fetchone()
+        return row[0] if row else 0
+
+    def _story_row(
+        self,
+        timestamp: datetime,
+        story_id: str,
+        classified_intent: ClassifiedIntent,
+        epic_match: Optional[EpicMatch],
+        cleaned_transcript: str,
+        original_transcript: str,
+        processing_time_ms: int
+    ) -> List[Any]:
+        """Return a story's row values in COLUMNS order."""
+        story_data = {
+            "Timestamp": timestamp.strftime("%Y-%m-%d %H:%M:%S"),
+            "Story ID": story_id,
+            "Type": classified_intent.type.value.upper(),
+            "Priority": classified_intent.priority.value.upper(),
+            "Summary": classified_intent.summary,
+            "Description": classified_intent.description,
+            "Acceptance Criteria": " | ".join(classified_intent.acceptance_criteria) if classified_intent.acceptance_criteria else "",
+            "Epic Keywords": ", ".join(classified_intent.epic_keywords) if classified_intent.epic_keywords else "",
+            "Matched Epic ID": epic_match.epic_id if epic_match and epic_match.epic_id else "",
+            "Matched Epic Name": epic_match.epic_name if epic_match and epic_match.epic_name else "",
+            "Epic Match Confidence": f"{epic_match.match_confidence:.2%}" if epic_match else "0%",
+            "AI Confidence": f"{classified_intent.confidence:.2%}",
+            "Processing Time (ms)": processing_time_ms,
+            "Cleaned Transcript": cleaned_transcript,
+            "Original Transcript": original_transcript
+        }
+        return [story_data[column] for column in COLUMNS]
 
     def export_story(
         self,
@@ -75,85 +205,32 @@ class ExcelExportService:
         processing_time_ms: int
     ) -> Dict[str, Any]:
         """
-        Export a single story to Excel file.
-        Each story becomes a new row in the spreadsheet.
+        Export a single story to the story log.
+        Each story becomes a new row in the spreadsheet, which is built from the
+        log when it is downloaded (see build_workbook).
         """
         try:
             # Generate unique story ID based on timestamp
             timestamp = datetime.now()
             story_id = f"STORY-{timestamp.strftime('%Y%m%d-%H%M%S')}"
-            
-            # Prepare story data
-            story_data = {
-                "Timestamp": timestamp.strftime("%Y-%m-%d %H:%M:%S"),
-                "Story ID": story_id,
-                "Type": classified_intent.type.value.upper(),
-                "Priority": classified_intent.priority.value.upper(),
-                "Summary": classified_intent.summary,
-                "Description": classified_intent.description,
-                "Acceptance Criteria": " | ".join(classified_intent.acceptance_criteria) if classified_intent.acceptance_criteria else "",
-                "Epic Keywords": ", ".join(classified_intent.epic_keywords) if classified_intent.epic_keywords else "",
-                "Matched Epic ID": epic_match.epic_id if epic_match and epic_match.epic_id else "",
-                "Matched Epic Name": epic_match.epic_name if epic_match and epic_match.epic_name else "",
-                "Epic Match Confidence": f"{epic_match.match_confidence:.2%}" if epic_match else "0%",
-                "AI Confidence": f"{classified_intent.confidence:.2%}",
-                "Processing Time (ms)": processing_time_ms,
-                "Cleaned Transcript": cleaned_transcript,
-                "Original Transcript": original_transcript
-            }
-            
-            # Load existing workbook
-            wb = load_workbook(self.excel_path)
-            ws = wb.active
-            
-            # Find the next empty row
-            next_row = ws.max_row + 1
-            
-            # Write data to the new row
-            for col_num, (column, value) in enumerate(story_data.items(), 1):
-                cell = ws.cell(row=next_row, column=col_num)
-                cell.value = value
-                
-                # Apply conditional formatting based on type and priority
-                if column == "Type":
-                    if value == "BUG":
-                        cell.fill = PatternFill(start_color="FFCCCC", end_color="FFCCCC", fill_type="solid")
-                    elif value == "STORY":
-                        cell.fill = PatternFill(start_color="CCE5FF", end_color="CCE5FF", fill_type="solid")
-                    elif value == "EPIC":
-                        cell.fill = PatternFill(start_color="E6CCFF", end_color="E6CCFF", fill_type="solid")
-                    elif value == "TASK":
-                        cell.fill = PatternFill(start_color="CCFFCC", end_color="CCFFCC", fill_type="solid")
-                
-                elif column == "Priority":
-                    if value == "CRITICAL":
-                        cell.fill = PatternFill(start_color="FF6666", end_color="FF6666", fill_type="solid")
-                        cell.font = Font(color="FFFFFF", bold=True)
-                    elif value == "HIGH":
-                        cell.fill = PatternFill(start_color="FF9966", end_color="FF9966", fill_type="solid")
-                    elif value == "MEDIUM":
-                        cell.fill = PatternFill(start_color="FFFF66", end_color="FFFF66", fill_type="solid")
-                
-                # Set text wrapping for longer text fields
-                if column in ["Description", "Acceptance Criteria", "Cleaned Transcript", "Original Transcript"]:
-                    cell.alignment = Alignment(wrap_text=True, vertical="top")
-                else:
-                    cell.alignment = Alignment(vertical="top")
-            
-            # Set row height for better readability
-            ws.row_dimensions[next_row].height = 60
-            
-            # Save the workbook
-            wb.save(self.excel_path)
-            
+
+            row = self._story_row(
+                timestamp, story_id, classified_intent, epic_match,
+                cleaned_transcript, original_transcript, processing_time_ms
+            )
+
+            # Append to the story log (SQLite serializes concurrent writers)
+            with self._connect(immediate=True) as conn:
+                row_id = self._insert_rows(conn, [row])
+
             return {
                 "success": True,
                 "story_id": story_id,
                 "excel_path": self.excel_path,
-                "row_number": next_row,
+                "row_number": row_id + 1,  # Row 1 of the workbook is the header
                 "message": f"Story {story_id} exported to Excel successfully"
             }
-            
+
         except Exception as e:
             return {
                 "success": False,
@@ -161,33 +238,157 @@ class ExcelExportService:
                 "message": f"Failed to export story to Excel: {str(e)}"
             }
 
-    def get_export_summary(self) -> Dict[str, Any]:
-        """Get summary information about exported stories."""
+    def export_stories(self, stories: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Export a batch of stories to the story log in a single transaction.
+
+        Args:
+            stories: Dictionaries with the keyword arguments of export_story
+                (classified_intent, epic_match, cleaned_transcript,
+                original_transcript, processing_time_ms)
+
+        Returns:
+            Dictionary with the story IDs and the workbook row of the first story
+        """
         try:
-            if not os.path.exists(self.excel_path):
-                return {
-                    "total_stories": 0,
-                    "excel_exists": False,
-                    "excel_path": self.excel_path
-                }
-            
-            # Load workbook and count rows (minus header)
-            wb = load_workbook(self.excel_path)
-            ws = wb.active
-            total_stories = ws.max_row - 1 if ws.max_row > 1 else 0
-            
-            # Get file modification time
-            file_stats = os.stat(self.excel_path)
-            last_modified = datetime.fromtimestamp(file_stats.st_mtime)
-            
+            # Stories in a batch share a timestamp, so number them to keep IDs unique
+            timestamp = datetime.now()
+            batch_id = f"STORY-{timestamp.strftime('%Y%m%d-%H%M%S')}"
+            story_ids = [f"{batch_id}-{i:03d}" for i in range(1, len(stories) + 1)]
+            rows = [
+                self._story_row(timestamp, story_id, **story)
+                for story_id, story in zip(story_ids, stories)
+            ]
+
+            with self._connect(immediate=True) as conn:
+                last_row_id = self._insert_rows(conn, rows)
+
             return {
-                "total_stories": total_stories,
-                "excel_exists": True,
+                "success": True,
+                "story_ids": story_ids,
                 "excel_path": self.excel_path,
-                "last_modified": last_modified.strftime("%Y-%m-%d %H:%M:%S"),
-                "file_size_kb": round(file_stats.st_size / 1024, 2)
+                "first_row_number": last_row_id - len(rows) + 2 if rows else None,
+                "message": f"{len(rows)} stories exported to Excel successfully"
+            }
+
+        except Exception as e:
+            return {
+                "success": False,
+                "story_ids": [],
+                "error": str(e),
+                "message": f"Failed to export stories to Excel: {str(e)}"
             }
-            
+
+    def _workbook_is_current(self, conn: sqlite3.Connection) -> bool:
+        """Return True if the workbook on disk already contains every logged story."""
+        if not os.path.exists(self.excel_path):
+            return False
+        built_rows = conn.execute("SELECT value FROM meta WHERE key = 'workbook_rows'").fetchone()
+        return built_rows is not None and int(built_rows[0]) == self._story_count(conn)
+
+    def build_workbook(self, force: bool = False) -> str:
+        """
+        Build the formatted Excel workbook from the story log if it is out of date.
+
+        All stories logged since the last build are written in one pass, using
+        openpyxl's write-only mode.
+
+        Args:
+            force: Rebuild even if the workbook is already current
+
+        Returns:
+            Path to the Excel file
+        """
+        with _build_lock:
+            with self._connect() as conn:
+                if not force and self._workbook_is_current(conn):
+                    return self.excel_path
+                rows = [json.loads(row[0]) for row in conn.execute("SELECT row_json FROM stories ORDER BY id")]
+
+            wb = Workbook(write_only=True)
+            ws = wb.create_sheet("Project Stories")
+
+            # Auto-adjust column widths
+            for col_num, width in enumerate(COLUMN_WIDTHS, 1):
+                ws.column_dimensions[get_column_letter(col_num)].width = width
+
+            # Write headers
+            header = []
+            for column in COLUMNS:
+                cell = WriteOnlyCell(ws, value=column)
+                cell.fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+                cell.font = Font(color="FFFFFF", bold=True)
+                cell.alignment = Alignment(horizontal="center", vertical="center")
+                header.append(cell)
+            ws.append(header)
+
+            wrapped = Alignment(wrap_text=True, vertical="top")
+            top = Alignment(vertical="top")
+            for row_num, row in enumerate(rows, 2):
+                cells = []
+                for column, value in zip(COLUMNS, row):
+                    cell = WriteOnlyCell(ws, value=value)
+                    if column == "Type" and value in TYPE_FILLS:
+                        cell.fill = PatternFill(start_color=TYPE_FILLS[value], end_color=TYPE_FILLS[value], fill_type="solid")
+                    elif column == "Priority" and value in PRIORITY_FILLS:
+                        cell.fill = PatternFill(start_color=PRIORITY_FILLS[value], end_color=PRIORITY_FILLS[value], fill_type="solid")
+                        if value == "CRITICAL":
+                            cell.font = Font(color="FFFFFF", bold=True)
+                    # Set text wrapping for longer text fields
+                    cell.alignment = wrapped if column in WRAPPED_COLUMNS else top
+                    cells.append(cell)
+                # Set row height for better readability
+                ws.row_dimensions[row_num].height = 60
+                ws.append(cells)
+
+            # Write to a temporary file and swap it in so readers never see a partial workbook
+            tmp_path = f"{self.excel_path}.{os.getpid()}.tmp"
+            wb.save(tmp_path)
+            os.replace(tmp_path, self.excel_path)
+
+            with self._connect(immediate=True) as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('workbook_rows', ?)",
+                    (str(len(rows)),)
+                )
+
+            return self.excel_path
+
+    def get_export_summary(self) -> Dict[str, Any]:
+        """Get summary information about exported stories.
+
+        Answered from the running counters and file metadata, without reading
+        the stories or the workbook.
+        """
+        try:
+            with self._connect() as conn:
+                counters = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+                meta = dict(conn.execute(
+                    "SELECT key, value FROM meta WHERE key IN ('last_story_at', 'workbook_rows')"
+                ).fetchall())
+
+            summary = {
+                "total_stories": counters.get("total", 0),
+                "by_type": {name[5:]: value for name, value in counters.items() if name.startswith("type:")},
+                "by_priority": {name[9:]: value for name, value in counters.items() if name.startswith("priority:")},
+                "last_story_at": meta.get("last_story_at"),
+                "story_log_size_kb": round(os.stat(self.log_path).st_size / 1024, 2),
+                "excel_exists": os.path.exists(self.excel_path),
+                "excel_path": self.excel_path
+            }
+
+            if summary["excel_exists"]:
+                # Get file modification time
+                file_stats = os.stat(self.excel_path)
+                last_modified = datetime.fromtimestamp(file_stats.st_mtime)
+                summary.update({
+                    "last_modified": last_modified.strftime("%Y-%m-%d %H:%M:%S"),
+                    "file_size_kb": round(file_stats.st_size / 1024, 2),
+                    "excel_up_to_date": int(meta.get("workbook_rows", -1)) == summary["total_stories"]
+                })
+
+            return summary
+
         except Exception as e:
             return {
                 "total_stories": 0,
@@ -8,6 +8,7 @@ project issues, based on AI-processed transcripts.
 import os
 import logging
 import re
+import threading
 import warnings
 import urllib3
 from typing import Dict, Any, List, Optional
@@ -15,12 +16,18 @@ from jira import JIRA
 from datetime import datetime
 from pydantic import BaseModel
 
+from app.services.text_index import TextIndex, matching_keywords
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
 # Configure SSL warnings
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+# Epic text indexes, one per project, kept across requests and updated as epics change
+_epic_indexes: Dict[str, TextIndex] = {}
+_epic_indexes_lock = threading.Lock()
+
 class JiraFeature(BaseModel):
     """Model representing a Jira feature."""
     feature_key: str
@@ -265,13 +272,15 @@ class JiraService:
             logger.error(f"Error creating issue from intent in Jira: {e}")
             raise
     
-    def get_epics(self, project_key: str = "ROIA", max_results: int = 100) -> List[JiraEpic]:
+    def get_epics(self, project_key: str = "ROIA", max_results: Optional[int] = 100,
+                  include_issue_counts: bool = True) -> List[JiraEpic]:
         """
         Retrieves 'Epic'-type issues from Jira for the specified project.
         
         Args:
             project_key: The project key to filter epics by (defaults to ROIA)
-            max_results: Maximum number of results to return
+            max_results: Maximum number of results to return; None pages through every epic
+            include_issue_counts: Whether to look up each epic's issue count (one request per epic)
             
         Returns:
             List of JiraEpic objects
@@ -291,7 +300,7 @@ class JiraService:
             jql_query = f'issuetype = Epic AND project = {project_key}'
             issues = self.jira_client.search_issues(
                 jql_query, 
-                maxResults=max_results,
+                maxResults=max_results if max_results is not None else False,  # False fetches all pages
                 fields=fields_to_extract
             )
             
@@ -304,7 +313,7 @@ class JiraService:
             epics = []
             for issue in issues:
                 # Get issue count for this epic
-                issue_count = self._get_epic_issue_count(issue.key)
+                issue_count = self._get_epic_issue_count(issue.key) if include_issue_counts else 0
                 
                 epic = JiraEpic(
                     epic_key=issue.key,
@@ -450,14 +459,27 @@ class JiraService:
                 logger.warning(f"No epics found for project {project_key}")
                 return []
                 
+            # Keyword lookups use the project's long-lived epic index; only new or
+            # changed epics are re-tokenized, and epics no longer returned are removed
+            with _epic_indexes_lock:
+                index = _epic_indexes.setdefault(project_key, TextIndex())
+                index.sync({epic.epic_key: self._epic_text(epic) for epic in all_epics})
+                keyword_matches = index.match_counts(keywords)
+                relevance = index.score(keywords)
+            
             # Calculate match scores for each epic
             for epic in all_epics:
                 epic.match_score = self._calculate_epic_match_score(
-                    epic, keywords, classified_intent, user_info
+                    epic, keywords, classified_intent, user_info,
+                    keyword_matches=keyword_matches.get(epic.epic_key, 0)
                 )
             
-            # Sort by match score descending
-            matching_epics = sorted(all_epics, key=lambda x: x.match_score, reverse=True)
+            # Sort by match score descending, using BM25 relevance to break ties
+            matching_epics = sorted(
+                all_epics,
+                key=lambda x: (x.match_score, relevance.get(x.epic_key, 0.0)),
+                reverse=True
+            )
             
             # Return top N results
             return matching_epics[:max_results]
@@ -487,7 +509,12 @@ class JiraService:
         
         return keywords
     
-    def _calculate_epic_match_score(self, epic: JiraEpic, keywords: List[str], classified_intent, user_info: Optional[Dict[str, Any]]) -> float:
+    def _epic_text(self, epic: JiraEpic) -> str:
+        """Return the text an epic is matched on (name, summary and description)."""
+        return f"{epic.epic_name} {epic.epic_summary} {epic.epic_description or ''}"
+    
+    def _calculate_epic_match_score(self, epic: JiraEpic, keywords: List[str], classified_intent, user_info: Optional[Dict[str, Any]],
+                                    keyword_matches: Optional[int] = None) -> float:
         """
         Calculate a match score between an epic and the classified intent.
         
@@ -496,6 +523,8 @@ class JiraService:
             keywords: List of keywords from the intent
             classified_intent: The classified intent object
             user_info: Optional user information for context-based matching
+            keyword_matches: Precomputed number of keywords found in the epic text
+                (from a TextIndex); computed here when not provided
             
         Returns:
             Match score between 0 and 1
@@ -503,10 +532,9 @@ class JiraService:
         score = 0.0
         
         # 1. Keyword matching in epic name and description (highest weight)
-        epic_text = f"{epic.epic_name} {epic.epic_summary} {epic.epic_description or ''}".lower()
-        for keyword in keywords:
-            if keyword.lower() in epic_text:
-                score += 0.15  # Each matching keyword adds to score
+        if keyword_matches is None:
+            keyword_matches = len(matching_keywords(keywords, self._epic_text(epic)))
+        score += 0.15 * keyword_matches  # Each matching keyword adds to score
                 
         # 2. Recent activity bonus
         if epic.recent_activity:
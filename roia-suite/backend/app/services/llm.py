@@ -1,9 +1,11 @@
 import os
-import re
 import time
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Iterator, Tuple
 from app.models import ClassifiedIntent, IssueType, Priority
 from app.chat_agent import ChatAgent
+from app.services.transcript_cleaner import clean_transcript
+from app.services.epic_matcher import SemanticEpicMatcher, get_epic_matcher
+from app.services.text_index import matching_keywords
 
 class LLMService:
     def __init__(self):
@@ -38,76 +40,83 @@ Return your response as valid JSON with the following structure:
     
     def clean_transcript(self, transcript: str) -> str:
         """Clean and normalize transcript text."""
-        # Remove common filler words and normalize text
-        filler_words = [
-            r'\buh+\b', r'\bum+\b', r'\ber+\b', r'\bah+\b', r'\blike\b', 
-            r'\byou know\b', r'\bactually\b', r'\bbasically\b', r'\bso\b',
-            r'\bwell\b', r'\bokay\b', r'\bright\b'
-        ]
-        
-        cleaned = transcript.lower()
-        
-        # Remove filler words
-        for pattern in filler_words:
-            cleaned = re.sub(pattern, '', cleaned, flags=re.IGNORECASE)
-        
-        # Clean up extra spaces and punctuation
-        cleaned = re.sub(r'\s+', ' ', cleaned)  # Multiple spaces to single
-        cleaned = re.sub(r'[,]{2,}', ',', cleaned)  # Multiple commas
-        cleaned = re.sub(r'[.]{2,}', '.', cleaned)  # Multiple periods
-        cleaned = cleaned.strip()
-        
-        # Capitalize first letter of sentences
-        sentences = cleaned.split('.')
-        cleaned_sentences = []
-        for sentence in sentences:
-            sentence = sentence.strip()
-            if sentence:
-                sentence = sentence[0].upper() + sentence[1:] if len(sentence) > 1 else sentence.upper()
-                cleaned_sentences.append(sentence)
-        
-        return '. '.join(cleaned_sentences) if cleaned_sentences else transcript
+        return clean_transcript(transcript)
 
     def classify_intent(self, cleaned_transcript: str) -> ClassifiedIntent:
         """Use athenaGPT to classify transcript intent and extract structured data."""
+        return self.classify_intent_with_status(cleaned_transcript)[0]
+
+    def classify_intent_with_status(self, cleaned_transcript: str) -> Tuple[ClassifiedIntent, Optional[str]]:
+        """Classify transcript intent, reporting whether the model's classification was used.
         
+        Returns:
+            Tuple of (intent, error); error is None when the model's response was parsed,
+            otherwise it describes why the keyword fallback classification was used
+        """
         user_prompt = f"Analyze this project update transcript:\n\n{cleaned_transcript}"
 
         try:
             # Use the ChatAgent to process the transcript
             content = self.chat_agent.send_message(user_prompt)
-            
-            # Extract JSON from the response (in case there's extra text)
-            import json
-            try:
-                # Try to find JSON in the response
-                json_start = content.find('{')
-                json_end = content.rfind('}') + 1
-                if json_start != -1 and json_end != -1:
-                    json_str = content[json_start:json_end]
-                    parsed_data = json.loads(json_str)
-                else:
-                    # Fallback parsing
-                    parsed_data = json.loads(content)
-                
-                return ClassifiedIntent(
-                    type=IssueType(parsed_data.get("type", "task")),
-                    summary=parsed_data.get("summary", "Project update"),
-                    description=parsed_data.get("description", cleaned_transcript),
-                    acceptance_criteria=parsed_data.get("acceptance_criteria", []),
-                    priority=Priority(parsed_data.get("priority", "medium")),
-                    epic_keywords=parsed_data.get("epic_keywords", []),
-                    confidence=float(parsed_data.get("confidence", 0.8))
-                )
-                
-            except json.JSONDecodeError:
-                # Fallback if JSON parsing fails
-                return self._fallback_classification(cleaned_transcript)
+            return self._parse_classification_strict(content, cleaned_transcript), None
                 
         except Exception as e:
             print(f"LLM classification error: {e}")
+            return self._fallback_classification(cleaned_transcript), f"Classification failed, used keyword fallback: {e}"
+
+    def stream_classification(self, cleaned_transcript: str) -> Iterator[Tuple[str, Any]]:
+        """Classify a transcript while streaming the model's output.
+        
+        Yields ("token", text) pairs as the completion arrives, then a final
+        ("intent", ClassifiedIntent) pair parsed from the full response.
+        """
+        user_prompt = f"Analyze this project update transcript:\n\n{cleaned_transcript}"
+        
+        parts = []
+        try:
+            for delta in self.chat_agent.send_message(user_prompt, stream=True):
+                parts.append(delta)
+                yield "token", delta
+            intent = self._parse_classification("".join(parts), cleaned_transcript)
+        except Exception as e:
+            print(f"LLM classification error: {e}")
+            intent = self._fallback_classification(cleaned_transcript)
+        
+        yield "intent", intent
+
+    def _parse_classification(self, content: str, cleaned_transcript: str) -> ClassifiedIntent:
+        """Parse the model's JSON classification, falling back to keyword rules if it is invalid."""
+        import json
+        try:
+            return self._parse_classification_strict(content, cleaned_transcript)
+        except json.JSONDecodeError:
+            # Fallback if JSON parsing fails
             return self._fallback_classification(cleaned_transcript)
 
+    def _parse_classification_strict(self, content: str, cleaned_transcript: str) -> ClassifiedIntent:
+        """Parse the model's JSON classification, raising ValueError if it is invalid."""
+        # Extract JSON from the response (in case there's extra text)
+        import json
+        # Try to find JSON in the response
+        json_start = content.find('{')
+        json_end = content.rfind('}') + 1
+        if json_start != -1 and json_end != -1:
+            json_str = content[json_start:json_end]
+            parsed_data = json.loads(json_str)
+        else:
+            # Fallback parsing
+            parsed_data = json.loads(content)
+        
+        return ClassifiedIntent(
+            type=IssueType(parsed_data.get("type", "task")),
+            summary=parsed_data.get("summary", "Project update"),
+            description=parsed_data.get("description", cleaned_transcript),
+            acceptance_criteria=parsed_data.get("acceptance_criteria", []),
+            priority=Priority(parsed_data.get("priority", "medium")),
+            epic_keywords=parsed_data.get("epic_keywords", []),
+            confidence=float(parsed_data.get("confidence", 0.8))
+        )
+
     def _fallback_classification(self, transcript: str) -> ClassifiedIntent:
         """Fallback classification when LLM fails."""
         # Simple keyword-based classification
@@ -144,53 +153,47 @@ Return your response as valid JSON with the following structure:
             confidence=0.6  # Lower confidence for fallback
         )
 
-    def find_epic_matches(self, epic_keywords: List[str], available_epics: List[Dict[str, Any]] = None) -> Dict[str, Any]:
-        """Find matching epics based on keywords. This is a placeholder for now."""
-        # TODO: Implement actual epic matching with Jira API or vector search
-        # For now, return a mock response
-        
-        if not epic_keywords or not available_epics:
-            return {
-                "epic_id": None,
-                "epic_name": None,
-                "match_confidence": 0.0,
-                "keywords_matched": []
-            }
-        
-        # Simple mock matching logic (to be replaced with actual implementation)
-        best_match = None
-        best_score = 0.0
-        matched_keywords = []
-        
-        for epic in available_epics:
-            epic_name = epic.get("name", "").lower()
-            epic_description = epic.get("description", "").lower()
-            
-            score = 0
-            current_matches = []
-            
-            for keyword in epic_keywords:
-                if keyword.lower() in epic_name or keyword.lower() in epic_description:
-                    score += 1
-                    current_matches.append(keyword)
-            
-            if score > best_score:
-                best_score = score
-                best_match = epic
-                matched_keywords = current_matches
+    def find_epic_matches(self, epic_keywords: List[str], available_epics: List[Dict[str, Any]] = None,
+                          classified_intent: Optional[ClassifiedIntent] = None,
+                          matcher: Optional[SemanticEpicMatcher] = None,
+                          min_similarity: float = 0.15) -> Dict[str, Any]:
+        """Find the epic that best matches the intent by embedding similarity.
         
-        if best_match and best_score > 0:
-            confidence = min(best_score / len(epic_keywords), 1.0)
-            return {
-                "epic_id": best_match.get("id"),
-                "epic_name": best_match.get("name"),
-                "match_confidence": confidence,
-                "keywords_matched": matched_keywords
-            }
+        Matching runs in-process against the semantic epic index; no LLM calls are made.
         
-        return {
+        Args:
+            epic_keywords: Keywords extracted for epic matching
+            available_epics: Optional epics ({"id", "name", "description"}) to choose from;
+                the shared index is searched when omitted and is never modified
+            classified_intent: Optional classified intent whose summary and description
+                are embedded alongside the keywords
+            matcher: Optional matcher (defaults to the shared persisted matcher)
+            min_similarity: Cosine similarity below which no epic is considered a match
+        """
+        no_match = {
             "epic_id": None,
             "epic_name": None,
             "match_confidence": 0.0,
             "keywords_matched": []
         }
+        
+        if not epic_keywords and classified_intent is None:
+            return no_match
+        
+        matcher = matcher or get_epic_matcher()
+        if available_epics:
+            matches = matcher.match_among(available_epics, classified_intent, epic_keywords, max_results=1)
+        else:
+            matches = matcher.match(classified_intent, epic_keywords, max_results=1)
+        if not matches or matches[0][1] < min_similarity:
+            return no_match
+        
+        best_match, similarity = matches[0]
+        matched_keywords = matching_keywords(epic_keywords or [], matcher.epic_text(best_match))
+        
+        return {
+            "epic_id": best_match.get("id"),
+            "epic_name": best_match.get("name"),
+            "match_confidence": min(max(similarity, 0.0), 1.0),
+            "keywords_matched": matched_keywords
+        }
@@ -0,0 +1,311 @@
+"""
+Text Index for AI-Driven Project Management Suite
+
+This module implements a small in-process inverted index with BM25 scoring,
+shared by the Jira and Confluence services for epic and page matching.
+"""
+
+import math
+import re
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+# Tokens are lowercase alphanumeric runs, matching the keyword extractors
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """
+    Split text into lowercase alphanumeric tokens.
+
+    Args:
+        text: The text to tokenize
+
+    Returns:
+        List of tokens in document order
+    """
+    if not text:
+        return []
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def matching_keywords(keywords: Iterable[str], text: Optional[str]) -> List[str]:
+    """
+    Return the keywords whose tokens all appear as whole words in the text.
+
+    Args:
+        keywords: Keywords to look for
+        text: The text to search
+
+    Returns:
+        Matched keywords, in their original order
+    """
+    text_tokens = set(tokenize(text))
+    matched = []
+    for keyword in keywords:
+        keyword_tokens = tokenize(keyword)
+        if keyword_tokens and text_tokens.issuperset(keyword_tokens):
+            matched.append(keyword)
+    return matched
+
+
+class TextIndex:
+    """Inverted index over short documents with BM25 and keyword-match scoring."""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        """
+        Initialize an empty index.
+
+        Args:
+            k1: BM25 term-frequency saturation parameter
+            b: BM25 document-length normalization parameter
+        """
+        self.k1 = k1
+        self.b = b
+
+        # term -> {slot: term frequency}
+        self._postings: Dict[str, Dict[int, int]] = {}
+        # term -> (slots, term frequencies) as arrays, rebuilt lazily after changes
+        self._posting_arrays: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+
+        self._slot_by_id: Dict[str, int] = {}
+        # doc ID -> hash of the text it was indexed from, so sync() skips unchanged documents
+        self._fingerprints: Dict[str, int] = {}
+        self._id_by_slot: List[Optional[str]] = []
+        self._terms_by_slot: List[Tuple[str, ...]] = []
+        self._free_slots: List[int] = []
+        self._doc_lengths = np.zeros(0, dtype=np.float64)
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._slot_by_id)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._slot_by_id
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._slot_by_id))
+
+    def add(self, doc_id: str, text: Optional[str]) -> None:
+        """
+        Add a document to the index, replacing any existing document with the same ID.
+
+        Args:
+            doc_id: Unique document identifier
+            text: Document text
+        """
+        if doc_id in self._slot_by_id:
+            self.remove(doc_id)
+
+        tokens = tokenize(text)
+        term_counts: Dict[str, int] = {}
+        for token in tokens:
+            term_counts[token] = term_counts.get(token, 0) + 1
+
+        if self._free_slots:
+            slot = self._free_slots.pop()
+            self._id_by_slot[slot] = doc_id
+            self._terms_by_slot[slot] = tuple(term_counts)
+        else:
+            slot = len(self._id_by_slot)
+            self._id_by_slot.append(doc_id)
+            self._terms_by_slot.append(tuple(term_counts))
+            if slot >= len(self._doc_lengths):
+                grown = np.zeros(max(16, 2 * len(self._doc_lengths)), dtype=np.float64)
+                grown[:len(self._doc_lengths)] = self._doc_lengths
+                self._doc_lengths = grown
+
+        self._slot_by_id[doc_id] = slot
+        self._fingerprints[doc_id] = hash(text)
+        self._doc_lengths[slot] = len(tokens)
+        self._total_length += len(tokens)
+
+        for term, count in term_counts.items():
+            self._postings.setdefault(term, {})[slot] = count
+            self._posting_arrays.pop(term, None)
+
+    def remove(self, doc_id: str) -> bool:
+        """
+        Remove a document from the index.
+
+        Args:
+            doc_id: The document identifier to remove
+
+        Returns:
+            True if the document was present, False otherwise
+        """
+        slot = self._slot_by_id.pop(doc_id, None)
+        if slot is None:
+            return False
+        self._fingerprints.pop(doc_id, None)
+
+        for term in self._terms_by_slot[slot]:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(slot, None)
+                if not postings:
+                    del self._postings[term]
+            self._posting_arrays.pop(term, None)
+
+        self._total_length -= int(self._doc_lengths[slot])
+        self._doc_lengths[slot] = 0
+        self._id_by_slot[slot] = None
+        self._terms_by_slot[slot] = ()
+        self._free_slots.append(slot)
+        return True
+
+    def sync(self, documents: Mapping[str, Optional[str]], remove_missing: bool = True) -> int:
+        """
+        Bring the index up to date with a corpus, re-tokenizing only documents whose text changed.
+
+        Args:
+            documents: Current text by document ID
+            remove_missing: Whether to remove indexed documents absent from documents
+
+        Returns:
+            Number of documents added, replaced or removed
+        """
+        changed = 0
+        if remove_missing:
+            for doc_id in [doc_id for doc_id in self._slot_by_id if doc_id not in documents]:
+                self.remove(doc_id)
+                changed += 1
+        for doc_id, text in documents.items():
+            if doc_id not in self._slot_by_id or self._fingerprints.get(doc_id) != hash(text):
+                self.add(doc_id, text)
+                changed += 1
+        return changed
+
+    def clear(self) -> None:
+        """Remove every document from the index."""
+        self.__init__(k1=self.k1, b=self.b)
+
+    def _posting_array(self, term: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Return the (slots, frequencies) arrays for a term, building them on first use."""
+        arrays = self._posting_arrays.get(term)
+        if arrays is None:
+            postings = self._postings.get(term)
+            if not postings:
+                return None
+            slots = np.fromiter(postings.keys(), dtype=np.int64, count=len(postings))
+            freqs = np.fromiter(postings.values(), dtype=np.float64, count=len(postings))
+            arrays = (slots, freqs)
+            self._posting_arrays[term] = arrays
+        return arrays
+
+    def bm25_scores(self, query_terms: Iterable[str]) -> np.ndarray:
+        """
+        Score every slot in the index against the query with BM25.
+
+        Args:
+            query_terms: Query keywords; each is tokenized before lookup
+
+        Returns:
+            Array of scores indexed by slot (removed slots score 0)
+        """
+        n_slots = len(self._id_by_slot)
+        scores = np.zeros(n_slots, dtype=np.float64)
+        n_docs = len(self._slot_by_id)
+        if not n_docs:
+            return scores
+
+        avg_length = self._total_length / n_docs or 1.0
+        length_norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[:n_slots] / avg_length)
+
+        terms = {token for term in query_terms for token in tokenize(term)}
+        for term in terms:
+            arrays = self._posting_array(term)
+            if arrays is None:
+                continue
+            slots, freqs = arrays
+            idf = math.log(1 + (n_docs - len(slots) + 0.5) / (len(slots) + 0.5))
+            scores[slots] += idf * freqs * (self.k1 + 1) / (freqs + length_norm[slots])
+
+        return scores
+
+    def keyword_match_counts(self, keywords: Iterable[str]) -> np.ndarray:
+        """
+        Count how many keywords each slot contains as whole tokens.
+
+        A multi-word keyword counts as matched only when all of its tokens are present.
+
+        Args:
+            keywords: Keywords to look for
+
+        Returns:
+            Array of match counts indexed by slot
+        """
+        n_slots = len(self._id_by_slot)
+        counts = np.zeros(n_slots, dtype=np.int64)
+
+        for keyword in keywords:
+            tokens = set(tokenize(keyword))
+            if not tokens:
+                continue
+            present = None
+            for token in tokens:
+                arrays = self._posting_array(token)
+                if arrays is None:
+                    present = None
+                    break
+                mask = np.zeros(n_slots, dtype=bool)
+                mask[arrays[0]] = True
+                present = mask if present is None else present & mask
+            if present is not None:
+                counts += present
+
+        return counts
+
+    def score(self, query_terms: Iterable[str]) -> Dict[str, float]:
+        """
+        Score every indexed document with BM25.
+
+        Args:
+            query_terms: Query keywords
+
+        Returns:
+            Dictionary mapping document IDs to scores
+        """
+        scores = self.bm25_scores(query_terms)
+        return {doc_id: float(scores[slot]) for doc_id, slot in self._slot_by_id.items()}
+
+    def match_counts(self, keywords: Iterable[str]) -> Dict[str, int]:
+        """
+        Count whole-token keyword matches for every indexed document.
+
+        Args:
+            keywords: Keywords to look for
+
+        Returns:
+            Dictionary mapping document IDs to the number of matched keywords
+        """
+        counts = self.keyword_match_counts(keywords)
+        return {doc_id: int(counts[slot]) for doc_id, slot in self._slot_by_id.items()}
+
+    def top_k(self, query_terms: Iterable[str], k: int = 10) -> List[Tuple[str, float]]:
+        """
+        Retrieve the k highest-scoring documents for a query.
+
+        Args:
+            query_terms: Query keywords
+            k: Number of documents to return
+
+        Returns:
+            List of (document ID, score) pairs with positive scores, best first
+        """
+        scores = self.bm25_scores(query_terms)
+        if k <= 0 or not len(scores):
+            return []
+
+        if k < len(scores):
+            candidates = np.argpartition(-scores, k - 1)[:k]
+        else:
+            candidates = np.arange(len(scores))
+        candidates = candidates[np.argsort(-scores[candidates], kind='stable')]
+
+        return [
+            (self._id_by_slot[slot], float(scores[slot]))
+            for slot in candidates
+            if scores[slot] > 0 and self._id_by_slot[slot] is not None
+        ]
@@ -0,0 +1,123 @@
+"""
+Transcript Cleaner for AI-Driven Project Management Suite
+
+This module removes filler words from voice transcripts and normalizes spacing,
+punctuation and sentence capitalization. Patterns are compiled once at import,
+and long transcripts can be cleaned incrementally from a stream of chunks.
+"""
+
+import re
+from typing import Iterable, Iterator, List, Optional
+
+# Common filler words, removed in a single pass. Text is lowercased before
+# matching, so the pattern is case-sensitive (IGNORECASE roughly halves its speed)
+FILLER_WORDS = [
+    r'u(?:h+|m+)', r'er+', r'ah+', r'like',
+    r'you know', r'actually', r'basically', r'so',
+    r'well', r'okay', r'right'
+]
+FILLER_PATTERN = re.compile(r'\b(?:' + '|'.join(FILLER_WORDS) + r')\b')
+
+# Whitespace other than single spaces, and comma or period runs, to collapse
+WHITESPACE_PATTERN = re.compile(r'\s{2,}|[^\S ]')
+COMMA_RUN_PATTERN = re.compile(r',{2,}')
+PERIOD_RUN_PATTERN = re.compile(r'\.{2,}')
+
+# Blank lines separating segments of a transcript file
+SEGMENT_BREAK_PATTERN = re.compile(r'\n\s*\n')
+
+# A period that ends a sentence (not followed by another period), where a stream can be split
+SENTENCE_BREAK_PATTERN = re.compile(r'\.(?=[^.])')
+
+
+def _clean_sentences(text: str) -> List[str]:
+    """Clean a piece of transcript ending on a sentence boundary and return its sentences."""
+    cleaned = FILLER_PATTERN.sub('', text.lower())
+    cleaned = WHITESPACE_PATTERN.sub(' ', cleaned)
+    cleaned = COMMA_RUN_PATTERN.sub(',', cleaned)
+    cleaned = PERIOD_RUN_PATTERN.sub('.', cleaned)
+
+    # Capitalize first letter of sentences
+    sentences = []
+    for sentence in cleaned.split('.'):
+        sentence = sentence.strip()
+        if sentence:
+            sentences.append(sentence[0].upper() + sentence[1:])
+    return sentences
+
+
+def iter_clean_sentences(chunks: Iterable[str]) -> Iterator[str]:
+    """
+    Clean a transcript delivered in chunks, yielding sentences as they complete.
+
+    Text is buffered up to the last sentence break so filler words, "you know"
+    and punctuation runs split across chunks are handled as in a single call.
+
+    Args:
+        chunks: Consecutive pieces of the transcript
+
+    Yields:
+        Cleaned, capitalized sentences
+    """
+    buffer = ''
+    for chunk in chunks:
+        # The buffer holds no sentence break yet, so only the new text (plus the
+        # buffer's last character, which may be a period) needs searching
+        search_from = max(len(buffer) - 1, 0)
+        buffer += chunk
+        last_break = None
+        for last_break in SENTENCE_BREAK_PATTERN.finditer(buffer, search_from):
+            pass
+        if last_break is not None:
+            yield from _clean_sentences(buffer[:last_break.end()])
+            buffer = buffer[last_break.end():]
+    if buffer:
+        yield from _clean_sentences(buffer)
+
+
+def clean_transcript(transcript: str) -> str:
+    """
+    Clean and normalize transcript text.
+
+    Args:
+        transcript: Raw transcript text
+
+    Returns:
+        Cleaned transcript, or the original text if nothing is left after cleaning
+    """
+    sentences = list(iter_clean_sentences([transcript]))
+    return '. '.join(sentences) if sentences else transcript
+
+
+def clean_transcript_stream(chunks: Iterable[str]) -> Iterator[str]:
+    """
+    Clean a long transcript chunk by chunk.
+
+    Joining the yielded pieces gives the same text as clean_transcript() on the
+    whole transcript (except that an empty result is not replaced by the input).
+
+    Args:
+        chunks: Consecutive pieces of the transcript
+
+    Yields:
+        Pieces of the cleaned transcript
+    """
+    first = True
+    for sentence in iter_clean_sentences(chunks):
+        yield sentence if first else '. ' + sentence
+        first = False
+
+
+def split_transcript_segments(text: str, separator: Optional[str] = None) -> List[str]:
+    """
+    Split a transcript file into segments, one per story.
+
+    Args:
+        text: Text of the transcript file
+        separator: Literal separator between segments (blank lines when omitted)
+
+    Returns:
+        Non-empty segments, stripped of surrounding whitespace
+    """
+    parts = text.split(separator) if separator else SEGMENT_BREAK_PATTERN.split(text)
+    return [part.strip() for part in parts if part.strip()]
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Benchmark: streaming Confluence excerpt extraction vs. full-document parsing.
+
+Usage (from roia-suite/backend):
+    python benchmarks/bench_text_excerpt.py
+"""
+
+import sys
+import timeit
+from html.parser import HTMLParser
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.confluence_service import extract_text_excerpt  # noqa: E402
+
+
+class FullTextParser(HTMLParser):
+    """Baseline: parse the whole document and keep every text node."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+
+    def handle_data(self, data):
+        text = ' '.join(data.split())
+        if text:
+            self.parts.append(text)
+
+
+def full_document_excerpt(html_content: str, max_length: int = 200) -> str:
+    """Extract an excerpt by parsing the entire document first."""
+    parser = FullTextParser()
+    parser.feed(html_content)
+    parser.close()
+    text = ' '.join(parser.parts)
+    return text[:max_length] + "..." if len(text) > max_length else text
+
+
+def make_page(sections: int) -> str:
+    """Build a storage-format page with tables, macros and paragraphs."""
+    section = (
+        '<h2>Section</h2><p>Requirements for the <strong>login</strong> flow &amp; reset emails.</p>'
+        '<ac:structured-macro ac:name="info"><ac:parameter ac:name="title">Note</ac:parameter>'
+        '<ac:rich-text-body><p>Remember to update the runbook.</p></ac:rich-text-body></ac:structured-macro>'
+        '<table><tbody><tr><th>Owner</th><th>Status</th></tr><tr><td>Team A</td><td>Done</td></tr></tbody></table>'
+    )
+    return section * sections
+
+
+def main():
+    for sections in (10, 1000, 10000):
+        page = make_page(sections)
+        runs = 20 if sections <= 1000 else 5
+        streaming = min(timeit.repeat(lambda: extract_text_excerpt(page, 200), number=runs, repeat=3)) / runs
+        full = min(timeit.repeat(lambda: full_document_excerpt(page, 200), number=runs, repeat=3)) / runs
+        print(
+            f"{len(page) / 1024:9.1f} KiB  streaming {streaming * 1e3:8.3f} ms  "
+            f"full {full * 1e3:8.3f} ms  speedup {full / streaming:7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
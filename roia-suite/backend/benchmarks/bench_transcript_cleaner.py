@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark: precompiled single-pass transcript cleaner vs. the previous
+per-pattern implementation.
+
+Usage (from roia-suite/backend):
+    python benchmarks/bench_transcript_cleaner.py
+"""
+
+import re
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.transcript_cleaner import clean_transcript, clean_transcript_stream  # noqa: E402
+
+
+def legacy_clean_transcript(transcript: str) -> str:
+    """The previous LLMService.clean_transcript implementation."""
+    filler_words = [
+        r'\buh+\b', r'\bum+\b', r'\ber+\b', r'\bah+\b', r'\blike\b',
+        r'\byou know\b', r'\bactually\b', r'\bbasically\b', r'\bso\b',
+        r'\bwell\b', r'\bokay\b', r'\bright\b'
+    ]
+
+    cleaned = transcript.lower()
+
+    for pattern in filler_words:
+        cleaned = re.sub(pattern, '', cleaned, flags=re.IGNORECASE)
+
+    cleaned = re.sub(r'\s+', ' ', cleaned)
+    cleaned = re.sub(r'[,]{2,}', ',', cleaned)
+    cleaned = re.sub(r'[.]{2,}', '.', cleaned)
+    cleaned = cleaned.strip()
+
+    sentences = cleaned.split('.')
+    cleaned_sentences = []
+    for sentence in sentences:
+        sentence = sentence.strip()
+        if sentence:
+            sentence = sentence[0].upper() + sentence[1:] if len(sentence) > 1 else sentence.upper()
+            cleaned_sentences.append(sentence)
+
+    return '. '.join(cleaned_sentences) if cleaned_sentences else transcript
+
+
+SAMPLE = (
+    "Um, so basically we need to, uh, add a password reset to the login page, you know. "
+    "Actually the dashboard is, like, broken for admins right now.. Okay, well, "
+    "the API integration should be done by Friday,, right? "
+)
+
+
+def make_transcript(words: int) -> str:
+    """Repeat the sample to roughly the given number of words."""
+    repeats = max(1, words // len(SAMPLE.split()))
+    return SAMPLE * repeats
+
+
+def main():
+    # ~150 words per minute of speech
+    for label, words in (("short update", 40), ("5-minute", 750), ("60-minute", 9000)):
+        transcript = make_transcript(words)
+        assert clean_transcript(transcript) == legacy_clean_transcript(transcript)
+        runs = 200 if words < 1000 else 20
+        legacy = min(timeit.repeat(lambda: legacy_clean_transcript(transcript), number=runs, repeat=3)) / runs
+        current = min(timeit.repeat(lambda: clean_transcript(transcript), number=runs, repeat=3)) / runs
+        chunks = [transcript[i:i + 4096] for i in range(0, len(transcript), 4096)]
+        streamed = min(timeit.repeat(lambda: ''.join(clean_transcript_stream(chunks)), number=runs, repeat=3)) / runs
+        print(
+            f"{label:>12} ({len(transcript):7d} chars)  legacy {legacy * 1e3:8.3f} ms  "
+            f"single-pass {current * 1e3:8.3f} ms  streamed {streamed * 1e3:8.3f} ms  "
+            f"speedup {legacy / current:5.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Pytest tests for the local Confluence page index and its delta sync.
+"""
+
+import pytest
+from app.services.confluence_index import ConfluencePageIndex
+from app.services.confluence_service import ConfluencePage
+
+
+class FakeConfluenceService:
+    """Stand-in for ConfluenceService that serves pages from a dictionary."""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.body_requests = []
+        self.complete = True
+
+    def crawl_pages(self, space_key, max_results, include_content=True):
+        pages = [
+            ConfluencePage(
+                page_id=page_id,
+                page_title=page['title'],
+                page_url=f'https://test.confluence.com/pages/{page_id}',
+                space_key=space_key,
+                space_name='Test Space',
+                version=page['version']
+            )
+            for page_id, page in self.pages.items()
+        ]
+        return pages, self.complete
+
+    def fetch_page_bodies(self, pages):
+        for page in pages:
+            self.body_requests.append(page.page_id)
+            page.page_content = self.pages[page.page_id]['body']
+            page.content_excerpt = self.pages[page.page_id]['body']
+        return pages
+
+
+# Fixtures for test setup
+@pytest.fixture
+def service():
+    """Fixture to create a fake service with a small space."""
+    return FakeConfluenceService({
+        '1': {'title': 'Login Design', 'version': 1, 'body': 'Password reset flow'},
+        '2': {'title': 'Dashboard Metrics', 'version': 3, 'body': 'Reporting widgets'},
+        '3': {'title': 'Release Notes', 'version': 2, 'body': 'Login fixes and dashboard tweaks'},
+    })
+
+
+@pytest.fixture
+def index(tmp_path):
+    """Fixture to create an empty page index."""
+    return ConfluencePageIndex(str(tmp_path / 'pages.db'))
+
+
+# Test functions
+def test_initial_sync_indexes_every_page(index, service):
+    """Test that the first sync fetches every body and indexes the space."""
+    # Act
+    stats = index.sync_space(service, 'TEST')
+
+    # Assert
+    assert stats == {'seen': 3, 'updated': 3, 'removed': 0, 'complete': True}
+    assert index.count('TEST') == 3
+    assert index.is_stale('TEST', max_age=60) is False
+
+
+def test_delta_sync_refetches_only_changed_pages(index, service):
+    """Test that later syncs refetch bodies only for new or re-versioned pages."""
+    # Arrange
+    index.sync_space(service, 'TEST')
+    service.body_requests.clear()
+    service.pages['2'] = {'title': 'Dashboard Metrics', 'version': 4, 'body': 'Usage charts'}
+    service.pages['4'] = {'title': 'Billing', 'version': 1, 'body': 'Invoices'}
+    del service.pages['3']
+
+    # Act
+    stats = index.sync_space(service, 'TEST')
+
+    # Assert
+    assert sorted(service.body_requests) == ['2', '4']
+    assert stats == {'seen': 3, 'updated': 2, 'removed': 1, 'complete': True}
+    assert index.page_versions('TEST') == {'1': 1, '2': 4, '4': 1}
+
+
+def test_search_ranks_title_matches_first(index, service):
+    """Test that full-text search weights titles above excerpts."""
+    # Arrange
+    index.sync_space(service, 'TEST')
+
+    # Act
+    results = index.search('TEST', ['login'])
+
+    # Assert
+    assert [row['page_id'] for row in results] == ['1', '3']
+    assert index.search('OTHER', ['login']) == []
+
+
+def test_incomplete_crawl_keeps_unseen_pages(index, service):
+    """Test that a partial crawl neither removes unseen pages nor marks the space synced."""
+    # Arrange
+    index.sync_space(service, 'TEST')
+    synced_at = index.last_synced('TEST')
+    service.complete = False
+    del service.pages['2']
+    del service.pages['3']
+    service.pages['1'] = {'title': 'Login Design', 'version': 2, 'body': 'Password reset and MFA'}
+
+    # Act
+    stats = index.sync_space(service, 'TEST')
+
+    # Assert
+    assert stats == {'seen': 1, 'updated': 1, 'removed': 0, 'complete': False}
+    assert index.page_versions('TEST') == {'1': 2, '2': 3, '3': 2}
+    assert index.last_synced('TEST') == synced_at
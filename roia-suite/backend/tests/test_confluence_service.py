@@ -3,9 +3,11 @@
 Pytest tests for the ConfluenceService class.
 """
 
+import threading
 import pytest
+import requests
 from unittest import mock
-from app.services.confluence_service import ConfluenceService
+from app.services.confluence_service import ConfluenceService, extract_text_excerpt, _background_syncs
 
 
 # Fixtures for test setup
@@ -119,3 +121,170 @@ def test_create_page_with_author_info(mock_requests, mock_environment):
     assert 'json' in call_args[1]
     # Check that the author information is preserved in the content
     assert '<p><strong>Author:</strong> John Doe</p>' in call_args[1]['json']['body']['storage']['value']
+
+
+def _content_window(start, limit, total):
+    """Build a fake /content response window for pages start..start+limit."""
+    response = mock.MagicMock()
+    response.status_code = 200
+    response.json.return_value = {
+        'results': [
+            {
+                'id': str(i),
+                'title': f'Page {i}',
+                'space': {'key': 'TEST', 'name': 'Test Space'},
+                'version': {'when': '2025-01-01T00:00:00.000Z', 'number': 1}
+            }
+            for i in range(start, min(start + limit, total))
+        ]
+    }
+    return response
+
+
+def test_get_pages_from_space_crawls_metadata_windows(mock_requests, mock_environment):
+    """Test that a metadata-only crawl pages through the whole space without bodies."""
+    # Arrange
+    service = ConfluenceService()
+    session = mock_requests.Session.return_value
+    session.get.side_effect = lambda url, params: _content_window(params['start'], params['limit'], 430)
+    
+    # Act
+    pages = service.get_pages_from_space('TEST', max_results=1000, include_content=False)
+    
+    # Assert
+    assert [page.page_id for page in pages] == [str(i) for i in range(430)]
+    assert all(page.page_content is None for page in pages)
+    requested = [call.kwargs['params'] for call in session.get.call_args_list]
+    assert all(params['expand'] == 'space,version' for params in requested)
+    assert sorted(params['start'] for params in requested)[:5] == [0, 100, 200, 300, 400]
+
+
+def test_get_pages_from_space_respects_max_results(mock_requests, mock_environment):
+    """Test that the crawl stops once max_results pages have been collected."""
+    # Arrange
+    service = ConfluenceService()
+    session = mock_requests.Session.return_value
+    session.get.side_effect = lambda url, params: _content_window(params['start'], params['limit'], 1000)
+    
+    # Act
+    pages = service.get_pages_from_space('TEST', max_results=60)
+    
+    # Assert
+    assert len(pages) == 60
+    assert all(call.kwargs['params']['start'] < 60 for call in session.get.call_args_list)
+
+
+def test_extract_text_excerpt_strips_markup(mock_environment):
+    """Test that excerpts contain visible text only, without markup or macro parameters."""
+    # Arrange
+    service = ConfluenceService()
+    html = (
+        '<p>Login &amp; <strong>reset</strong> flow</p>'
+        '<ac:structured-macro ac:name="info"><ac:parameter ac:name="title">Hidden</ac:parameter>'
+        '<ac:rich-text-body><p>Shown</p></ac:rich-text-body></ac:structured-macro>'
+    )
+    
+    # Act
+    excerpt = service._extract_text_excerpt(html, 200)
+    
+    # Assert
+    assert excerpt == 'Login & reset flow Shown'
+
+
+def test_extract_text_excerpt_truncates_across_chunks():
+    """Test that truncation works and words split across feed chunks stay intact."""
+    # Arrange
+    html = '<p>' + 'alpha beta ' * 50 + '</p>'
+    
+    # Act
+    excerpt = extract_text_excerpt(html, max_length=20, chunk_size=7)
+    
+    # Assert
+    assert excerpt == 'alpha beta alpha bet...'
+
+
+def test_crawl_pages_retries_failed_window(mock_requests, mock_environment):
+    """Test that a transiently failing window is retried rather than ending the crawl."""
+    # Arrange
+    service = ConfluenceService()
+    session = mock_requests.Session.return_value
+    failures = {200: 1}
+
+    def get(url, params):
+        if failures.get(params['start']):
+            failures[params['start']] -= 1
+            response = mock.MagicMock()
+            response.status_code = 503
+            return response
+        return _content_window(params['start'], params['limit'], 430)
+    session.get.side_effect = get
+    
+    # Act
+    with mock.patch('app.services.confluence_service.time.sleep'):
+        pages, complete = service.crawl_pages('TEST', max_results=1000, include_content=False)
+    
+    # Assert
+    assert complete
+    assert [page.page_id for page in pages] == [str(i) for i in range(430)]
+
+
+def test_crawl_pages_reports_incomplete_crawl(mock_requests, mock_environment):
+    """Test that a window failing every attempt marks the crawl incomplete instead of ending the space."""
+    # Arrange
+    service = ConfluenceService()
+    session = mock_requests.Session.return_value
+
+    def get(url, params):
+        if params['start'] == 200:
+            raise requests.ConnectionError("connection reset")
+        return _content_window(params['start'], params['limit'], 430)
+    session.get.side_effect = get
+    
+    # Act
+    with mock.patch('app.services.confluence_service.time.sleep'):
+        pages, complete = service.crawl_pages('TEST', max_results=1000, include_content=False)
+    
+    # Assert
+    assert not complete
+    assert [page.page_id for page in pages] == [str(i) for i in range(200)]
+
+
+def test_crawl_pages_reports_capped_crawl_incomplete(mock_requests, mock_environment):
+    """Test that stopping at max_results is not reported as reaching the end of the space."""
+    # Arrange
+    service = ConfluenceService()
+    session = mock_requests.Session.return_value
+    session.get.side_effect = lambda url, params: _content_window(params['start'], params['limit'], 430)
+    
+    # Act
+    capped, capped_complete = service.crawl_pages('TEST', max_results=250, include_content=False)
+    whole, whole_complete = service.crawl_pages('TEST', max_results=500, include_content=False)
+    
+    # Assert
+    assert not capped_complete
+    assert len(capped) == 250
+    assert whole_complete
+    assert len(whole) == 430
+
+
+def test_background_sync_runs_once_per_space(mock_requests, mock_environment):
+    """Test that a stale index is synced on a background thread, one sync per space at a time."""
+    # Arrange
+    service = ConfluenceService()
+    release = threading.Event()
+    service._page_index = mock.MagicMock()
+    service._page_index.is_stale.return_value = True
+    service._page_index.sync_space.side_effect = lambda *args: release.wait(5)
+    
+    # Act
+    started = service.sync_page_index_in_background('TEST')
+    started_again = service.sync_page_index_in_background('TEST')
+    release.set()
+    
+    # Assert
+    assert started is True
+    assert started_again is False
+    thread = _background_syncs.get('TEST')
+    if thread:
+        thread.join(5)
+    service._page_index.sync_space.assert_called_once_with(service, 'TEST')
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Pytest tests for the semantic epic matcher and its persisted vector index.
+"""
+
+import pytest
+from unittest import mock
+from app.services.epic_matcher import HashedNgramEmbedder, SemanticEpicMatcher
+from app.services.llm import LLMService
+from app.models import ClassifiedIntent, IssueType, Priority
+
+
+SAMPLE_EPICS = [
+    {"id": "EPIC-1", "name": "User Authentication", "description": "Login and user management features"},
+    {"id": "EPIC-2", "name": "Dashboard", "description": "Main dashboard and reporting"},
+    {"id": "EPIC-3", "name": "API Integration", "description": "Third-party API connections"},
+]
+
+
+# Fixtures for test setup
+@pytest.fixture
+def index_path(tmp_path):
+    """Fixture for a temporary index file."""
+    return str(tmp_path / "epic_vectors.npz")
+
+
+@pytest.fixture
+def matcher(index_path):
+    """Fixture to create a matcher synced with the sample epics."""
+    matcher = SemanticEpicMatcher(index_path=index_path, embedder=HashedNgramEmbedder())
+    matcher.sync(SAMPLE_EPICS)
+    return matcher
+
+
+@pytest.fixture
+def sample_intent():
+    """Fixture to create a sample classified intent for testing."""
+    return ClassifiedIntent(
+        type=IssueType.STORY,
+        summary="Add password reset to the login page",
+        description="Users who forget their password should be able to log in again",
+        priority=Priority.MEDIUM,
+        epic_keywords=["login", "authentication"],
+        confidence=0.9
+    )
+
+
+# Test functions
+def test_match_returns_most_similar_epic(matcher, sample_intent):
+    """Test that the intent is matched to the closest epic."""
+    # Act
+    matches = matcher.match(sample_intent, max_results=2)
+
+    # Assert
+    assert matches[0][0]["id"] == "EPIC-1"
+    assert matches[0][1] > matches[1][1]
+
+
+def test_sync_only_embeds_changed_epics(matcher):
+    """Test that re-syncing embeds only new or edited epics and prunes removed ones."""
+    # Arrange
+    updated = SAMPLE_EPICS[:2] + [{"id": "EPIC-4", "name": "Billing", "description": "Invoices"}]
+    updated[1] = {**updated[1], "description": "Main dashboard, charts and reporting"}
+
+    # Act
+    embedded = matcher.sync(updated)
+
+    # Assert
+    assert embedded == 2
+    assert sorted(matcher.index.keys) == ["EPIC-1", "EPIC-2", "EPIC-4"]
+
+
+def test_index_is_persisted(matcher, index_path, sample_intent):
+    """Test that a new matcher reloads vectors from disk without re-embedding."""
+    # Arrange
+    reloaded = SemanticEpicMatcher(index_path=index_path, embedder=HashedNgramEmbedder())
+
+    # Act
+    embedded = reloaded.sync(SAMPLE_EPICS)
+
+    # Assert
+    assert embedded == 0
+    assert reloaded.match(sample_intent, max_results=1)[0][0]["id"] == "EPIC-1"
+
+
+def test_find_epic_matches_uses_index(matcher, sample_intent):
+    """Test that LLMService.find_epic_matches matches in-process without calling the LLM."""
+    # Arrange
+    with mock.patch('app.services.llm.ChatAgent') as mock_agent:
+        service = LLMService()
+
+        # Act
+        result = service.find_epic_matches(
+            sample_intent.epic_keywords,
+            classified_intent=sample_intent,
+            matcher=matcher
+        )
+
+    # Assert
+    assert result["epic_id"] == "EPIC-1"
+    assert result["keywords_matched"] == ["login", "authentication"]
+    assert 0.0 < result["match_confidence"] <= 1.0
+    mock_agent.return_value.send_message.assert_not_called()
+
+
+def test_find_epic_matches_without_keywords_or_intent():
+    """Test that an empty request returns no match."""
+    # Arrange
+    with mock.patch('app.services.llm.ChatAgent'):
+        service = LLMService()
+
+    # Act
+    result = service.find_epic_matches([])
+
+    # Assert
+    assert result["epic_id"] is None
+    assert result["match_confidence"] == 0.0
+
+
+def test_find_epic_matches_with_available_epics_leaves_index_unchanged(matcher, sample_intent):
+    """Test that matching among given epics neither adds them to nor prunes the shared index."""
+    # Arrange
+    candidates = [SAMPLE_EPICS[1], {"id": "EPIC-9", "name": "Login Security", "description": "Password reset"}]
+    with mock.patch('app.services.llm.ChatAgent'):
+        service = LLMService()
+
+        # Act
+        result = service.find_epic_matches(
+            sample_intent.epic_keywords,
+            available_epics=candidates,
+            classified_intent=sample_intent,
+            matcher=matcher
+        )
+
+    # Assert
+    assert result["epic_id"] == "EPIC-9"
+    assert sorted(matcher.index.keys) == ["EPIC-1", "EPIC-2", "EPIC-3"]
+
+
+def test_failed_refresh_backs_off(matcher):
+    """Test that a failed re-sync is not retried until the backoff has passed."""
+    # Arrange
+    matcher.last_synced = 0.0
+    assert matcher.needs_refresh()
+
+    # Act
+    matcher.record_sync_failure()
+
+    # Assert
+    assert not matcher.needs_refresh()
+    matcher.last_failed -= matcher.retry_interval + 1
+    assert matcher.needs_refresh()
+    matcher.record_sync_failure()
+    assert not matcher.needs_refresh()  # The second failure doubles the wait
+
+
+def test_refresh_epic_index_records_failure(matcher, monkeypatch):
+    """Test that a Jira error during refresh is recorded rather than retried on every request."""
+    # Arrange
+    from app.routers import transcript
+    monkeypatch.setenv("JIRA", "token")
+    matcher.last_synced = 0.0
+
+    with mock.patch.object(transcript, "JiraService") as mock_jira:
+        mock_jira.return_value.get_epics.side_effect = RuntimeError("Jira is down")
+
+        # Act
+        transcript.refresh_epic_index(matcher)
+        transcript.refresh_epic_index(matcher)
+
+    # Assert
+    mock_jira.return_value.get_epics.assert_called_once_with(
+        project_key="ROIA", max_results=None, include_issue_counts=False
+    )
+    assert matcher.failures == 1
+    assert sorted(matcher.index.keys) == ["EPIC-1", "EPIC-2", "EPIC-3"]
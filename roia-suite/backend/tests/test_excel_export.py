@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Pytest tests for the ExcelExportService story log and workbook builds.
+"""
+
+import os
+import pytest
+from unittest import mock
+from openpyxl import load_workbook
+from app.services.excel_export import ExcelExportService, COLUMNS
+from app.models import ClassifiedIntent, EpicMatch, IssueType, Priority
+
+
+# Fixtures for test setup
+@pytest.fixture
+def service(tmp_path):
+    """Fixture to create a service writing to a temporary directory."""
+    return ExcelExportService(export_directory=str(tmp_path))
+
+
+@pytest.fixture
+def sample_intent():
+    """Fixture to create a sample classified intent for testing."""
+    return ClassifiedIntent(
+        type=IssueType.BUG,
+        summary="Login fails",
+        description="Users cannot log in after reset",
+        acceptance_criteria=["Login works", "Reset works"],
+        priority=Priority.CRITICAL,
+        epic_keywords=["login"],
+        confidence=0.9
+    )
+
+
+def export(service, intent):
+    """Export one story with fixed transcript values."""
+    return service.export_story(
+        classified_intent=intent,
+        epic_match=EpicMatch(epic_id="EPIC-1", epic_name="Auth", match_confidence=0.5),
+        cleaned_transcript="Login fails",
+        original_transcript="uh login fails",
+        processing_time_ms=12
+    )
+
+
+# Test functions
+def test_export_story_appends_to_log_without_workbook(service, sample_intent):
+    """Test that exporting logs the story without writing the workbook."""
+    # Act
+    first = export(service, sample_intent)
+    second = export(service, sample_intent)
+
+    # Assert
+    assert first["success"] and second["success"]
+    assert (first["row_number"], second["row_number"]) == (2, 3)
+    assert service.get_export_summary()["total_stories"] == 2
+
+
+def test_build_workbook_writes_formatted_rows(service, sample_intent):
+    """Test that the workbook is built on demand from the log."""
+    # Arrange
+    export(service, sample_intent)
+
+    # Act
+    path = service.build_workbook()
+
+    # Assert
+    ws = load_workbook(path).active
+    assert [cell.value for cell in ws[1]] == COLUMNS
+    assert ws.max_row == 2
+    assert ws["C2"].value == "BUG"
+    assert ws["D2"].fill.start_color.rgb.endswith("FF6666")
+    assert ws["G2"].value == "Login works | Reset works"
+
+
+def test_build_workbook_skips_when_current(service, sample_intent):
+    """Test that an up-to-date workbook is not rebuilt, and a stale one is."""
+    # Arrange
+    export(service, sample_intent)
+    path = service.build_workbook()
+    mtime = os.stat(path).st_mtime_ns
+
+    # Act / Assert
+    service.build_workbook()
+    assert os.stat(path).st_mtime_ns == mtime
+    export(service, sample_intent)
+    service.build_workbook()
+    assert load_workbook(path).active.max_row == 3
+
+
+def test_existing_workbook_is_imported_once(tmp_path, sample_intent):
+    """Test that rows from a workbook written before the log existed are kept."""
+    # Arrange
+    service = ExcelExportService(export_directory=str(tmp_path))
+    export(service, sample_intent)
+    service.build_workbook()
+    (tmp_path / "project_stories.db").unlink()
+
+    # Act
+    reopened = ExcelExportService(export_directory=str(tmp_path))
+    ExcelExportService(export_directory=str(tmp_path))
+
+    # Assert
+    assert reopened.get_export_summary()["total_stories"] == 1
+    export(reopened, sample_intent)
+    assert load_workbook(reopened.build_workbook()).active.max_row == 3
+
+
+def test_export_summary_uses_running_counters(service, sample_intent):
+    """Test that the summary reports per-type and per-priority counts from the counters."""
+    # Arrange
+    export(service, sample_intent)
+    export(service, sample_intent.model_copy(update={"type": IssueType.STORY, "priority": Priority.LOW}))
+
+    # Act
+    summary = service.get_export_summary()
+
+    # Assert
+    assert summary["total_stories"] == 2
+    assert summary["by_type"] == {"BUG": 1, "STORY": 1}
+    assert summary["by_priority"] == {"CRITICAL": 1, "LOW": 1}
+    assert summary["last_story_at"] is not None
+    assert summary["excel_exists"] is False
+    service.build_workbook()
+    assert service.get_export_summary()["excel_up_to_date"] is True
+
+
+def test_story_log_initialized_once_per_process(tmp_path):
+    """Test that per-request service instances don't re-run the schema setup."""
+    # Arrange
+    ExcelExportService(export_directory=str(tmp_path))
+
+    # Act
+    with mock.patch.object(ExcelExportService, "_init_story_log") as init:
+        ExcelExportService(export_directory=str(tmp_path))
+
+    # Assert
+    init.assert_not_called()
@@ -6,7 +6,8 @@ This serves as a migration example from unittest to pytest.
 
 import pytest
 from unittest import mock
-from app.services.jira_service import JiraService, JiraFeature
+from app.services.jira_service import JiraService, JiraFeature, JiraEpic
+from app.services.text_index import TextIndex
 from app.models import ClassifiedIntent, IssueType, Priority
 
 
@@ -233,3 +234,26 @@ def test_health_check(mock_jira_client, is_healthy, expected_connected):
 
 if __name__ == "__main__":
     pytest.main(["-v", __file__])
+
+
+def test_find_matching_epics_reuses_project_index(mock_jira_client, mock_environment, sample_intent):
+    """Test that the epic index is kept across calls and only changed epics are re-indexed."""
+    # Arrange
+    service = JiraService()
+    epics = [
+        JiraEpic(epic_key="IDX-1", epic_name="Story tooling", epic_summary="Test story capture"),
+        JiraEpic(epic_key="IDX-2", epic_name="Dashboard", epic_summary="Reporting"),
+    ]
+    changed = [epics[0], JiraEpic(epic_key="IDX-2", epic_name="Dashboard", epic_summary="Story reporting")]
+    service.get_epics = mock.MagicMock(side_effect=[epics, changed])
+    
+    # Act
+    with mock.patch.object(TextIndex, 'add', autospec=True, side_effect=TextIndex.add) as add:
+        first = service.find_matching_epics(sample_intent, project_key="IDXTEST")
+        second = service.find_matching_epics(sample_intent, project_key="IDXTEST")
+    
+    # Assert
+    assert [call.args[1] for call in add.call_args_list] == ["IDX-1", "IDX-2", "IDX-2"]
+    assert first[0].epic_key == "IDX-1"
+    assert second[1].match_score > first[1].match_score
+
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Pytest tests for the shared TextIndex used in epic and page matching.
+"""
+
+import pytest
+from app.services.text_index import TextIndex, matching_keywords, tokenize
+
+
+# Fixtures for test setup
+@pytest.fixture
+def index():
+    """Fixture to create an index with a few epic-like documents."""
+    index = TextIndex()
+    index.add("EPIC-1", "User Authentication: login and user management features")
+    index.add("EPIC-2", "Dashboard: main dashboard and reporting")
+    index.add("EPIC-3", "API Integration: third-party API connections")
+    return index
+
+
+# Test functions
+def test_tokenize_lowercases_and_splits():
+    """Test that tokenize produces lowercase alphanumeric tokens."""
+    assert tokenize("Third-party API, v2!") == ["third", "party", "api", "v2"]
+    assert tokenize(None) == []
+
+
+def test_matching_keywords_require_every_token():
+    """Test that a keyword matches only when all of its tokens are whole words in the text."""
+    text = "Third-party API connections for login"
+    assert matching_keywords(["api", "party api", "log", "user login", "Login"], text) == ["api", "party api", "Login"]
+    assert matching_keywords(["api", "!!"], None) == []
+
+
+def test_match_counts_use_whole_tokens(index):
+    """Test that keywords match whole tokens rather than substrings."""
+    # Act
+    counts = index.match_counts(["log", "login", "dashboard"])
+
+    # Assert
+    assert counts == {"EPIC-1": 1, "EPIC-2": 1, "EPIC-3": 0}
+
+
+def test_match_counts_multi_word_keyword(index):
+    """Test that a multi-word keyword needs all of its tokens present."""
+    # Act
+    counts = index.match_counts(["user management", "user reporting"])
+
+    # Assert
+    assert counts["EPIC-1"] == 1
+    assert counts["EPIC-2"] == 0
+
+
+def test_top_k_ranks_by_bm25(index):
+    """Test that top_k returns the most relevant documents first."""
+    # Act
+    results = index.top_k(["api", "connections"], k=2)
+
+    # Assert
+    assert results[0][0] == "EPIC-3"
+    assert all(score > 0 for _, score in results)
+    assert len(results) == 1
+
+
+def test_remove_and_readd_document(index):
+    """Test incremental removal and replacement of documents."""
+    # Act
+    assert index.remove("EPIC-3") is True
+    assert index.remove("EPIC-3") is False
+    index.add("EPIC-4", "Reporting API for dashboards")
+
+    # Assert
+    assert len(index) == 3
+    assert "EPIC-3" not in index
+    assert index.top_k(["api"], k=5) == [("EPIC-4", pytest.approx(index.score(["api"])["EPIC-4"]))]
+
+
+def test_add_replaces_existing_document(index):
+    """Test that re-adding a document ID replaces its text."""
+    # Act
+    index.add("EPIC-2", "Billing workflows")
+
+    # Assert
+    assert index.match_counts(["dashboard"])["EPIC-2"] == 0
+    assert index.match_counts(["billing"])["EPIC-2"] == 1
+
+
+def test_sync_updates_only_changed_documents(index):
+    """Test that sync re-indexes changed documents, adds new ones and removes missing ones."""
+    # Act
+    changed = index.sync({
+        "EPIC-1": "User Authentication: login and user management features",
+        "EPIC-2": "Billing workflows",
+        "EPIC-4": "Reporting API for dashboards",
+    })
+
+    # Assert
+    assert changed == 3  # EPIC-2 replaced, EPIC-4 added, EPIC-3 removed
+    assert sorted(index) == ["EPIC-1", "EPIC-2", "EPIC-4"]
+    assert index.match_counts(["billing"])["EPIC-2"] == 1
+    assert index.sync({"EPIC-5": "Audit logs"}, remove_missing=False) == 1
+    assert len(index) == 4
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Pytest tests for token counting and chat history compaction.
+"""
+
+import pytest
+from app.token_budget import HistoryBudget, TokenCounter
+
+
+HTML_REPLY = "Here is the page:\n```html\n<!DOCTYPE html><html><body>" + "<div>row</div>" * 500 + "</body></html>\n```"
+
+
+# Fixtures for test setup
+@pytest.fixture
+def counter():
+    """Fixture to create a token counter."""
+    return TokenCounter("gpt-4o-mini")
+
+
+@pytest.fixture
+def budget(counter):
+    """Fixture to create a history budget with small limits."""
+    return HistoryBudget(counter, max_prompt_tokens=600, max_message_tokens=300)
+
+
+def conversation(turns):
+    """Build a history of alternating user/assistant turns after a system message."""
+    messages = [{"role": "system", "content": "You build prototypes."}]
+    for user, assistant in turns:
+        messages.append({"role": "user", "content": user})
+        messages.append({"role": "assistant", "content": assistant})
+    return messages
+
+
+# Test functions
+def test_compact_keeps_short_history_unchanged(budget):
+    """Test that a history under budget is sent as is."""
+    # Arrange
+    messages = conversation([("Make a login page", "Sure, what colors?")])
+
+    # Act / Assert
+    assert budget.compact(messages) == messages
+
+
+def test_compact_replaces_old_html_with_references(budget):
+    """Test that only the latest assistant message keeps its HTML."""
+    # Arrange
+    messages = conversation([("Make a table", HTML_REPLY), ("Make it blue", "Done, colors updated.")])
+
+    # Act
+    compacted = budget.compact(messages)
+
+    # Assert
+    assert "[HTML prototype v1 omitted from history]" in compacted[2]["content"]
+    assert "<div>" not in compacted[2]["content"]
+    assert messages[2]["content"] == HTML_REPLY
+
+
+def test_compact_fits_budget_and_summarizes_dropped_turns(budget, counter):
+    """Test that old turns are dropped into a summary and huge messages are truncated."""
+    # Arrange
+    messages = conversation([(f"Request {i} " + "detail " * 100, f"Reply {i}") for i in range(10)])
+    messages.append({"role": "user", "content": "latest " * 2000})
+
+    # Act
+    compacted = budget.compact(messages)
+
+    # Assert
+    assert counter.count_messages(compacted) <= 600
+    assert compacted[0] == messages[0]
+    assert compacted[1]["content"].startswith("Summary of earlier conversation")
+    assert compacted[-1]["content"].startswith("latest")
+    assert "tokens omitted" in compacted[-1]["content"]
+
+
+def test_truncate_keeps_head_and_tail(counter):
+    """Test that truncation keeps both ends of a long text."""
+    # Arrange
+    text = "start " + "middle " * 1000 + "end"
+
+    # Act
+    truncated = counter.truncate(text, 100)
+
+    # Assert
+    assert truncated.startswith("start")
+    assert truncated.endswith("end")
+    assert counter.count(truncated) <= 100
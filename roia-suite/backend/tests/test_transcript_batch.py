@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Pytest tests for the batch transcript processing endpoint.
+"""
+
+import json
+import pytest
+from unittest import mock
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routers.transcript import get_excel_service
+from app.services.epic_matcher import HashedNgramEmbedder, SemanticEpicMatcher, get_epic_matcher
+from app.services.excel_export import ExcelExportService
+from app.services.transcript_cleaner import split_transcript_segments
+
+
+LLM_RESPONSE = json.dumps({
+    "type": "story",
+    "summary": "Add password reset",
+    "description": "Users need to reset their login password",
+    "acceptance_criteria": ["Reset email is sent"],
+    "priority": "high",
+    "epic_keywords": ["login", "authentication"],
+    "confidence": 0.9
+})
+
+
+# Fixtures for test setup
+@pytest.fixture
+def excel_service(tmp_path):
+    """Fixture to create an export service writing to a temporary directory."""
+    return ExcelExportService(export_directory=str(tmp_path / "exports"))
+
+
+@pytest.fixture
+def client(tmp_path, excel_service):
+    """Create a TestClient with the export service and epic matcher overridden."""
+    matcher = SemanticEpicMatcher(index_path=str(tmp_path / "epics.npz"), embedder=HashedNgramEmbedder())
+    matcher.sync([
+        {"id": "EPIC-1", "name": "User Authentication", "description": "Login and user management features"},
+        {"id": "EPIC-2", "name": "Dashboard", "description": "Main dashboard and reporting"},
+    ])
+    app.dependency_overrides[get_excel_service] = lambda: excel_service
+    app.dependency_overrides[get_epic_matcher] = lambda: matcher
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def mock_chat_agent():
+    """Mock the ChatAgent used by LLMService."""
+    with mock.patch('app.services.llm.ChatAgent') as mock_agent:
+        mock_agent.return_value.send_message.return_value = LLM_RESPONSE
+        yield mock_agent
+
+
+# Test functions
+def test_batch_processes_transcripts_and_file_segments(client, mock_chat_agent, excel_service):
+    """Test that transcripts and file segments are classified, matched and exported together."""
+    # Arrange
+    payload = {
+        "transcripts": ["Uh we need a password reset on login"],
+        "transcript_file": "Add reset emails.\n\n\nUm users are locked out of login."
+    }
+
+    # Act
+    response = client.post("/api/v1/transcript/process/batch", json=payload)
+
+    # Assert
+    assert response.status_code == 200
+    body = response.json()
+    assert body["success"] is True
+    assert (body["total"], body["succeeded"], body["exported"]) == (3, 3, 3)
+    assert [r["epic_match"]["epic_id"] for r in body["results"]] == ["EPIC-1"] * 3
+    assert body["results"][0]["cleaned_transcript"] == "We need a password reset on login"
+    assert mock_chat_agent.return_value.send_message.call_count == 3
+    assert excel_service.get_export_summary()["total_stories"] == 3
+
+
+def test_batch_reports_failed_transcripts(client, mock_chat_agent):
+    """Test that a transcript whose classification fails is reported as failed on its own."""
+    # Arrange
+    def send_message(prompt, **kwargs):
+        if "outage" in prompt:
+            raise RuntimeError("model unavailable")
+        return LLM_RESPONSE
+    mock_chat_agent.return_value.send_message.side_effect = send_message
+    payload = {"transcripts": ["We need a password reset on login", "The outage broke login"]}
+
+    # Act
+    response = client.post("/api/v1/transcript/process/batch", json=payload)
+
+    # Assert
+    assert response.status_code == 200
+    body = response.json()
+    assert body["success"] is False
+    assert (body["total"], body["succeeded"]) == (2, 1)
+    assert [r["success"] for r in body["results"]] == [True, False]
+    assert body["results"][0]["error_message"] is None
+    assert "model unavailable" in body["results"][1]["error_message"]
+
+
+def test_batch_rejects_empty_request(client, mock_chat_agent):
+    """Test that a batch without transcripts is rejected."""
+    # Act
+    response = client.post("/api/v1/transcript/process/batch", json={"transcripts": ["  "]})
+
+    # Assert
+    assert response.status_code == 400
+
+
+def test_export_stories_writes_unique_ids(excel_service):
+    """Test that a batch export assigns numbered story IDs and consecutive rows."""
+    # Arrange
+    from app.models import ClassifiedIntent, EpicMatch, IssueType
+    intent = ClassifiedIntent(type=IssueType.TASK, summary="s", description="d", confidence=0.5)
+    story = {
+        "classified_intent": intent,
+        "epic_match": EpicMatch(),
+        "cleaned_transcript": "c",
+        "original_transcript": "o",
+        "processing_time_ms": 1
+    }
+
+    # Act
+    result = excel_service.export_stories([story, story])
+
+    # Assert
+    assert result["success"] is True
+    assert len(set(result["story_ids"])) == 2
+    assert result["first_row_number"] == 2
+    assert excel_service.get_export_summary()["by_type"] == {"TASK": 2}
+
+
+def test_split_transcript_segments():
+    """Test splitting on blank lines and on an explicit separator."""
+    # Act / Assert
+    assert split_transcript_segments("one\n \ntwo\n\n\n") == ["one", "two"]
+    assert split_transcript_segments("one---two--- ", "---") == ["one", "two"]
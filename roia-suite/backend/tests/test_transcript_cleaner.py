@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Pytest tests for the shared transcript cleaner.
+"""
+
+import random
+import pytest
+from app.services.transcript_cleaner import clean_transcript, clean_transcript_stream
+from benchmarks.bench_transcript_cleaner import legacy_clean_transcript
+
+
+SAMPLES = [
+    "Um, so basically we need to, uh, add a password reset, you know.",
+    "The dashboard is broken.. Okay, well, fix it,, right?",
+    "UMMM Like,   ACTUALLY\tthe API\nneeds work... Soon. so.",
+    "uh um er ah",
+    "",
+    "a. b. c",
+]
+
+
+# Test functions
+@pytest.mark.parametrize("transcript", SAMPLES)
+def test_matches_previous_implementation(transcript):
+    """Test that cleaning output is unchanged from the per-pattern implementation."""
+    assert clean_transcript(transcript) == legacy_clean_transcript(transcript)
+
+
+def test_matches_previous_implementation_on_random_text():
+    """Test equivalence on random mixes of words, fillers and punctuation."""
+    # Arrange
+    rng = random.Random(42)
+    tokens = ["uh", "umm", "so", "you", "know", "like", "login", "Page", ",", ",,", ".", "..", " ", "\n", "Right"]
+
+    for _ in range(200):
+        transcript = " ".join(rng.choice(tokens) for _ in range(rng.randint(1, 40)))
+
+        # Act / Assert
+        assert clean_transcript(transcript) == legacy_clean_transcript(transcript)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 17, 1000])
+def test_stream_matches_whole_transcript(chunk_size):
+    """Test that chunked cleaning gives the same text however the transcript is split."""
+    # Arrange
+    transcript = " ".join(SAMPLES[:3]) * 5
+    chunks = [transcript[i:i + chunk_size] for i in range(0, len(transcript), chunk_size)]
+
+    # Act
+    streamed = "".join(clean_transcript_stream(chunks))
+
+    # Assert
+    assert streamed == clean_transcript(transcript)
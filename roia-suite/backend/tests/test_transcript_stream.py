@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Pytest tests for streamed LLM responses and the server-sent events transcript endpoint.
+"""
+
+import json
+import pytest
+from types import SimpleNamespace
+from unittest import mock
+from fastapi.testclient import TestClient
+
+from app.chat_agent import ChatAgent
+from app.main import app
+from app.routers.transcript import get_excel_service
+from app.services.epic_matcher import HashedNgramEmbedder, SemanticEpicMatcher, get_epic_matcher
+from app.services.excel_export import ExcelExportService
+
+
+LLM_RESPONSE = json.dumps({
+    "type": "bug",
+    "summary": "Login fails",
+    "description": "Users cannot log in",
+    "priority": "high",
+    "epic_keywords": ["login"],
+    "confidence": 0.9
+})
+
+
+def completion_chunks(text, size=7):
+    """Build streamed completion chunks for a text, with a leading chunk without choices."""
+    chunks = [SimpleNamespace(choices=[])]
+    for i in range(0, len(text), size):
+        delta = SimpleNamespace(content=text[i:i + size])
+        chunks.append(SimpleNamespace(choices=[SimpleNamespace(delta=delta)]))
+    return chunks
+
+
+def parse_sse(body):
+    """Parse a server-sent events body into (event, data) pairs."""
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+# Fixtures for test setup
+@pytest.fixture
+def mock_openai():
+    """Mock the AzureOpenAI client used by ChatAgent to stream LLM_RESPONSE."""
+    with mock.patch('app.chat_agent.AzureOpenAI') as mock_client:
+        mock_client.return_value.chat.completions.create.side_effect = \
+            lambda **kwargs: completion_chunks(LLM_RESPONSE)
+        yield mock_client
+
+
+@pytest.fixture
+def client(tmp_path):
+    """Create a TestClient with the export service and epic matcher overridden."""
+    matcher = SemanticEpicMatcher(index_path=None, embedder=HashedNgramEmbedder())
+    matcher.sync([{"id": "EPIC-1", "name": "User Authentication", "description": "Login features"}])
+    excel_service = ExcelExportService(export_directory=str(tmp_path))
+    app.dependency_overrides[get_excel_service] = lambda: excel_service
+    app.dependency_overrides[get_epic_matcher] = lambda: matcher
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+# Test functions
+def test_send_message_stream_yields_deltas_and_records_history(mock_openai):
+    """Test that a streamed response is yielded in pieces and saved to history once complete."""
+    # Arrange
+    agent = ChatAgent(system_message="system")
+
+    # Act
+    pieces = list(agent.send_message("hello", stream=True))
+
+    # Assert
+    assert len(pieces) > 1
+    assert "".join(pieces) == LLM_RESPONSE
+    assert agent.get_history()[-1] == {"role": "assistant", "content": LLM_RESPONSE}
+    assert mock_openai.return_value.chat.completions.create.call_args.kwargs["stream"] is True
+
+
+def test_send_message_stream_failure_leaves_history_unchanged(mock_openai):
+    """Test that a stream failing before any text arrives doesn't leave a dangling user turn."""
+    # Arrange
+    agent = ChatAgent(system_message="system")
+    mock_openai.return_value.chat.completions.create.side_effect = RuntimeError("connection reset")
+
+    # Act
+    pieces = list(agent.send_message("hello", stream=True))
+
+    # Assert
+    assert pieces == ["Error calling athenaGPT API: connection reset"]
+    assert agent.get_history() == [{"role": "system", "content": "system"}]
+
+
+def test_process_stream_emits_events_in_order(client, mock_openai):
+    """Test that the stream endpoint emits tokens before the parsed intent and epic match."""
+    # Act
+    response = client.post("/api/v1/transcript/process/stream", json={"transcript": "Uh login is broken"})
+
+    # Assert
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = parse_sse(response.text)
+    names = [name for name, _ in events]
+    assert names[0] == "cleaned"
+    assert names[-3:] == ["classified", "epic_match", "done"]
+    assert "".join(data["text"] for name, data in events if name == "token") == LLM_RESPONSE
+    assert events[-3][1]["type"] == "bug"
+    assert events[-2][1]["epic_id"] == "EPIC-1"